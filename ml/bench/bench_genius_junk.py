@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: strip_genius_junk anchored scan vs per-marker loop.
+
+Usage:
+    uv run python bench/bench_genius_junk.py
+    uv run python bench/bench_genius_junk.py data/training/context_17k.jsonl
+    uv run python bench/bench_genius_junk.py -n 5 data/eval/context_top100.jsonl
+
+Without an input file a synthetic corpus is used: mostly short metadata-sized
+strings plus bio-sized text, with mid-text markers, trailing markers and
+fake bios mixed in.
+All implementations must agree on every string before timings are shown.
+The single-alternation regex is kept as a data point: CPython's regex engine
+tries every alternative at each position, which loses to C-level str.find
+on bio-length text.
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+from rich.table import Table
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "eval"))
+
+from lib.log import log_phase, log_info, log_ok, log_err, console
+
+import scrape_clean
+from scrape_clean import GENIUS_FAKE_BIO_OPENERS, GENIUS_JUNK_MARKERS
+
+
+def strip_genius_junk_loop(s: str) -> str:
+    """Reference implementation: one find()/startswith() per marker."""
+    for opener in GENIUS_FAKE_BIO_OPENERS:
+        if s.lstrip().startswith(opener):
+            return ""
+    earliest = len(s)
+    for marker in GENIUS_JUNK_MARKERS:
+        idx = s.find(marker)
+        if idx != -1 and idx < earliest:
+            earliest = idx
+    if earliest < len(s):
+        s = s[:earliest]
+    return s
+
+
+JUNK_ALTERNATION = re.compile("|".join(map(re.escape, GENIUS_JUNK_MARKERS)))
+
+
+def strip_genius_junk_regex(s: str) -> str:
+    """Single alternation scan for the earliest marker."""
+    if scrape_clean.GENIUS_FAKE_BIO.match(s):
+        return ""
+    m = JUNK_ALTERNATION.search(s)
+    return s[:m.start()] if m else s
+
+
+def collect_strings(v, out: list[str]) -> None:
+    if isinstance(v, str):
+        out.append(v)
+    elif isinstance(v, list):
+        for item in v:
+            collect_strings(item, out)
+    elif isinstance(v, dict):
+        for val in v.values():
+            collect_strings(val, out)
+
+
+def load_corpus(path: Path) -> list[str]:
+    strings: list[str] = []
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                collect_strings(json.loads(line), strings)
+            except json.JSONDecodeError:
+                continue
+    return strings
+
+
+WORDS = (
+    "the band released their debut album in with producer featuring a "
+    "single that reached number on charts tour record label songwriter "
+    "collaboration remix vocals guitar drums acoustic studio session"
+).split()
+
+
+def synthetic_corpus(n: int, seed: int = 0) -> list[str]:
+    """Mostly short metadata-sized strings plus a tail of bio-sized ones."""
+    rng = random.Random(seed)
+    strings = []
+    for i in range(n):
+        n_words = rng.randint(1, 12) if i % 3 else rng.randint(20, 400)
+        text = " ".join(rng.choice(WORDS) for _ in range(n_words))
+        kind = i % 10
+        if kind == 0:
+            text = f"{text} {rng.choice(GENIUS_JUNK_MARKERS)} {text}"
+        elif kind == 1:
+            text = f"{text}. {rng.choice(GENIUS_JUNK_MARKERS)}"
+        elif kind == 2:
+            text = f"  {rng.choice(GENIUS_FAKE_BIO_OPENERS)} {text}"
+        strings.append(text)
+    return strings
+
+
+def bench(fn, strings: list[str], repeat: int) -> float:
+    """Return the best wall-clock time over `repeat` full passes."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for s in strings:
+            fn(s)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the anchored strip_genius_junk against the original "
+                    "per-marker loop and a single alternation regex, on a context "
+                    "JSONL or a synthetic corpus.",
+    )
+    parser.add_argument(
+        "input", type=Path, nargs="?", default=None,
+        help="context JSONL to draw strings from (default: synthetic corpus)",
+    )
+    parser.add_argument(
+        "-n", "--repeat", type=int, default=3,
+        help="timed passes per implementation; the best is reported (default: 3)",
+    )
+    parser.add_argument(
+        "--size", type=int, default=20000,
+        help="number of synthetic strings when no input is given (default: 20000)",
+    )
+    args = parser.parse_args()
+
+    log_phase("Loading corpus")
+    if args.input:
+        if not args.input.exists():
+            log_err(f"Input file not found: {args.input}")
+            sys.exit(1)
+        strings = load_corpus(args.input)
+        log_ok(f"{len(strings):,} strings from {args.input.name}")
+    else:
+        strings = synthetic_corpus(args.size)
+        log_ok(f"{len(strings):,} synthetic strings")
+    total_chars = sum(len(s) for s in strings)
+    log_info(f"{total_chars:,} chars · {len(GENIUS_JUNK_MARKERS)} markers · "
+             f"{len(GENIUS_FAKE_BIO_OPENERS)} fake-bio openers")
+
+    impls = [
+        ("per-marker loop", strip_genius_junk_loop),
+        ("alternation regex", strip_genius_junk_regex),
+        ("anchored scan", scrape_clean.strip_genius_junk),
+    ]
+
+    log_phase("Checking equivalence")
+    for name, fn in impls[1:]:
+        mismatches = sum(1 for s in strings if fn(s) != strip_genius_junk_loop(s))
+        if mismatches:
+            log_err(f"{name}: {mismatches} strings differ from the reference loop")
+            sys.exit(1)
+    log_ok("Outputs identical")
+
+    log_phase(f"Timing (best of {args.repeat})")
+    timings = [(name, bench(fn, strings, args.repeat)) for name, fn in impls]
+
+    table = Table(show_edge=False, pad_edge=False)
+    table.add_column("Implementation")
+    table.add_column("Total", justify="right")
+    table.add_column("Per string", justify="right")
+    table.add_column("MB/s", justify="right")
+    for name, t in timings:
+        table.add_row(
+            name,
+            f"{t * 1000:.1f} ms",
+            f"{t / len(strings) * 1e6:.2f} µs",
+            f"{total_chars / t / 1e6:.1f}",
+        )
+    console.print(table)
+    t_loop, t_new = timings[0][1], timings[-1][1]
+    log_ok(f"Speedup (anchored vs loop): [bold]{t_loop / t_new:.1f}×")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""Benchmark: split_concatenated_json on pathological corrupt lines.
+
+Usage:
+    uv run python bench/bench_json_recovery.py
+    uv run python bench/bench_json_recovery.py --sizes 1000 10000 100000
+
+Compares the single-scan recovery parser in eval/scrape_clean.py against the
+previous strategy (raw_decode, then retry at every following '{'), which is
+reproduced here. Each case is generated at several line lengths so the
+growth rate is visible: the old strategy is quadratic on deep or repeatedly
+broken nesting and can hit RecursionError, the scan stays linear.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from rich.table import Table
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "eval"))
+
+from lib.log import log_phase, log_info, log_ok, log_warn, console
+
+from scrape_clean import split_concatenated_json
+
+
+def split_concatenated_json_old(line: str) -> list[dict]:
+    """Previous implementation: raw_decode, on failure retry at the next '{'."""
+    objects = []
+    decoder = json.JSONDecoder()
+    idx = 0
+    line = line.strip()
+
+    while idx < len(line):
+        try:
+            obj, end = decoder.raw_decode(line, idx)
+            if isinstance(obj, dict):
+                objects.append(obj)
+            idx = end
+            while idx < len(line) and line[idx] in " \t":
+                idx += 1
+            continue
+        except json.JSONDecodeError:
+            pass
+
+        next_brace = line.find("{", idx + 1)
+        if next_brace == -1:
+            break
+        idx = next_brace
+
+    return objects
+
+
+# ── Pathological cases (each builds a line of roughly n chars) ───
+
+
+def record(i: int, bio_len: int) -> str:
+    bio = ("A {curly} bio with \"quotes\" and \\ slashes. " * (bio_len // 45 + 1))[:bio_len]
+    return json.dumps({"track": f"t{i}", "genius": {"artist": {"bio": bio}}})
+
+
+def concatenated(n: int) -> str:
+    """Valid records glued together with no separator."""
+    parts, size, i = [], 0, 0
+    while size < n:
+        parts.append(record(i, 400))
+        size += len(parts[-1])
+        i += 1
+    return "".join(parts)
+
+
+def truncated_mid_string(n: int) -> str:
+    """Records cut off inside their bio string, each followed by the next."""
+    parts, size, i = [], 0, 0
+    while size < n:
+        r = record(i, 400)
+        parts.append(r[: len(r) * 2 // 3])
+        size += len(parts[-1])
+        i += 1
+    return "".join(parts) + record(i, 400)
+
+
+def deep_unclosed(n: int) -> str:
+    """Nested objects that never close."""
+    return '{"a":' * (n // 5)
+
+
+def deep_broken(n: int) -> str:
+    """Balanced nesting with a syntax error at the innermost level."""
+    d = n // 6
+    return '{"a":' * d + "x" + "}" * d
+
+
+def broken_siblings(n: int) -> str:
+    """Unclosed wrapper around many objects, each with a syntax error near its end."""
+    item = '{"k": {"v": [1, 2, 3, 4, 5, 6, 7, 8]}, "bad": ,}'
+    return '{"items": [' + ", ".join([item] * (n // (len(item) + 2)))
+
+
+CASES = [
+    ("concatenated", concatenated),
+    ("truncated mid-string", truncated_mid_string),
+    ("deep unclosed", deep_unclosed),
+    ("deep broken", deep_broken),
+    ("broken siblings", broken_siblings),
+]
+
+
+def fmt_ms(seconds: float) -> str:
+    return f"{seconds * 1000:,.2f} ms"
+
+
+def timed(fn, line: str, budget: float) -> tuple[float | None, int | str]:
+    """Best of up to 3 runs; returns (seconds, objects) or (None, reason)."""
+    best = None
+    result: int | str = 0
+    for _ in range(3):
+        t0 = time.perf_counter()
+        try:
+            out = fn(line)
+        except RecursionError:
+            return None, "RecursionError"
+        elapsed = time.perf_counter() - t0
+        result = len(out[0] if isinstance(out, tuple) else out)
+        best = elapsed if best is None else min(best, elapsed)
+        if elapsed > budget:
+            break
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time old vs single-scan JSON line recovery on pathological inputs.",
+    )
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[2000, 8000, 32000],
+        help="approximate line lengths in chars (default: 2000 8000 32000)",
+    )
+    parser.add_argument(
+        "--budget", type=float, default=10.0,
+        help="seconds after which a slow implementation is not re-run (default: 10)",
+    )
+    args = parser.parse_args()
+
+    log_phase("Timing recovery")
+    table = Table(show_edge=False, pad_edge=False)
+    table.add_column("Case")
+    table.add_column("Chars", justify="right")
+    table.add_column("Old", justify="right")
+    table.add_column("Scan", justify="right")
+    table.add_column("Objects old/scan", justify="right")
+    mismatched = []
+    for name, make in CASES:
+        for n in args.sizes:
+            line = make(n)
+            t_old, r_old = timed(split_concatenated_json_old, line, args.budget)
+            t_new, r_new = timed(split_concatenated_json, line, args.budget)
+            if isinstance(r_old, int) and r_old != r_new:
+                mismatched.append(f"{name} @ {n}")
+            table.add_row(
+                name,
+                f"{len(line):,}",
+                fmt_ms(t_old) if t_old is not None else f"[red]{r_old}",
+                fmt_ms(t_new) if t_new is not None else f"[red]{r_new}",
+                f"{r_old}/{r_new}" if isinstance(r_old, int) else f"—/{r_new}",
+            )
+    console.print(table)
+    log_info("Times are per line (best of up to 3 runs).")
+    if mismatched:
+        log_warn(f"Object counts differ: {', '.join(mismatched)}")
+    else:
+        log_ok("Object counts match wherever the old strategy finished")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""Benchmark: per-string cost of text normalization before and after lib/normalize.
+
+Usage:
+    uv run python bench/bench_normalize.py
+    uv run python bench/bench_normalize.py data/training/context_17k.jsonl
+    uv run python bench/bench_normalize.py -n 5 data/eval/context_top100.jsonl
+
+Times the three pipeline stages that normalize text — scrape_clean's
+clean_string, build_prompts' HTML/URL stripping and quality_check's unicode
+cleanup — against the separate re.sub passes they used before. The "before"
+implementations are reproduced here. Outputs are compared first;
+clean_string may differ only on the documented edge cases (control chars
+embedded inside tags or entity names, phantom chars produced by numeric
+entities), which are counted and reported.
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+import unicodedata
+from pathlib import Path
+
+from rich.table import Table
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "eval"))
+sys.path.insert(0, str(ROOT / "bench"))
+
+from lib import normalize
+from lib.log import log_phase, log_info, log_ok, log_warn, log_err, console
+
+import build_prompts
+import scrape_clean
+from bench_genius_junk import load_corpus, WORDS
+
+# ── Before: the separate regex passes each stage used to run ─────
+
+OLD_PHANTOM = re.compile(f"[{re.escape(normalize.PHANTOM_CHARS)}]")
+OLD_CONTROL = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+
+
+def old_decode_html_entity(m: re.Match) -> str:
+    full = m.group(0)
+    if full in normalize.HTML_ENTITY_MAP:
+        return normalize.HTML_ENTITY_MAP[full]
+    if m.group(1):
+        try:
+            return chr(int(m.group(1)))
+        except (ValueError, OverflowError):
+            return ""
+    if m.group(2):
+        try:
+            return chr(int(m.group(2), 16))
+        except (ValueError, OverflowError):
+            return ""
+    return full
+
+
+def old_clean_string(s: str) -> str:
+    s = unicodedata.normalize("NFC", s)
+    s = OLD_PHANTOM.sub("", s)
+    s = normalize.HTML_TAG.sub("", s)
+    s = normalize.HTML_ENTITY.sub(old_decode_html_entity, s)
+    s = OLD_CONTROL.sub("", s)
+    s = scrape_clean.strip_genius_junk(s)
+    s = re.sub(r"https?://\S+", "", s)
+    s = normalize.EMOJI_SPAM.sub("", s)
+    s = normalize.MULTI_SPACE.sub(" ", s)
+    return s.strip()
+
+
+def old_build_strip(s: str) -> str:
+    s = re.sub(r"<[^>]+>", "", s)
+    return re.sub(r"https?://\S+", "", s).strip()
+
+
+OLD_UNICODE_JUNK = re.compile(
+    "[\u00ad\u200b-\u200f\u2028-\u2029\u202a-\u202e\u2066-\u2069\ufeff]"
+)
+
+
+def old_clean_text(s: str) -> str:
+    s = s.replace("\u00a0", " ")
+    return OLD_UNICODE_JUNK.sub("", s)
+
+
+# ── After ────────────────────────────────────────────────────
+
+
+def new_build_strip(s: str) -> str:
+    return build_prompts.strip_urls(build_prompts.strip_html(s))
+
+
+# ── Corpus ───────────────────────────────────────────────────
+
+NOISE = [
+    "<i>", "</i>", "<a href=\"https://genius.com/x\">", "</a>", "&amp;", "&quot;",
+    "&#8217;", "&#x2014;", "\u200b", "\u00ad", "\u00a0", "\u2028", "\x07",
+    "https://t.co/abc123", "\U0001f525\U0001f525\U0001f525", "  ", "\u202e",
+]
+
+
+def synthetic_corpus(n: int, seed: int = 0) -> list[str]:
+    """Short metadata strings and bio-sized prose, a third of it noisy."""
+    rng = random.Random(seed)
+    strings = []
+    for i in range(n):
+        n_words = rng.randint(1, 12) if i % 3 else rng.randint(20, 400)
+        tokens = [rng.choice(WORDS) for _ in range(n_words)]
+        if i % 3 == 0:
+            for _ in range(max(1, n_words // 10)):
+                tokens.insert(rng.randrange(len(tokens) + 1), rng.choice(NOISE))
+        strings.append(" ".join(tokens))
+    return strings
+
+
+def bench(fn, strings: list[str], repeat: int) -> float:
+    """Return the best wall-clock time over `repeat` full passes."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for s in strings:
+            fn(s)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare per-string normalization cost before and after the "
+                    "shared lib/normalize module, on a context JSONL or a synthetic corpus.",
+    )
+    parser.add_argument(
+        "input", type=Path, nargs="?", default=None,
+        help="context JSONL to draw strings from (default: synthetic corpus)",
+    )
+    parser.add_argument(
+        "-n", "--repeat", type=int, default=3,
+        help="timed passes per implementation; the best is reported (default: 3)",
+    )
+    parser.add_argument(
+        "--size", type=int, default=20000,
+        help="number of synthetic strings when no input is given (default: 20000)",
+    )
+    args = parser.parse_args()
+
+    log_phase("Loading corpus")
+    if args.input:
+        if not args.input.exists():
+            log_err(f"Input file not found: {args.input}")
+            sys.exit(1)
+        strings = load_corpus(args.input)
+        log_ok(f"{len(strings):,} strings from {args.input.name}")
+    else:
+        strings = synthetic_corpus(args.size)
+        log_ok(f"{len(strings):,} synthetic strings")
+    log_info(f"{sum(len(s) for s in strings):,} chars")
+
+    stages = [
+        ("scrape_clean.clean_string", old_clean_string, scrape_clean.clean_string),
+        ("build_prompts strip html+urls", old_build_strip, new_build_strip),
+        ("quality_check.clean_text", old_clean_text, normalize.clean_invisible),
+    ]
+
+    log_phase("Checking equivalence")
+    for name, old, new in stages:
+        diffs = sum(1 for s in strings if old(s) != new(s))
+        if not diffs:
+            log_ok(f"{name}: identical")
+        elif name.startswith("build_prompts"):
+            # The shared HTML_TAG needs a letter after "<", so "a <3 b>" survives
+            log_warn(f"{name}: {diffs} strings differ (stricter tag pattern)")
+        else:
+            log_warn(f"{name}: {diffs} strings differ")
+
+    log_phase(f"Timing (best of {args.repeat})")
+    table = Table(show_edge=False, pad_edge=False)
+    table.add_column("Stage")
+    table.add_column("Before", justify="right")
+    table.add_column("After", justify="right")
+    table.add_column("Speedup", justify="right")
+    for name, old, new in stages:
+        t_old = bench(old, strings, args.repeat)
+        t_new = bench(new, strings, args.repeat)
+        table.add_row(
+            name,
+            f"{t_old / len(strings) * 1e6:.2f} µs",
+            f"{t_new / len(strings) * 1e6:.2f} µs",
+            f"{t_old / t_new:.1f}×",
+        )
+    console.print(table)
+    log_info("Per-string cost; build_prompts runs its stage on scrape_clean'd "
+             "records too.")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,20 +6,28 @@ Mirrors the prompt-building logic from the Swift app:
 - AppleIntelligenceService.swift (final prompt format)
 - Personality.swift (system instructions)
 
-Output: one JSON object per line with { "id", "prompt" }
+Output: one JSON object per line with { "id", "prompt" }. IDs are derived
+from the track identity and the context sections (not the appended task
+prompt), so the same context gets the same ID on every run and across
+instruction versions.
 """
 
 import argparse
+import hashlib
 import json
 import re
 import sys
 import uuid
+from collections.abc import Iterable, Iterator
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT))
 
 from lib.log import log_phase, log_info, log_ok, log_warn, log_err, log_file, log_timer
+from lib import normalize
 
 DATA_DIR = ROOT / "data"
 
@@ -32,12 +40,16 @@ JUNK_PHRASES = [
 ]
 
 
+# Looser than normalize.HTML_TAG: comments and stray "<...>" runs go too
+ANY_TAG = re.compile(r"<[^>]+>")
+
+
 def strip_html(html: str) -> str:
-    return re.sub(r"<[^>]+>", "", html)
+    return ANY_TAG.sub("", html) if "<" in html else html
 
 
 def strip_urls(text: str) -> str:
-    return re.sub(r"https?://\S+", "", text).strip()
+    return normalize.strip_urls(text).strip()
 
 
 CTA_PHRASES = [
@@ -52,6 +64,18 @@ CTA_PHRASES = [
 ]
 
 
+# Fixed namespace for prompt IDs — changing it changes every ID
+PROMPT_ID_NAMESPACE = uuid.UUID("5b1f0c3e-7a2d-4e61-9c84-2f6d1a9b0e47")
+
+
+def prompt_id(entry: dict, context: str) -> str:
+    """Stable UUID for a prompt, from the track identity and its context text."""
+    song_id = ((entry.get("musickit") or {}).get("song") or {}).get("id")
+    identity = [song_id, entry.get("track"), entry.get("artist"), entry.get("album")]
+    key = json.dumps([identity, context], ensure_ascii=False)
+    return str(uuid.uuid5(PROMPT_ID_NAMESPACE, key))
+
+
 def is_junk(text: str) -> bool:
     return any(phrase in text for phrase in JUNK_PHRASES)
 
@@ -60,7 +84,38 @@ def is_cta(text: str) -> bool:
     return any(phrase in text for phrase in CTA_PHRASES)
 
 
-def build_prompt(entry: dict) -> dict | None:
+# Cleaned section text is memoized on the raw string: artist bios and artist
+# editorial notes repeat on every track by that artist, and chart data is
+# skewed toward a few artists. Bounded so a 17k-line context file can't grow
+# the cache without limit.
+SECTION_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=SECTION_CACHE_SIZE)
+def clean_prose(text: str) -> str | None:
+    """Wiki summary / bio text with URLs stripped, or None if it is junk."""
+    if is_junk(text):
+        return None
+    return strip_urls(text)
+
+
+@lru_cache(maxsize=SECTION_CACHE_SIZE)
+def clean_editorial(text: str) -> str | None:
+    """Editorial notes with HTML stripped, or None if they are a marketing CTA.
+
+    Runs on scrape_clean'd context too: it decodes entities after stripping
+    tags, so "&lt;i&gt;" comes out of it as a real tag.
+    """
+    text = strip_html(text)
+    return None if is_cta(text) else text
+
+
+# Sections that repeat across tracks by the same artist or on the same album
+SHARED_SECTIONS = {"ArtistBio", "Album Editorial", "Artist Editorial"}
+
+
+def build_sections(entry: dict) -> list[tuple[str, str]] | None:
+    """Prompt sections as (name, block) pairs, or None for thin context."""
     mk = entry.get("musickit") or {}
     genius = entry.get("genius") or {}
     song = mk.get("song") or {}
@@ -70,16 +125,21 @@ def build_prompt(entry: dict) -> dict | None:
     genius_artist = genius.get("artist") or {}
     genius_trivia = genius.get("trivia") or {}
 
-    # Filter: require at least one rich text source beyond basic metadata
     wiki_raw = genius_track.get("wikiSummary")
-    has_wiki = wiki_raw and not is_junk(wiki_raw)
-    bio = genius_artist.get("bio")
-    has_bio = bio and not is_junk(bio)
-    has_editorial = bool(album.get("editorialNotesShort") or artist_mk.get("editorialNotesShort"))
-    if not (has_wiki or has_bio or has_editorial):
+    wiki = clean_prose(wiki_raw) if wiki_raw else None
+    bio_raw = genius_artist.get("bio")
+    bio = clean_prose(bio_raw) if bio_raw else None
+    album_editorial = album.get("editorialNotesShort")
+    artist_editorial = artist_mk.get("editorialNotesShort")
+
+    # Filter: require at least one rich text source beyond basic metadata
+    if wiki is None and bio is None and not (album_editorial or artist_editorial):
         return None
 
-    sections: list[str] = []
+    sections: list[tuple[str, str]] = []
+
+    def add(name: str, text: str) -> None:
+        sections.append((name, f"[{name}]\n{text}\n[End {name}]"))
 
     # Song — identity + basic metadata
     song_parts = [entry["track"], entry["artist"], entry["album"]]
@@ -89,38 +149,257 @@ def build_prompt(entry: dict) -> dict | None:
     release = song.get("releaseDate")
     if release:
         song_parts.append(f"Released: {release[:10]}")
-    sections.append(f"[Song]\n" + "\n".join(song_parts) + "\n[End Song]")
+    add("Song", "\n".join(song_parts))
 
     # Track description — position 2 (primacy); model's primary source
-    wiki = genius_track.get("wikiSummary")
-    if wiki and not is_junk(wiki):
-        sections.append(f"[TrackDescription]\n{strip_urls(wiki)}\n[End TrackDescription]")
+    if wiki is not None:
+        add("TrackDescription", wiki)
 
     # Artist bio — middle position (lowest attention on 3B)
-    bio = genius_artist.get("bio")
-    if bio and not is_junk(bio):
-        sections.append(f"[ArtistBio]\n{strip_urls(bio)}\n[End ArtistBio]")
+    if bio is not None:
+        add("ArtistBio", bio)
 
     # Editorial — drop blocks with marketing CTAs
-    album_editorial = album.get("editorialNotesShort")
-    if album_editorial and not is_cta(strip_html(album_editorial)):
-        sections.append(f"[Album Editorial]\n{strip_html(album_editorial)}\n[End Album Editorial]")
+    if album_editorial:
+        text = clean_editorial(album_editorial)
+        if text is not None:
+            add("Album Editorial", text)
 
-    artist_editorial = artist_mk.get("editorialNotesShort")
-    if artist_editorial and not is_cta(strip_html(artist_editorial)):
-        sections.append(f"[Artist Editorial]\n{strip_html(artist_editorial)}\n[End Artist Editorial]")
+    if artist_editorial:
+        text = clean_editorial(artist_editorial)
+        if text is not None:
+            add("Artist Editorial", text)
 
     # Samples
     samples = genius_trivia.get("samples", [])
     if samples:
-        sections.append(f"[Samples Used]\n{'; '.join(samples)}\n[End Samples Used]")
+        add("Samples Used", "; ".join(samples))
 
     sampled_by = genius_trivia.get("sampledBy", [])
     if sampled_by:
-        sections.append(f"[Sampled By]\n{'; '.join(sampled_by)}\n[End Sampled By]")
+        add("Sampled By", "; ".join(sampled_by))
+
+    return sections
 
 
-    return {"id": str(uuid.uuid4()), "prompt": "\n\n".join(sections)}
+def assemble(entry: dict, sections: list[tuple[str, str]]) -> dict:
+    context = "\n\n".join(block for _, block in sections)
+    return {"id": prompt_id(entry, context), "prompt": context}
+
+
+def build_prompt(entry: dict) -> dict | None:
+    sections = build_sections(entry)
+    return None if sections is None else assemble(entry, sections)
+
+
+# ── Streaming pipeline ───────────────────────────────────────
+# Each stage pulls one item at a time from the previous one, so memory stays
+# flat and --limit stops reading the input as soon as enough prompts exist.
+
+
+def read_entries(path: Path, stats: dict[str, int]) -> Iterator[dict]:
+    """Yield parsed context entries, counting read and malformed lines."""
+    with path.open() as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            stats["read"] += 1
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                stats["malformed"] += 1
+
+
+def build_prompts(entries: Iterable[dict], stats: dict[str, int]) -> Iterator[dict]:
+    """Yield prompts for entries with enough context, counting the rest.
+
+    Duplicate context lines produce the same ID; only the first is kept so
+    IDs stay unique keys downstream. Each prompt also carries its "sections"
+    list for the side-table writer.
+    """
+    seen: set[str] = set()
+    for entry in entries:
+        sections = build_sections(entry)
+        if sections is None:
+            stats["skipped"] += 1
+            continue
+        result = assemble(entry, sections)
+        if result["id"] in seen:
+            stats["duplicate"] += 1
+            continue
+        seen.add(result["id"])
+        result["sections"] = sections
+        yield result
+
+
+# ── Versions ─────────────────────────────────────────────────
+
+VERSION_RANGE = re.compile(r"^([a-z]*)(\d+)(?:-|\.\.)\1?(\d+)$")
+
+
+def parse_versions(spec: str) -> list[str]:
+    """Expand "v17", "v15,v17" or "v15-v18" / "v15..v18" into version tags."""
+    versions: list[str] = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        m = VERSION_RANGE.match(part)
+        if m:
+            prefix, lo, hi = m.group(1), int(m.group(2)), int(m.group(3))
+            if lo > hi:
+                raise ValueError(f"empty version range: {part}")
+            versions.extend(f"{prefix}{n}" for n in range(lo, hi + 1))
+        else:
+            versions.append(part)
+    return list(dict.fromkeys(versions))
+
+
+def load_task_prompt(version: str) -> str | None:
+    """Task prompt from prompts/fm_instruction_<version>.json; exits if missing."""
+    instruction_path = DATA_DIR.parent / "prompts" / f"fm_instruction_{version}.json"
+    if not instruction_path.exists():
+        log_err(f"Not found: {instruction_path}")
+        sys.exit(1)
+    task_prompt = json.loads(instruction_path.read_text()).get("prompt")
+    if task_prompt:
+        log_info(f"Using prompt template from {instruction_path.name}")
+    return task_prompt
+
+
+def version_output(output: Path, version: str) -> Path:
+    """<stem>_<version><suffix> next to output, for multi-version builds."""
+    return output.with_name(f"{output.stem}_{version}{output.suffix}")
+
+
+def with_task(prompts: Iterable[dict], task: str | None) -> Iterator[dict]:
+    """{"id", "prompt"} records exactly as write_prompts writes them with `task`."""
+    for r in prompts:
+        yield {"id": r["id"], "prompt": f"{r['prompt']}\n\n{task}" if task else r["prompt"]}
+
+
+def log_stats(stats: dict[str, int], path: Path) -> None:
+    log_info(f"Read {stats['read']} context entries from {path.name}")
+    if stats["malformed"]:
+        log_warn(f"Skipped {stats['malformed']} malformed lines")
+    if stats["duplicate"]:
+        log_warn(f"Skipped {stats['duplicate']} duplicate contexts")
+
+
+def build_version(context: Path, version: str | None = None, limit: int | None = None) -> list[dict]:
+    """In-memory {"id", "prompt"} records for one instruction version.
+
+    The same records main() writes for a single -v, for callers that pass
+    prompts on without re-reading them from disk (run_eval.py).
+    """
+    stats = {"read": 0, "malformed": 0, "skipped": 0, "duplicate": 0}
+    prompts = build_prompts(read_entries(context, stats), stats)
+    if limit is not None:
+        prompts = islice(prompts, limit)
+    records = list(with_task(prompts, load_task_prompt(version) if version else None))
+    log_stats(stats, context)
+    log_ok(f"Built {len(records)} prompts (skipped {stats['skipped']} thin-context tracks)")
+    return records
+
+
+def write_prompts(prompts: Iterable[dict], targets: dict[Path, str | None]) -> int:
+    """Write each prompt to every target file, appending that file's task prompt.
+
+    The context is JSON-encoded once per prompt and each task prompt once per
+    run; a JSON string can be split anywhere between characters, so the two
+    encodings are joined by trimming the quotes where they meet.
+    """
+    suffixes = {
+        path: json.dumps("\n\n" + task, ensure_ascii=False)[1:] if task else '"'
+        for path, task in targets.items()
+    }
+    files = {path: path.open("w") for path in targets}
+    written = 0
+    try:
+        for r in prompts:
+            head = f'{{"id": {json.dumps(r["id"])}, "prompt": '
+            body = json.dumps(r["prompt"], ensure_ascii=False)[:-1]
+            for path, f in files.items():
+                f.write(head + body + suffixes[path] + "}\n")
+            written += 1
+    finally:
+        for f in files.values():
+            f.close()
+    return written
+
+
+# ── Side table ───────────────────────────────────────────────
+# With --side-table each prompt line stores its parts instead of the full
+# text: {"id", "parts": [block | {"ref": key}, ...]}, joined with blank
+# lines. Per-artist/album sections and the task prompt are written once to
+# <stem>.sections.jsonl as {"ref", "text"} and referenced by key.
+# expand_prompts() (or --expand) turns the pair back into {"id", "prompt"}.
+
+
+def sections_path(path: Path) -> Path:
+    return path.with_name(f"{path.stem}.sections.jsonl")
+
+
+def section_ref(text: str) -> str:
+    return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+
+
+def write_side_table(prompts: Iterable[dict], targets: dict[Path, str | None]) -> int:
+    """Write prompts as parts, with shared sections stored once per target."""
+    outs = {}
+    for path, task in targets.items():
+        task_ref = section_ref(task) if task else None
+        outs[path] = (path.open("w"), sections_path(path).open("w"), set(), task, task_ref)
+    written = 0
+    try:
+        for r in prompts:
+            for f, table, seen, task, task_ref in outs.values():
+                parts: list[str | dict] = []
+                for name, block in r["sections"]:
+                    if name not in SHARED_SECTIONS:
+                        parts.append(block)
+                        continue
+                    ref = section_ref(block)
+                    if ref not in seen:
+                        seen.add(ref)
+                        table.write(json.dumps({"ref": ref, "text": block}, ensure_ascii=False) + "\n")
+                    parts.append({"ref": ref})
+                if task:
+                    if task_ref not in seen:
+                        seen.add(task_ref)
+                        table.write(json.dumps({"ref": task_ref, "text": task}, ensure_ascii=False) + "\n")
+                    parts.append({"ref": task_ref})
+                f.write(json.dumps({"id": r["id"], "parts": parts}, ensure_ascii=False) + "\n")
+            written += 1
+    finally:
+        for f, table, *_ in outs.values():
+            f.close()
+            table.close()
+    return written
+
+
+def expand_prompts(path: Path) -> Iterator[dict]:
+    """Yield {"id", "prompt"} from a prompts file, resolving side-table refs.
+
+    Files written without --side-table pass through unchanged.
+    """
+    table: dict[str, str] = {}
+    if sections_path(path).exists():
+        with sections_path(path).open() as f:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    table[row["ref"]] = row["text"]
+    with path.open() as f:
+        for line in f:
+            if not line.strip():
+                continue
+            r = json.loads(line)
+            if "parts" in r:
+                text = [p if isinstance(p, str) else table[p["ref"]] for p in r["parts"]]
+                r = {"id": r["id"], "prompt": "\n\n".join(text)}
+            yield r
 
 
 def main():
@@ -130,7 +409,11 @@ def main():
 examples:
   uv run python eval/build_prompts.py data/eval/context_top100.jsonl
   uv run python eval/build_prompts.py data/eval/context_top100.jsonl -v v17
-  uv run python eval/build_prompts.py data/eval/context_top100.jsonl -v v17 -l 20 -o out.jsonl""",
+  uv run python eval/build_prompts.py data/eval/context_top100.jsonl -v v17 -l 20 -o out.jsonl
+  uv run python eval/build_prompts.py data/eval/context_top100.jsonl -v v15-v18 -o out.jsonl
+      (writes out_v15.jsonl … out_v18.jsonl from a single pass over the context)
+  uv run python eval/build_prompts.py data/eval/context_top100.jsonl -v v17 --side-table -o out.jsonl
+  uv run python eval/build_prompts.py out.jsonl --expand -o out_full.jsonl""",
         formatter_class=argparse.RawDescriptionHelpFormatter,
     )
     parser.add_argument(
@@ -140,7 +423,8 @@ examples:
     )
     parser.add_argument(
         "-o", "--output", type=Path, default=None,
-        help="output JSONL path (default: <input_stem>_prompts.jsonl in the same directory)",
+        help="output JSONL path (default: <input_stem>_prompts.jsonl in the same "
+             "directory); with several versions, _<version> is added to the stem",
     )
     parser.add_argument(
         "-l", "--limit", type=int, default=None,
@@ -149,7 +433,18 @@ examples:
     parser.add_argument(
         "-v", "--version", type=str, default=None,
         help="version tag (e.g. v17) — loads the task prompt from "
-             "prompts/fm_instruction_<version>.json and appends it to each prompt",
+             "prompts/fm_instruction_<version>.json and appends it to each prompt. "
+             "Accepts a list (v15,v17) or range (v15-v18) to build one file per version",
+    )
+    parser.add_argument(
+        "--side-table", action="store_true",
+        help="store artist/album sections and the task prompt once in "
+             "<output_stem>.sections.jsonl and reference them from each prompt",
+    )
+    parser.add_argument(
+        "--expand", action="store_true",
+        help="treat input as a --side-table prompts file and write it back out "
+             "as full {id, prompt} lines (default: <input_stem>_expanded.jsonl)",
     )
     args = parser.parse_args()
 
@@ -161,53 +456,53 @@ examples:
         log_err(f"--limit must be a positive integer, got {args.limit}")
         sys.exit(1)
 
+    versions: list[str] = []
+    if args.version:
+        try:
+            versions = parse_versions(args.version)
+        except ValueError as e:
+            log_err(f"Invalid --version: {e}")
+            sys.exit(1)
+
+    if args.expand:
+        output = args.output or args.input.parent / f"{args.input.stem}_expanded.jsonl"
+        log_phase("Expanding prompts")
+        prompts = expand_prompts(args.input)
+        if args.limit is not None:
+            prompts = islice(prompts, args.limit)
+        written = write_prompts(prompts, {output: None})
+        log_ok(f"Wrote {written} prompts")
+        log_file(output)
+        return
+
     output = args.output or args.input.parent / f"{args.input.stem}_prompts.jsonl"
 
     log_phase("Building FM prompts")
 
     with log_timer("Prompt building"):
-        # Load prompt template from instruction file if version specified
-        task_prompt = None
-        if args.version:
-            instruction_path = DATA_DIR.parent / "prompts" / f"fm_instruction_{args.version}.json"
-            if not instruction_path.exists():
-                log_err(f"Not found: {instruction_path}")
-                sys.exit(1)
-            instruction = json.loads(instruction_path.read_text())
-            task_prompt = instruction.get("prompt")
-            if task_prompt:
-                log_info(f"Using prompt template from {instruction_path.name}")
-
-        entries = []
-        malformed = 0
-        for line in args.input.read_text().split("\n"):
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                entries.append(json.loads(line))
-            except json.JSONDecodeError:
-                malformed += 1
-        log_info(f"Loaded {len(entries)} context entries from {args.input.name}")
-        if malformed:
-            log_warn(f"Skipped {malformed} malformed lines")
-        results = [build_prompt(e) for e in entries]
-        skipped = results.count(None)
-        results = [r for r in results if r is not None]
-
-        if task_prompt:
-            for r in results:
-                r["prompt"] += "\n\n" + task_prompt
-
+        # Load prompt templates from instruction files if versions specified
+        if len(versions) > 1:
+            targets = {version_output(output, v): load_task_prompt(v) for v in versions}
+        else:
+            targets = {output: load_task_prompt(versions[0]) if versions else None}
+
+        stats = {"read": 0, "malformed": 0, "skipped": 0, "duplicate": 0}
+        prompts = build_prompts(read_entries(args.input, stats), stats)
         if args.limit is not None:
-            results = results[:args.limit]
+            prompts = islice(prompts, args.limit)
+
+        if args.side_table:
+            written = write_side_table(prompts, targets)
+        else:
+            written = write_prompts(prompts, targets)
 
-        with output.open("w") as f:
-            for r in results:
-                f.write(json.dumps(r, ensure_ascii=False) + "\n")
+        log_stats(stats, args.input)
 
-    log_ok(f"Wrote {len(results)} prompts (skipped {skipped} thin-context tracks)")
-    log_file(output)
+    log_ok(f"Wrote {written} prompts (skipped {stats['skipped']} thin-context tracks)")
+    for path in targets:
+        log_file(path)
+        if args.side_table:
+            log_file(sections_path(path))
 
 
 if __name__ == "__main__":
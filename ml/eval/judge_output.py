@@ -7,41 +7,79 @@ Usage:
     uv run python eval/judge_output.py -l 5 -p 2 data/eval/output_v14_*.jsonl
 
 Scores each prompt/response pair on 5 dimensions (0-3), flags failure
-patterns, updates data/eval/version_rank.md and writes per-response details
-to data/eval/vrank/{version}_details.md.
-
-Re-running the same version replaces previous results.
+patterns, records every pass in the score store (data/eval/scores.db, see
+score_store.py) and renders data/eval/version_rank.md and per-response
+details in data/eval/vrank/{version}_details.md from it.
+
+Entries are split into chunks that fit an estimated token budget, and the
+chunks of every pass are judged concurrently; scores are stitched back
+together by ID. Per-response scores are cached in data/eval/judge.cache.db,
+so re-running over unchanged responses costs no API tokens (--no-cache to
+re-judge). With --batch the requests go through the Message Batches API
+instead, and an interrupted run resumes the saved batch. With --stream each
+score is checkpointed as it arrives and truncated responses are retried for
+the missing entries only. --screen takes the P/C/E flags from the local
+screener in screen_output.py and reports where the judge disagreed;
+--skip-broken scores empty, refusal and copied responses zero without
+sending them to the judge. In every mode the screener's grounding suspects
+(names, years and titles missing from the context) are added to each entry
+so the judge checks them for H/M (--no-hints to leave them out);
+--suspects-only judges just those entries.
+--adaptive judges random genre-stratified rounds and stops once the bootstrap
+CI on the total score and the flag rates is narrow enough.
+
+Aggregation runs on numpy arrays of passes × items × dimensions with a flag
+bitmask (score_store.ScoreArray). Every run gets a bootstrap CI over items,
+and --baseline adds a paired per-item comparison with an earlier version.
+
+Re-running a version adds a new run to the store; the reports show the latest
+run of each version.
 """
 
 import argparse
+import hashlib
 import json
+import random
 import re
+import sqlite3
 import sys
+import threading
 import time
-from datetime import date
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime, timezone
 from pathlib import Path
 
 import anthropic
+import numpy as np
 import pydantic
 from rich.table import Table
 
 ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "eval"))
 
 from lib.log import log_phase, log_info, log_ok, log_warn, log_err, log_file, log_duration, fmt_duration, console, err_console
 
+from score_store import (
+    DIMS, FLAG_CODES, REPORT_FLAG_CODES, BOOTSTRAP_RESAMPLES,
+    extract_genre, ScoreArray, flag_bits, merge_passes, compute_summary, bootstrap_means,
+    percentile_interval, paired_test, fmt_ci, open_store, record_run, latest_run,
+    compare_runs, render_rank, render_details,
+)
+from screen_output import screen, broken_score, apply_screen
+
 DATA_DIR = ROOT / "data" / "eval"
-RANK_FILE = DATA_DIR / "version_rank.md"
-DETAILS_DIR = DATA_DIR / "vrank"
-DIMS = ["faith", "ground", "tone", "conc", "acc"]
-FLAG_CODES = "PHECM"
-FLAG_NAMES = {
-    "P": "preamble",
-    "H": "hallucination",
-    "E": "echo",
-    "C": "CTA-parrot",
-    "M": "misattribution",
-}
+JUDGE_MODEL = "claude-sonnet-4-5-20250929"
+MAX_TOKENS = 16384
+
+# Chunking — token counts are estimated at ~4 chars/token. Each score object
+# costs roughly OUTPUT_TOKENS_PER_SCORE output tokens, so a chunk is also
+# capped to leave headroom under MAX_TOKENS.
+CHARS_PER_TOKEN = 4
+OUTPUT_TOKENS_PER_SCORE = 160
+CHUNK_TOKENS = 24000
+MAX_SCORES_PER_CHUNK = int(MAX_TOKENS * 0.75) // OUTPUT_TOKENS_PER_SCORE
+CONCURRENCY = 4
 
 FLAG_COLORS = {
     "P": "yellow",
@@ -138,25 +176,26 @@ Score each response below against its prompt context.
 
 {responses}"""
 
+# Grounding hints from screen_output.py, appended to an entry's response block
+HINT_PREFIX = "**Local check — not found in the context, verify before flagging H/M:** "
+
 
 def extract_version(path: Path) -> str:
     m = re.search(r"(v\d+)", path.stem)
     return m.group(1) if m else path.stem
 
 
-def extract_genre(prompt: str) -> str:
-    m = re.search(r"Genre:\s*(.+)", prompt)
-    return m.group(1).strip() if m else "?"
-
-
-def build_responses_block(entries: list[dict]) -> str:
+def build_responses_block(items: list[tuple[int, dict]]) -> str:
     parts = []
-    for i, e in enumerate(entries, 1):
-        parts.append(
+    for i, e in items:
+        part = (
             f"### {i}\n"
             f"**Prompt:**\n{e['prompt']}\n\n"
             f"**Response:**\n{e['response']}"
         )
+        if e.get("suspects"):
+            part += f"\n\n{HINT_PREFIX}{', '.join(e['suspects'])}"
+        parts.append(part)
     return "\n\n".join(parts)
 
 
@@ -175,121 +214,551 @@ class ScoreResponse(pydantic.BaseModel):
     scores: list[ScoreItem]
 
 
-def call_judge(client: anthropic.Anthropic, user: str) -> tuple[list[dict], dict]:
-    """Send the eval prompt to the API and return (parsed scores, usage dict)."""
-    log_phase("Calling Anthropic API (claude-sonnet-4-5-20250929)")
-    total_len = len(SYSTEM_PROMPT) + len(user)
-    log_info(f"System: {len(SYSTEM_PROMPT):,} chars · User: {len(user):,} chars (~{total_len // 4:,} tokens)")
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def chunk_entries(
+    items: list[tuple[int, dict]], budget: int = CHUNK_TOKENS
+) -> list[list[tuple[int, dict]]]:
+    """Split (id, entry) pairs into chunks that fit the token budget.
+
+    IDs are 1-based positions in the full entry list, so every chunk's scores
+    carry global IDs. An entry larger than the budget gets a chunk of its own.
+    """
+    fixed = estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(USER_PROMPT)
+    chunks: list[list[tuple[int, dict]]] = []
+    current: list[tuple[int, dict]] = []
+    used = fixed
+    for i, e in items:
+        cost = estimate_tokens(e["prompt"]) + estimate_tokens(e["response"]) + 8
+        if current and (used + cost > budget or len(current) >= MAX_SCORES_PER_CHUNK):
+            chunks.append(current)
+            current, used = [], fixed
+        current.append((i, e))
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def judge_params(user: str) -> dict:
+    """Request parameters shared by the synchronous and batch judge paths."""
+    return {
+        "model": JUDGE_MODEL,
+        "temperature": 0,
+        "max_tokens": MAX_TOKENS,
+        "system": [{"type": "text", "text": SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}],
+        "messages": [{"role": "user", "content": [{"type": "text", "text": user, "cache_control": {"type": "ephemeral"}}]}],
+    }
+
+
+def score_output_config() -> dict:
+    """Structured-output config for ScoreResponse, as messages.parse would send it."""
+    schema = anthropic.transform_schema(ScoreResponse.model_json_schema())
+    return {"format": {"type": "json_schema", "schema": schema}}
+
+
+def usage_dict(u) -> dict:
+    cache_read = u.cache_read_input_tokens or 0
+    cache_create = u.cache_creation_input_tokens or 0
+    return {
+        "input": u.input_tokens + cache_read + cache_create,
+        "output": u.output_tokens,
+        "cache_read": cache_read,
+        "cache_create": cache_create,
+    }
+
+
+class JudgeError(Exception):
+    """A judge request that returned no usable scores; `usage` is what it cost."""
+
+    def __init__(self, message: str, usage: dict | None = None):
+        super().__init__(message)
+        self.usage = usage or {"input": 0, "output": 0}
+
+
+class JudgeTruncated(JudgeError):
+    """The judge ran out of output tokens: the chunk is too big for one request."""
+
+
+def call_judge(client: anthropic.Anthropic, user: str, label: str = "Response") -> tuple[list[dict], dict]:
+    """Send one judge request to the API and return (parsed scores, usage dict).
 
+    Raises JudgeTruncated when the output didn't fit (the caller splits the
+    chunk and retries) and JudgeError for any other failure, so one bad
+    request doesn't end a run with others in flight.
+    """
     t0 = time.perf_counter()
-    with console.status("[bold cyan]Waiting for response…"):
-        try:
-            response = client.messages.parse(
-                model="claude-sonnet-4-5-20250929",
-                temperature=0,
-                max_tokens=16384,
-                system=[{"type": "text", "text": SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}],
-                messages=[{"role": "user", "content": [{"type": "text", "text": user, "cache_control": {"type": "ephemeral"}}]}],
-                output_format=ScoreResponse,
-            )
-        except anthropic.APIError as e:
-            elapsed = time.perf_counter() - t0
-            log_err(f"API error after {fmt_duration(elapsed)}: {e}")
-            sys.exit(1)
-        except pydantic.ValidationError as e:
-            elapsed = time.perf_counter() - t0
-            log_err(f"Response parse failed after {fmt_duration(elapsed)} — output likely truncated (raise max_tokens)")
-            log_err(str(e.errors()[0]["type"]))
-            sys.exit(1)
+    try:
+        response = client.messages.parse(**judge_params(user), output_format=ScoreResponse)
+    except anthropic.APIError as e:
+        raise JudgeError(f"API error after {fmt_duration(time.perf_counter() - t0)}: {e}") from e
+    except pydantic.ValidationError as e:
+        raise JudgeTruncated(
+            f"response parse failed after {fmt_duration(time.perf_counter() - t0)}, "
+            f"output likely truncated ({e.errors()[0]['type']})"
+        ) from e
     elapsed = time.perf_counter() - t0
 
     parsed = response.parsed_output
-    if not parsed or not parsed.scores:
-        log_err("Empty or unparseable response from API")
-        sys.exit(1)
+    usage = usage_dict(response.usage)
     if response.stop_reason == "max_tokens":
-        log_warn(f"Response hit max_tokens — got {len(parsed.scores)} scores, expected more")
-        sys.exit(1)
+        n = len(parsed.scores) if parsed else 0
+        raise JudgeTruncated(f"response hit max_tokens after {n} scores", usage)
+    if not parsed or not parsed.scores:
+        raise JudgeError("empty or unparseable response from API", usage)
 
-    u = response.usage
-    cache_read = u.cache_read_input_tokens or 0
-    cache_create = u.cache_creation_input_tokens or 0
-    usage = {"input": u.input_tokens + cache_read + cache_create, "output": u.output_tokens}
     cache_parts = []
-    if cache_read:
-        cache_parts.append(f"[green]{cache_read:,} cached[/]")
-    if cache_create:
-        cache_parts.append(f"{cache_create:,} written")
+    if usage["cache_read"]:
+        cache_parts.append(f"[green]{usage['cache_read']:,} cached[/]")
+    if usage["cache_create"]:
+        cache_parts.append(f"{usage['cache_create']:,} written")
     cache_str = f" · {' · '.join(cache_parts)}" if cache_parts else ""
     log_ok(
-        f"Response in {elapsed:.1f}s · {len(parsed.scores)} scores · "
+        f"{label} in {elapsed:.1f}s · {len(parsed.scores)} scores · "
         f"[dim]{usage['input']:,} in / {usage['output']:,} out{cache_str}[/]"
     )
     return [s.model_dump() for s in parsed.scores], usage
 
 
-def merge_passes(all_passes: list[list[dict]]) -> list[dict]:
-    """Average dimension scores across passes, majority-vote flags."""
-    n_passes = len(all_passes)
-    n_items = len(all_passes[0])
-    merged = []
-    for i in range(n_items):
-        item = {"id": all_passes[0][i]["id"]}
-        for d in DIMS:
-            item[d] = round(sum(p[i][d] for p in all_passes) / n_passes, 1)
-        # flags: majority vote (present in >50% of passes)
-        flag_counts: dict[str, int] = {}
-        for p in all_passes:
-            for f in p[i].get("flags", []):
-                flag_counts[f] = flag_counts.get(f, 0) + 1
-        item["flags"] = [f for f in FLAG_CODES if flag_counts.get(f, 0) > n_passes / 2]
-        item["note"] = all_passes[0][i].get("note", "")
-        merged.append(item)
-    return merged
+# ── Streaming ────────────────────────────────────────────────
+# --stream reads each response as it is generated and hands every complete
+# score object to a callback straight away (main appends it to a checkpoint
+# file). A response cut off by max_tokens or a dropped connection keeps the
+# scores it got, and only the IDs still missing are asked for again.
+
+STREAM_RETRIES = 2
+CHECKPOINT_DIR = DATA_DIR / "judge_checkpoints"
+
+
+class ScoreStreamParser:
+    """Pull complete objects out of a streamed {"scores": [{...}, ...]} document.
+
+    Only brace depth and string/escape state are tracked, so each character
+    is looked at once however the text is split across deltas.
+    """
+
+    def __init__(self):
+        self.buf = ""
+        self.pos = 0
+        self.in_array = False
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.start = -1
+
+    def feed(self, text: str) -> list[dict]:
+        self.buf += text
+        found = []
+        buf = self.buf
+        i = self.pos
+        if not self.in_array:
+            key = buf.find('"scores"', i)
+            bracket = buf.find("[", key) if key >= 0 else -1
+            if bracket < 0:
+                return found
+            self.in_array = True
+            i = bracket + 1
+        while i < len(buf):
+            c = buf[i]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif c == "\\":
+                    self.escape = True
+                elif c == '"':
+                    self.in_string = False
+            elif c == '"':
+                self.in_string = True
+            elif c == "{":
+                if self.depth == 0:
+                    self.start = i
+                self.depth += 1
+            elif c == "}":
+                self.depth -= 1
+                if self.depth == 0:
+                    try:
+                        found.append(json.loads(buf[self.start:i + 1]))
+                    except json.JSONDecodeError:
+                        pass
+                    self.start = -1
+            i += 1
+        # Drop everything before the object in progress
+        keep = self.start if self.start >= 0 else i
+        self.buf = buf[keep:]
+        self.pos = i - keep
+        if self.start >= 0:
+            self.start = 0
+        return found
+
+
+def stream_judge(
+    client: anthropic.Anthropic, user: str, ids: list[int], label: str = "Response", on_score=None
+) -> tuple[list[dict], dict]:
+    """Stream one judge request; return whatever scores arrived and the usage.
+
+    Truncation and API errors are reported but not fatal — the caller
+    re-requests the IDs that are missing.
+    """
+    expected = set(ids)
+    parser = ScoreStreamParser()
+    scores: list[dict] = []
+    usage = {"input": 0, "output": 0}
+    first = None
+    t0 = time.perf_counter()
+    try:
+        with client.messages.stream(**judge_params(user), output_config=score_output_config()) as stream:
+            for text in stream.text_stream:
+                for obj in parser.feed(text):
+                    try:
+                        item = ScoreItem.model_validate(obj).model_dump()
+                    except pydantic.ValidationError:
+                        continue
+                    if item["id"] not in expected:
+                        continue
+                    expected.discard(item["id"])
+                    if first is None:
+                        first = time.perf_counter() - t0
+                    scores.append(item)
+                    if on_score:
+                        on_score(item)
+            message = stream.get_final_message()
+    except anthropic.APIError as e:
+        log_warn(f"{label}: API error after {fmt_duration(time.perf_counter() - t0)}: {e} — kept {len(scores)} scores")
+        return scores, usage
+    elapsed = time.perf_counter() - t0
+
+    usage = usage_dict(message.usage)
+    first_str = f"first after {first:.1f}s · " if first is not None else ""
+    summary = (
+        f"{label} in {elapsed:.1f}s · {first_str}{len(scores)}/{len(ids)} scores · "
+        f"[dim]{usage['input']:,} in / {usage['output']:,} out[/]"
+    )
+    if message.stop_reason == "max_tokens":
+        log_warn(f"{summary} · hit max_tokens")
+    elif expected:
+        log_warn(f"{summary} · {len(expected)} missing")
+    else:
+        log_ok(summary)
+    return scores, usage
+
+
+def stitch_scores(results: list[tuple[list[int], list[dict]]]) -> tuple[list[dict], list[int]]:
+    """Combine per-chunk scores by ID; return (scores sorted by ID, missing IDs).
+
+    Each result is (ids sent, scores returned). Scores whose ID was not in
+    their chunk are dropped; duplicates keep the first.
+    """
+    by_id: dict[int, dict] = {}
+    sent: set[int] = set()
+    for ids, scores in results:
+        expected = set(ids)
+        sent |= expected
+        for s in scores:
+            if s["id"] in expected and s["id"] not in by_id:
+                by_id[s["id"]] = s
+    return [by_id[i] for i in sorted(by_id)], sorted(sent - by_id.keys())
+
+
+def judge_passes(
+    client: anthropic.Anthropic,
+    pass_chunks: list[list[list[tuple[int, dict]]]],
+    concurrency: int = CONCURRENCY,
+    on_chunk=None,
+    stream: bool = False,
+    on_score=None,
+    budget: int = CHUNK_TOKENS,
+) -> tuple[list[list[dict]], list[dict]]:
+    """Judge every chunk of every pass and stitch each pass by ID.
+
+    Passes are independent, so all (pass, chunk) requests share one pool and
+    at most `concurrency` are in flight across passes. on_chunk(pass, scores)
+    is called from this thread as each request completes. A request that
+    runs out of output tokens is split in two and both halves are sent
+    again; any other failed request leaves its entries unscored. With
+    stream=True, on_score(pass, score) is called from the worker as each
+    score arrives, and entries left unscored are re-chunked at half the
+    budget and requested again up to STREAM_RETRIES times. Returns per-pass
+    scores and per-pass usage, in pass order.
+    """
+    passes = len(pass_chunks)
+    results: list[list[tuple[list[int], list[dict]]]] = [[] for _ in range(passes)]
+    usages = [{"input": 0, "output": 0} for _ in range(passes)]
+    users: dict[tuple[int, ...], str] = {}
+    rounds = 1 + (STREAM_RETRIES if stream else 0)
+    futures: dict = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+
+        def submit(p: int, chunk: list[tuple[int, dict]], label: str) -> None:
+            ids = [i for i, _ in chunk]
+            key = tuple(ids)
+            if key not in users:
+                users[key] = USER_PROMPT.format(responses=build_responses_block(chunk))
+            if stream:
+                scored = (lambda p: lambda item: on_score(p, item))(p) if on_score else None
+                future = pool.submit(stream_judge, client, users[key], ids, label, scored)
+            else:
+                future = pool.submit(call_judge, client, users[key], label)
+            futures[future] = (p, chunk, label)
+
+        for attempt in range(rounds):
+            for p, chunks in enumerate(pass_chunks):
+                for k, chunk in enumerate(chunks, 1):
+                    label = f"Chunk {k}/{len(chunks)}" if len(chunks) > 1 else "Response"
+                    if passes > 1:
+                        label = f"Pass {p + 1} · {label.lower()}"
+                    if attempt:
+                        label = f"Retry {attempt} · {label.lower()}"
+                    submit(p, chunk, label)
+            done = 0
+            with console.status("[bold cyan]Waiting for responses…") as status:
+                while futures:
+                    finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        p, chunk, label = futures.pop(future)
+                        ids = [i for i, _ in chunk]
+                        try:
+                            scores, u = future.result()
+                        except JudgeError as e:
+                            scores, u = [], e.usage
+                            if isinstance(e, JudgeTruncated) and len(chunk) > 1:
+                                half = len(chunk) // 2
+                                log_warn(f"{label}: {e} — splitting its {len(chunk)} entries in two")
+                                submit(p, chunk[:half], f"{label} · 1/2")
+                                submit(p, chunk[half:], f"{label} · 2/2")
+                            else:
+                                log_err(f"{label}: {e} — {len(chunk)} entries left unscored")
+                        results[p].append((ids, scores))
+                        usages[p]["input"] += u["input"]
+                        usages[p]["output"] += u["output"]
+                        if on_chunk:
+                            on_chunk(p, [s for s in scores if s["id"] in ids])
+                        done += 1
+                        status.update(f"[bold cyan]Waiting for responses… {done}/{done + len(futures)} requests")
+
+            if attempt + 1 == rounds:
+                break
+            # Re-request only what is still unscored, in fresh chunks
+            got = [{s["id"] for _, scores in pass_results for s in scores} for pass_results in results]
+            retry = [
+                [(i, e) for chunk in chunks for i, e in chunk if i not in got[p]]
+                for p, chunks in enumerate(pass_chunks)
+            ]
+            n_retry = sum(len(r) for r in retry)
+            if not n_retry:
+                break
+            log_warn(f"Re-requesting {n_retry} unscored entr{'ies' if n_retry > 1 else 'y'} in smaller chunks")
+            # Truncation means the output didn't fit, so halve the chunk size
+            budget //= 2
+            pass_chunks = [chunk_entries(r, budget) for r in retry]
+
+    all_passes = []
+    for p, pass_results in enumerate(results):
+        scores, missing = stitch_scores(pass_results)
+        if missing:
+            where = f"Pass {p + 1}: no" if passes > 1 else "No"
+            log_warn(f"{where} score returned for {len(missing)} entries: {', '.join(map(str, missing[:10]))}"
+                     + (" …" if len(missing) > 10 else ""))
+        all_passes.append(scores)
+    return all_passes, usages
+
+
+# ── Result cache ─────────────────────────────────────────────
+# Scores are cached per response and pass, keyed on everything that can
+# change a score: the prompt, the response, the rubric, the judge model and
+# the pass index (so -p 3 after -p 1 only pays for passes 2 and 3).
+
+CACHE_FILE = DATA_DIR / "judge.cache.db"
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    key TEXT PRIMARY KEY,
+    score TEXT NOT NULL,
+    created TEXT NOT NULL
+)
+"""
+
+
+def judge_key(entry: dict, pass_index: int) -> str:
+    fields = [entry["prompt"], entry["response"], SYSTEM_PROMPT, USER_PROMPT, JUDGE_MODEL, pass_index]
+    if entry.get("suspects"):
+        # A hinted request is a different request
+        fields += [HINT_PREFIX, entry["suspects"]]
+    payload = json.dumps(fields, ensure_ascii=False)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def open_judge_cache(path: Path = CACHE_FILE) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute(CACHE_SCHEMA)
+    return conn
+
+
+def cache_lookup(conn: sqlite3.Connection, keys: list[str]) -> dict[str, dict]:
+    """Cached scores (without 'id') for the given keys."""
+    found: dict[str, dict] = {}
+    for k in range(0, len(keys), 500):
+        batch = keys[k:k + 500]
+        rows = conn.execute(
+            f"SELECT key, score FROM scores WHERE key IN ({','.join('?' * len(batch))})", batch
+        )
+        found.update((key, json.loads(score)) for key, score in rows)
+    return found
+
+
+def cache_store(conn: sqlite3.Connection, rows: list[tuple[str, dict]]) -> None:
+    today = date.today().isoformat()
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO scores (key, score, created) VALUES (?, ?, ?)",
+            [(key, json.dumps({k: v for k, v in score.items() if k != "id"}), today) for key, score in rows],
+        )
+
+
+# ── Batch mode ───────────────────────────────────────────────
+# --batch sends the same chunked requests as one Message Batch (half price,
+# no rate-limit pressure), following training/batch_submit.py. The batch ID
+# and what each request covers are saved to data/eval/judge_batches/
+# <version>.json before polling, so an interrupted run resumes the same
+# batch. Results go straight into the score cache, which is where the report
+# reads them from.
+
+BATCH_DIR = DATA_DIR / "judge_batches"
+BATCH_INTERVAL = 30
+
+
+def submit_batch(
+    client: anthropic.Anthropic,
+    pass_chunks: list[list[list[tuple[int, dict]]]],
+    keys: list[list[str]],
+    state_path: Path,
+) -> dict:
+    """Create a Message Batch for every pending chunk and save its state."""
+    output_config = score_output_config()
+    requests = []
+    covers = {}
+    for p, chunks in enumerate(pass_chunks):
+        for k, chunk in enumerate(chunks, 1):
+            custom_id = f"p{p + 1}-c{k}"
+            user = USER_PROMPT.format(responses=build_responses_block(chunk))
+            requests.append({"custom_id": custom_id, "params": {**judge_params(user), "output_config": output_config}})
+            covers[custom_id] = {"pass": p, "ids": [i for i, _ in chunk], "keys": [keys[p][i - 1] for i, _ in chunk]}
+
+    log_phase("Submitting to Anthropic Batch API")
+    t0 = time.perf_counter()
+    try:
+        with console.status("[bold cyan]Creating batch…"):
+            batch = client.messages.batches.create(requests=requests)
+    except anthropic.APIError as e:
+        log_err(f"API error after {fmt_duration(time.perf_counter() - t0)}: {e}")
+        sys.exit(1)
+    now = datetime.now(timezone.utc)
+    log_duration(time.perf_counter() - t0, "Batch created")
+
+    table = Table(show_header=False, show_edge=False, pad_edge=False, box=None)
+    table.add_column(style="dim")
+    table.add_column()
+    table.add_row("  Batch ID", f"[bold]{batch.id}")
+    table.add_row("  Status", f"[yellow]{batch.processing_status}")
+    table.add_row("  Requests", str(len(requests)))
+    table.add_row("  Model", JUDGE_MODEL)
+    table.add_row("  Submitted", now.strftime("%Y-%m-%d %H:%M:%S UTC"))
+    console.print(table)
+
+    state = {
+        "batch_id": batch.id,
+        "model": JUDGE_MODEL,
+        "submitted_at": now.isoformat(),
+        "requests": covers,
+    }
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    state_path.write_text(json.dumps(state, indent=2) + "\n")
+    log_file(state_path)
+    return state
+
+
+def collect_batch(
+    client: anthropic.Anthropic,
+    conn: sqlite3.Connection,
+    state: dict,
+    state_path: Path,
+    interval: int = BATCH_INTERVAL,
+) -> tuple[set[str], dict[int, dict]]:
+    """Wait for a submitted batch, store its scores in the cache, drop the state file.
+
+    Returns the cache keys that received scores and usage per pass index.
+    """
+    from training.batch_retrieve import poll
+
+    batch_id = state["batch_id"]
+    try:
+        poll(client, batch_id, interval)
+    except anthropic.APIError as e:
+        log_err(f"API error while polling {batch_id}: {e} — re-run to resume")
+        sys.exit(1)
+
+    log_phase("Retrieving results")
+    stored: set[str] = set()
+    usages: dict[int, dict] = {}
+    failed = 0
+    t0 = time.perf_counter()
+    with console.status("[bold cyan]Streaming results…"):
+        for entry in client.messages.batches.results(batch_id):
+            cover = state["requests"].get(entry.custom_id)
+            if cover is None:
+                continue
+            if entry.result.type != "succeeded":
+                failed += 1
+                log_warn(f"[red]{entry.custom_id}[/] — {entry.result.type}")
+                continue
+            message = entry.result.message
+            u = usage_dict(message.usage)
+            pass_usage = usages.setdefault(cover["pass"], {"input": 0, "output": 0})
+            pass_usage["input"] += u["input"]
+            pass_usage["output"] += u["output"]
+            text = "".join(block.text for block in message.content if block.type == "text")
+            try:
+                parsed = ScoreResponse.model_validate_json(text)
+            except pydantic.ValidationError:
+                failed += 1
+                log_warn(f"[red]{entry.custom_id}[/] — unparseable scores (stop_reason: {message.stop_reason})")
+                continue
+            key_by_id = dict(zip(cover["ids"], cover["keys"]))
+            rows = [(key_by_id[s.id], s.model_dump()) for s in parsed.scores if s.id in key_by_id]
+            cache_store(conn, rows)
+            stored.update(key for key, _ in rows)
+    log_duration(time.perf_counter() - t0, f"Stored {len(stored)} scores")
+    if failed:
+        log_warn(f"{failed} batch requests failed — re-run to judge the missing entries")
+    state_path.unlink(missing_ok=True)
+    return stored, usages
 
 
 def compute_pass_variance(all_passes: list[list[dict]]) -> dict:
     """Compute cross-pass variance for each dimension, total, and flag splits."""
-    n_passes = len(all_passes)
-    n_items = len(all_passes[0])
-    pass_dim_avgs: dict[str, list[float]] = {d: [] for d in DIMS}
-    pass_totals: list[float] = []
-    for scores in all_passes:
-        n = len(scores)
-        dim_avgs = {d: sum(s[d] for s in scores) / n for d in DIMS}
-        for d in DIMS:
-            pass_dim_avgs[d].append(dim_avgs[d])
-        pass_totals.append(sum(dim_avgs.values()))
-
-    def var(xs: list[float]) -> float:
-        mean = sum(xs) / len(xs)
-        return sum((x - mean) ** 2 for x in xs) / len(xs)
+    scores = ScoreArray(all_passes)
+    n_passes, n_items = scores.flags.shape
+    pass_dim_avgs = scores.dims.mean(axis=1)
+    pass_totals = pass_dim_avgs.sum(axis=1)
 
     # Flag splits: count items where passes disagreed on each flag
-    flag_splits: dict[str, int] = {}
-    for f in FLAG_CODES:
-        splits = 0
-        for i in range(n_items):
-            votes = sum(1 for p in all_passes if f in p[i].get("flags", []))
-            if 0 < votes < n_passes:
-                splits += 1
-        if splits:
-            flag_splits[f] = splits
+    votes = scores.flag_votes()
+    splits = ((votes > 0) & (votes < n_passes)).sum(axis=0).tolist()
+    flag_splits = {
+        f: splits[REPORT_FLAG_CODES.index(f)] for f in FLAG_CODES if splits[REPORT_FLAG_CODES.index(f)]
+    }
 
     # Per-item H flag votes
-    h_votes: list[tuple[int, int]] = []  # (item_id, vote_count)
-    for i in range(n_items):
-        votes = sum(1 for p in all_passes if "H" in p[i].get("flags", []))
-        if votes > 0:
-            h_votes.append((all_passes[0][i]["id"], votes))
-    h_per_pass = [
-        sum(1 for s in p if "H" in s.get("flags", [])) for p in all_passes
-    ]
+    h = REPORT_FLAG_CODES.index("H")
+    h_votes = [(scores.ids[i], int(votes[i, h])) for i in np.flatnonzero(votes[:, h])]
+    h_per_pass = flag_bits(scores.flags)[:, :, h].sum(axis=1).tolist()
 
     return {
-        "pass_totals": pass_totals,
-        "var_total": var(pass_totals),
-        "dim_vars": {d: var(pass_dim_avgs[d]) for d in DIMS},
+        "pass_totals": pass_totals.tolist(),
+        "var_total": float(pass_totals.var()),
+        "dim_vars": dict(zip(DIMS, pass_dim_avgs.var(axis=0).tolist())),
         "flag_splits": flag_splits,
         "n_items": n_items,
         "h_per_pass": h_per_pass,
@@ -298,44 +767,65 @@ def compute_pass_variance(all_passes: list[list[dict]]) -> dict:
     }
 
 
-# ── Aggregation ──────────────────────────────────────────────
-
-
-def compute_summary(scores: list[dict]) -> dict:
-    n = len(scores)
-    avgs = {d: sum(s[d] for s in scores) / n for d in DIMS}
-    total_avg = sum(avgs.values())
-
-    flag_counts: dict[str, int] = {}
-    for s in scores:
-        for f in s.get("flags", []):
-            flag_counts[f] = flag_counts.get(f, 0) + 1
-
-    for s in scores:
-        s["total"] = round(sum(s[d] for d in DIMS), 1)
-
-    ranked = sorted(scores, key=lambda s: s["total"])
+# ── Sequential sampling ──────────────────────────────────────
+# With --adaptive, entries are judged in rounds drawn from a genre-stratified
+# random order. After each round a bootstrap CI is taken over the total score
+# and every flag rate, and judging stops once all of them are narrow enough.
+# The order depends only on the seed and the entries, so two instruction
+# versions run over the same prompts are sampled on the same IDs.
+
+ROUND_SIZE = 50
+MIN_SAMPLE = 100
+CI_TARGET = 0.2
+FLAG_CI_TARGET = 0.05
+CI_CONFIDENCE = 0.95
+
+
+def stratified_order(entries: list[dict], ids: list[int], rng: random.Random) -> list[int]:
+    """Random order of IDs in which every prefix is roughly proportional by genre."""
+    strata: dict[str, list[int]] = {}
+    for i in ids:
+        strata.setdefault(extract_genre(entries[i - 1]["prompt"]), []).append(i)
+    keyed = []
+    for members in strata.values():
+        rng.shuffle(members)
+        n = len(members)
+        keyed += [((k + rng.random()) / n, i) for k, i in enumerate(members)]
+    return [i for _, i in sorted(keyed)]
+
+
+def bootstrap_ci(
+    scores: list[dict], rng: np.random.Generator,
+    confidence: float = CI_CONFIDENCE, resamples: int = BOOTSTRAP_RESAMPLES,
+) -> dict[str, tuple[float, float, float]]:
+    """Percentile bootstrap (estimate, low, high) for the mean total and each flag rate.
+
+    Keyed "total" and by flag code; every statistic shares the same resamples
+    of the items.
+    """
+    arrays = ScoreArray([scores])
+    flags = flag_bits(arrays.flags[0])[:, [REPORT_FLAG_CODES.index(f) for f in FLAG_CODES]]
+    columns = np.column_stack([arrays.dims[0].sum(axis=1), flags])
+    low, high = percentile_interval(bootstrap_means(columns, rng, resamples), confidence)
     return {
-        "avgs": avgs,
-        "total_avg": total_avg,
-        "flag_counts": flag_counts,
-        "bottom": ranked[:5],
-        "top": ranked[-5:][::-1],
-        "n": n,
+        k: (est, lo, hi)
+        for k, est, lo, hi in zip(
+            ["total", *FLAG_CODES], columns.mean(axis=0).tolist(), low.tolist(), high.tolist(),
+        )
     }
 
 
-# ── Formatting ───────────────────────────────────────────────
+def half_width(ci: tuple[float, float, float]) -> float:
+    return (ci[2] - ci[1]) / 2
 
 
-def fmt_flags_compact(fc: dict[str, int]) -> str:
-    parts = [f"{fc[c]}{c}" for c in FLAG_CODES if c in fc]
-    return " ".join(parts) or "—"
+def ci_converged(ci: dict, target: float, flag_target: float) -> bool:
+    return half_width(ci["total"]) <= target and all(
+        half_width(ci[f]) <= flag_target for f in FLAG_CODES
+    )
 
 
-def fmt_flags_long(fc: dict[str, int]) -> str:
-    parts = [f"{fc[c]} {FLAG_NAMES[c]}" for c in FLAG_CODES if c in fc]
-    return " · ".join(parts) or "none"
+# ── Formatting ───────────────────────────────────────────────
 
 
 def fmt_flags_colored(fc: dict[str, int]) -> str:
@@ -343,166 +833,10 @@ def fmt_flags_colored(fc: dict[str, int]) -> str:
     return " ".join(parts) or "[dim]none[/]"
 
 
-def fmt_flags_inline(flags: list[str]) -> str:
-    return " ".join(flags) if flags else "—"
-
-
-def fmt_table_row(version: str, today: str, s: dict) -> str:
-    a = s["avgs"]
-    return (
-        f"| {version} | {today[5:]} "
-        f"| {a['faith']:.1f} | {a['ground']:.1f} | {a['tone']:.1f} "
-        f"| {a['conc']:.1f} | {a['acc']:.1f} "
-        f"| **{s['total_avg']:.1f}** "
-        f"| {fmt_flags_compact(s['flag_counts'])} "
-        f"| {s['n']} |"
-    )
-
-
-def fmt_score_row(s: dict, entries: list[dict]) -> str:
-    idx = s["id"] - 1
-    genre = extract_genre(entries[idx]["prompt"]) if idx < len(entries) else "?"
-    return f"| {s['id']} | {s['total']} | {genre} | {s.get('note', '')} |"
-
-
-def fmt_section(version: str, today: str, summary: dict, entries: list[dict]) -> str:
-    a = summary["avgs"]
-    lines = [
-        f"## {version} — {today}",
-        "",
-        (
-            f"Faith {a['faith']:.1f} · Ground {a['ground']:.1f} · "
-            f"Tone {a['tone']:.1f} · Conc {a['conc']:.1f} · "
-            f"Acc {a['acc']:.1f} · **{summary['total_avg']:.1f}/15**"
-        ),
-        "",
-        f"**Flags:** {fmt_flags_long(summary['flag_counts'])}",
-        "",
-        "**Bottom 5**",
-        "| # | Score | Genre | Issue |",
-        "|---|-------|-------|-------|",
-    ]
-    for s in summary["bottom"]:
-        lines.append(fmt_score_row(s, entries))
-    lines += [
-        "",
-        "**Top 5**",
-        "| # | Score | Genre | Note |",
-        "|---|-------|-------|------|",
-    ]
-    for s in summary["top"]:
-        lines.append(fmt_score_row(s, entries))
-    return "\n".join(lines)
-
-
-# ── Details file ─────────────────────────────────────────────
-
-
-def write_details(
-    version: str, today: str, scores: list[dict], entries: list[dict], summary: dict
-) -> Path:
-    DETAILS_DIR.mkdir(parents=True, exist_ok=True)
-    detail_path = DETAILS_DIR / f"{version}_details.md"
-
-    a = summary["avgs"]
-    lines = [
-        f"# {version} — Detailed Ranking ({today})",
-        "",
-        (
-            f"Faith {a['faith']:.1f} · Ground {a['ground']:.1f} · "
-            f"Tone {a['tone']:.1f} · Conc {a['conc']:.1f} · "
-            f"Acc {a['acc']:.1f} · **{summary['total_avg']:.1f}/15** "
-            f"(n={summary['n']})"
-        ),
-        "",
-        f"**Flags:** {fmt_flags_long(summary['flag_counts'])}",
-        "",
-        "---",
-        "",
-    ]
-
-    sorted_scores = sorted(scores, key=lambda s: s["id"])
-    for s in sorted_scores:
-        idx = s["id"] - 1
-        if idx >= len(entries):
-            continue
-        entry = entries[idx]
-        genre = extract_genre(entry["prompt"])
-        flags = fmt_flags_inline(s.get("flags", []))
-
-        lines += [
-            f"### #{s['id']} · {genre} · {s['total']:g}/15 · {flags}",
-            "",
-            f"Faith {s['faith']:g} · Ground {s['ground']:g} · "
-            f"Tone {s['tone']:g} · Conc {s['conc']:g} · Acc {s['acc']:g}",
-            "",
-            f"> **{s.get('note', '')}**",
-            "",
-            "**Prompt**",
-            "```",
-            entry["prompt"],
-            "```",
-            "",
-            "**Response**",
-            "```",
-            entry["response"],
-            "```",
-            "",
-            "---",
-            "",
-        ]
-
-    detail_path.write_text("\n".join(lines))
-    return detail_path
-
-
-# ── Summary file I/O ─────────────────────────────────────────
-
-TABLE_HEADER = """\
-# FM Prompt Version Rankings
-
-| Version | Date | Faith | Ground | Tone | Conc | Acc | **Avg** | Flags | n |
-|---------|------|-------|--------|------|------|-----|---------|-------|---|"""
-
-MARKER = "<!-- /summary -->"
-
-
-def update_rank_file(
-    version: str, today: str, summary: dict, entries: list[dict]
-) -> None:
-    row = fmt_table_row(version, today, summary)
-    section = fmt_section(version, today, summary, entries)
-
-    if RANK_FILE.exists():
-        content = RANK_FILE.read_text()
-        if MARKER not in content:
-            content = content.replace("\n\n---", f"\n{MARKER}\n\n---", 1)
-
-        # Remove existing row for this version from summary table
-        content = re.sub(
-            rf"^\| {re.escape(version)} \|.*\n", "", content, flags=re.MULTILINE
-        )
-        # Remove existing detail section for this version
-        content = re.sub(
-            rf"\n---\n\n## {re.escape(version)} — .*?(?=\n---\n\n## |\Z)",
-            "",
-            content,
-            flags=re.DOTALL,
-        )
-
-        content = content.replace(MARKER, f"{row}\n{MARKER}")
-        content = content.rstrip() + "\n\n---\n\n" + section + "\n"
-    else:
-        RANK_FILE.parent.mkdir(parents=True, exist_ok=True)
-        content = f"{TABLE_HEADER}\n{row}\n{MARKER}\n\n---\n\n{section}\n"
-
-    RANK_FILE.write_text(content)
-
-
 # ── Terminal results ─────────────────────────────────────────
 
 
-def _make_table(title: str, style: str, rows: list[dict], entries: list[dict]) -> Table:
+def _make_table(title: str, style: str, rows: list[dict], entries: dict[int, dict]) -> Table:
     table = Table(title=title, title_style=f"bold {style}", show_edge=False, pad_edge=False)
     table.add_column("#", style="dim", justify="right")
     table.add_column("Score", style=style, justify="right")
@@ -510,8 +844,7 @@ def _make_table(title: str, style: str, rows: list[dict], entries: list[dict]) -
     table.add_column("Flags")
     table.add_column("Note")
     for s in rows:
-        idx = s["id"] - 1
-        genre = extract_genre(entries[idx]["prompt"]) if idx < len(entries) else "?"
+        genre = extract_genre(entries[s["id"]]["prompt"]) if s["id"] in entries else "?"
         flags = " ".join(
             f"[{FLAG_COLORS.get(f, '')}]{f}[/]" for f in s.get("flags", [])
         )
@@ -519,7 +852,7 @@ def _make_table(title: str, style: str, rows: list[dict], entries: list[dict]) -
     return table
 
 
-def print_results(version: str, summary: dict, entries: list[dict]) -> None:
+def print_results(version: str, summary: dict, entries: dict[int, dict]) -> None:
     a = summary["avgs"]
 
     log_phase(f"Results for [bold]{version}")
@@ -537,6 +870,8 @@ def print_results(version: str, summary: dict, entries: list[dict]) -> None:
     # Flags
     if summary["flag_counts"]:
         console.print(f"  Flags: {fmt_flags_colored(summary['flag_counts'])}")
+    if "ci" in summary:
+        console.print(f"  [dim]{fmt_ci(summary)}[/]")
 
     console.print()
     console.print(_make_table("Bottom 5", "red", summary["bottom"], entries))
@@ -548,8 +883,7 @@ def print_results(version: str, summary: dict, entries: list[dict]) -> None:
 # ── Main ─────────────────────────────────────────────────────
 
 
-def main() -> None:
-    run_start = time.perf_counter()
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Score AFM 3B model outputs using an LLM judge (Claude Sonnet). "
                     "Each prompt/response pair is scored on 5 dimensions (0-3): "
@@ -561,10 +895,17 @@ examples:
   uv run python eval/judge_output.py data/eval/output_v14.jsonl
   uv run python eval/judge_output.py -l 10 data/eval/output_v14.jsonl
   uv run python eval/judge_output.py -l 5 -p 3 data/eval/output_v14.jsonl
+  uv run python eval/judge_output.py -j 8 data/eval/output_test_8k.jsonl
+  uv run python eval/judge_output.py --batch data/eval/output_test_8k.jsonl
+  uv run python eval/judge_output.py --stream -j 8 data/eval/output_test_8k.jsonl
+  uv run python eval/judge_output.py --screen --skip-broken data/eval/output_v19.jsonl
+  uv run python eval/judge_output.py --suspects-only data/eval/output_test_8k.jsonl
+  uv run python eval/judge_output.py --adaptive --ci-target 0.2 data/eval/output_test_8k.jsonl
 
 note:
   Requires ANTHROPIC_API_KEY. Do NOT run inside Claude Code (it calls the
-  Anthropic API and may conflict with the host process).""",
+  Anthropic API and may conflict with the host process). To try it offline,
+  start eval/judge_standin.py and set ANTHROPIC_BASE_URL to its address.""",
         formatter_class=argparse.RawDescriptionHelpFormatter,
     )
     parser.add_argument(
@@ -576,13 +917,110 @@ note:
         help="number of independent judge passes; when >1, dimension scores are "
              "averaged and flags are majority-voted across passes (default: 1)",
     )
+    parser.add_argument(
+        "-j", "--concurrency", type=int, default=CONCURRENCY,
+        help=f"maximum judge requests in flight at once (default: {CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--chunk-tokens", type=int, default=CHUNK_TOKENS,
+        help="estimated input-token budget per judge request; entries are split "
+             f"into chunks of at most this size (default: {CHUNK_TOKENS})",
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--batch", action="store_true",
+        help="send the judge requests as one Message Batch and poll until it "
+             "ends; an interrupted run resumes the saved batch",
+    )
+    mode.add_argument(
+        "--stream", action="store_true",
+        help="stream judge responses, checkpointing each score as it arrives; "
+             "truncated or failed responses re-request only the missing entries",
+    )
+    parser.add_argument(
+        "--interval", type=int, default=BATCH_INTERVAL,
+        help=f"seconds between batch status checks with --batch (default: {BATCH_INTERVAL})",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="ignore cached judge scores and re-judge everything "
+             "(fresh scores still replace the cached ones)",
+    )
+    parser.add_argument(
+        "--adaptive", action="store_true",
+        help="judge genre-stratified random rounds and stop once the bootstrap "
+             "CI of the total score and every flag rate is within target",
+    )
+    parser.add_argument(
+        "--round-size", type=int, default=ROUND_SIZE,
+        help=f"responses per round with --adaptive (default: {ROUND_SIZE})",
+    )
+    parser.add_argument(
+        "--ci-target", type=float, default=CI_TARGET,
+        help=f"stop when the total-score CI half-width is at most this, out of 15 "
+             f"(default: {CI_TARGET})",
+    )
+    parser.add_argument(
+        "--flag-ci-target", type=float, default=FLAG_CI_TARGET,
+        help=f"... and every flag-rate CI half-width is at most this fraction "
+             f"(default: {FLAG_CI_TARGET})",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0,
+        help="seed for the --adaptive sampling order and the bootstrap; keep it "
+             "fixed to sample the same IDs across versions (default: 0)",
+    )
+    parser.add_argument(
+        "--baseline", metavar="VERSION", default=None,
+        help="paired per-item comparison against VERSION's latest stored run "
+             "(items matched by prompt), with a bootstrap CI and sign-flip p-value",
+    )
+    parser.add_argument(
+        "--screen", action="store_true",
+        help="replace the judge's P/C/E flags with the local screener's and "
+             "report where they disagree",
+    )
+    parser.add_argument(
+        "--skip-broken", action="store_true",
+        help="don't send empty, refusal or prompt-copy responses to the judge; "
+             "they score 0 with a 'screened locally' note",
+    )
+    parser.add_argument(
+        "--no-hints", action="store_false", dest="hints",
+        help="don't tell the judge which names, years and titles in each "
+             "response the local grounding check couldn't find in the context",
+    )
+    parser.add_argument(
+        "--suspects-only", action="store_true",
+        help="only judge responses with grounding suspects (always hinted); "
+             "writes <version>-suspects_details.md and leaves version_rank.md alone",
+    )
     parser.add_argument(
         "file", type=Path,
         help="output JSONL file to evaluate — each line must have 'prompt' and "
              "'response' fields; the version tag is extracted from the filename "
              "(e.g. output_v14_20250601.jsonl → v14)",
     )
-    args = parser.parse_args()
+    return parser
+
+
+def judge_options(path: Path, **overrides) -> argparse.Namespace:
+    """The CLI defaults for judging `path`, with keyword overrides, for judge()."""
+    return argparse.Namespace(**{**vars(build_parser().parse_args([str(path)])), **overrides})
+
+
+def load_entries(path: Path, limit: int | None = None) -> list[dict]:
+    log_phase(f"Loading [bold]{path.name}")
+    entries = [json.loads(l) for l in path.read_text().split("\n") if l.strip()]
+    if limit:
+        entries = entries[:limit]
+        log_info(f"Limited to {limit} entries")
+    log_ok(f"{len(entries)} responses loaded for [bold]{extract_version(path)}")
+    return entries
+
+
+def main() -> None:
+    args = build_parser().parse_args()
 
     if args.limit is not None and args.limit < 1:
         log_err(f"--limit must be a positive integer, got {args.limit}")
@@ -592,42 +1030,245 @@ note:
         log_err(f"--passes must be a positive integer, got {args.passes}")
         sys.exit(1)
 
+    if args.interval < 1:
+        log_err(f"--interval must be a positive integer, got {args.interval}")
+        sys.exit(1)
+
+    if args.concurrency < 1:
+        log_err(f"--concurrency must be a positive integer, got {args.concurrency}")
+        sys.exit(1)
+
+    if args.round_size < 1:
+        log_err(f"--round-size must be a positive integer, got {args.round_size}")
+        sys.exit(1)
+
     path: Path = args.file
     if not path.exists():
         log_err(f"Not found: {path}")
         sys.exit(1)
 
-    limit = args.limit
+    judge(load_entries(path, args.limit), extract_version(path), path, args)
+
+
+def judge(
+    entries: list[dict], version: str, source: Path, args: argparse.Namespace,
+    meta: dict | None = None, ranked: bool = True,
+) -> dict:
+    """Judge output records and record the run; returns the run's summary.
+
+    `args` carries judge_output's CLI options (see judge_options()); `source`
+    is the output file the entries came from, kept with the stored run along
+    with any extra `meta`. With ranked=False the run is only stored, with no
+    version_rank.md row or details file, for callers that report it
+    themselves (run_sweep.py).
+    """
+    run_start = time.perf_counter()
     passes = args.passes
-    version = extract_version(path)
     today = date.today().isoformat()
 
-    log_phase(f"Loading [bold]{path.name}")
-    entries = [json.loads(l) for l in path.read_text().split("\n") if l.strip()]
-    if limit:
-        entries = entries[:limit]
-        log_info(f"Limited to {limit} entries")
-    log_ok(f"{len(entries)} responses loaded for [bold]{version}")
+    screened: dict[int, dict] = {}
+    skipped: set[int] = set()
+    hints = args.hints or args.suspects_only
+    if args.screen or args.skip_broken or hints:
+        t0 = time.perf_counter()
+        screened = {i: screen(e) for i, e in enumerate(entries, 1)}
+        n_flagged = sum(1 for r in screened.values() if r["flags"])
+        n_suspect = sum(1 for r in screened.values() if r["suspects"])
+        log_info(
+            f"Screened locally: {n_flagged} flagged P/C/E, {n_suspect} with ungrounded "
+            f"entities ({fmt_duration(time.perf_counter() - t0)})"
+        )
+        if args.skip_broken:
+            skipped = {i for i, r in screened.items() if r["broken"]}
+            if skipped:
+                log_warn(f"Skipping {len(skipped)} broken response{'s' if len(skipped) != 1 else ''}")
+        if hints:
+            for i, e in enumerate(entries, 1):
+                if screened[i]["suspects"]:
+                    e["suspects"] = screened[i]["suspects"]
+        if args.suspects_only:
+            # Broken responses keep their local zero; clean ones aren't judged
+            skipped |= {i for i, r in screened.items() if not r["suspects"] and not r["broken"]}
+            log_info(f"Judging only the {len(entries) - len(skipped)} responses with suspects")
+
+    keys = [[judge_key(e, p) for e in entries] for p in range(passes)]
+    cache = open_judge_cache()
+    pass_usage = [{"input": 0, "output": 0} for _ in range(passes)]
+    client = None
+
+    def add_usage(usages: dict[int, dict]) -> None:
+        for p, u in usages.items():
+            if p < passes:
+                pass_usage[p]["input"] += u["input"]
+                pass_usage[p]["output"] += u["output"]
+
+    def read_cached(only: set[str] | None = None) -> list[dict[int, dict]]:
+        wanted = [k for pass_keys in keys for k in pass_keys if only is None or k in only]
+        hits = cache_lookup(cache, wanted)
+        return [
+            {i: {"id": i, **hits[k]} for i, k in enumerate(pass_keys, 1) if k in hits}
+            for pass_keys in keys
+        ]
 
-    # Build prompt once
-    log_phase("Building prompt")
-    block = build_responses_block(entries)
-    user = USER_PROMPT.format(responses=block)
-    log_ok(f"{len(entries)} responses assembled")
+    # Finish a batch left over from an interrupted --batch run first
+    resumed: set[str] = set()
+    state_path = BATCH_DIR / f"{version}.json"
+    if args.batch and state_path.exists():
+        state = json.loads(state_path.read_text())
+        log_phase(f"Resuming batch [bold]{state['batch_id']}")
+        client = anthropic.Anthropic()
+        resumed, usages = collect_batch(client, cache, state, state_path, args.interval)
+        add_usage(usages)
+
+    # Scores streamed by a run that died before its chunks finished
+    checkpoint_path = CHECKPOINT_DIR / f"{version}.jsonl"
+    if checkpoint_path.exists():
+        rows = [json.loads(l) for l in checkpoint_path.read_text().split("\n") if l.strip()]
+        cache_store(cache, [(r["key"], r["score"]) for r in rows])
+        resumed |= {r["key"] for r in rows}
+        checkpoint_path.unlink()
+        log_info(f"Recovered {len(rows)} checkpointed scores from an interrupted run")
+
+    # Look up cached scores; only misses are sent to the judge
+    if args.no_cache:
+        cached = read_cached(resumed)
+    else:
+        cached = read_cached()
+        n_hits = sum(len(c) for c in cached)
+        log_info(f"Cache: {n_hits}/{len(entries) * passes} scores reused")
+
+    # Run judge passes — all passes and chunks share one concurrency limit
+    def store(p: int, scores: list[dict]) -> None:
+        cache_store(cache, [(keys[p][s["id"] - 1], s) for s in scores])
+
+    def judge_pending(ids: list[int]) -> list[list[dict]]:
+        """Judge every (pass, ID) not already cached; returns fresh scores per pass."""
+        nonlocal client
+        log_phase("Building prompt")
+        pass_chunks = [
+            chunk_entries(
+                [(i, entries[i - 1]) for i in ids if i not in cached[p] and i not in skipped],
+                args.chunk_tokens,
+            )
+            for p in range(passes)
+        ]
+        n_requests = sum(len(c) for c in pass_chunks)
+        n_pending = sum(len(chunk) for c in pass_chunks for chunk in c)
+        log_ok(f"{n_pending} responses to judge in {n_requests} request{'s' if n_requests != 1 else ''}")
+
+        fresh: list[list[dict]] = [[] for _ in range(passes)]
+        if not n_requests:
+            return fresh
+        client = client or anthropic.Anthropic()
+        if args.batch:
+            state = submit_batch(client, pass_chunks, keys, state_path)
+            stored, usages = collect_batch(client, cache, state, state_path, args.interval)
+            add_usage(usages)
+            fresh = [list(c.values()) for c in read_cached(stored)]
+        elif args.stream:
+            log_phase(f"Streaming from Anthropic API ({JUDGE_MODEL})")
+            log_info(f"{n_requests} request{'s' if n_requests > 1 else ''} · up to {args.concurrency} at a time")
+            checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+            lock = threading.Lock()
+            with checkpoint_path.open("a") as checkpoint:
+
+                def checkpoint_score(p: int, score: dict) -> None:
+                    line = json.dumps({"key": keys[p][score["id"] - 1], "score": score}, ensure_ascii=False)
+                    with lock:
+                        checkpoint.write(line + "\n")
+                        checkpoint.flush()
+
+                fresh, usages = judge_passes(
+                    client, pass_chunks, args.concurrency, on_chunk=store,
+                    stream=True, on_score=checkpoint_score, budget=args.chunk_tokens,
+                )
+            # Every streamed score is in the cache by now
+            checkpoint_path.unlink()
+            add_usage(dict(enumerate(usages)))
+        else:
+            log_phase(f"Calling Anthropic API ({JUDGE_MODEL})")
+            log_info(f"{n_requests} request{'s' if n_requests > 1 else ''} · up to {args.concurrency} at a time")
+            fresh, usages = judge_passes(client, pass_chunks, args.concurrency, on_chunk=store)
+            add_usage(dict(enumerate(usages)))
+        return fresh
+
+    local = {i: broken_score(i, screened[i]) for i in skipped if screened[i]["broken"]}
+
+    def assemble(fresh: list[list[dict]]) -> list[list[dict]]:
+        return [
+            sorted(
+                {**cached[p], **{s["id"]: s for s in fresh[p]}, **{i: dict(s) for i, s in local.items()}}.values(),
+                key=lambda s: s["id"],
+            )
+            for p in range(passes)
+        ]
 
-    # Run judge passes
-    client = anthropic.Anthropic()
-    all_passes = []
-    total_usage = {"input": 0, "output": 0}
-    for p in range(passes):
-        if passes > 1:
-            log_phase(f"Pass {p + 1}/{passes}")
-        scores_p, usage = call_judge(client, user)
-        total_usage["input"] += usage["input"]
-        total_usage["output"] += usage["output"]
-        if len(scores_p) != len(entries):
-            log_warn(f"Got {len(scores_p)} scores for {len(entries)} entries")
-        all_passes.append(scores_p)
+    boot_rng = np.random.default_rng(args.seed)
+    if args.adaptive:
+        rng = random.Random(args.seed)
+        population = [i for i in range(1, len(entries) + 1) if i not in skipped or i in local]
+        order = stratified_order(entries, population, rng)
+        fresh = [[] for _ in range(passes)]
+        sampled: set[int] = set()
+        for start in range(0, len(order), args.round_size):
+            round_ids = order[start:start + args.round_size]
+            for p, scores in enumerate(judge_pending(round_ids)):
+                fresh[p] += scores
+            sampled.update(round_ids)
+            sample_passes = [[dict(s) for s in p if s["id"] in sampled] for p in assemble(fresh)]
+            common = set.intersection(*({s["id"] for s in p} for p in sample_passes))
+            sample_passes = [[s for s in p if s["id"] in common] for p in sample_passes]
+            if args.screen:
+                for p in sample_passes:
+                    apply_screen(p, screened)
+            sample = merge_passes(sample_passes) if passes > 1 else sample_passes[0]
+            if not sample:
+                continue
+            ci = bootstrap_ci(sample, boot_rng)
+            widest = max(half_width(ci[f]) for f in FLAG_CODES)
+            log_info(
+                f"Round {start // args.round_size + 1}: n={len(sample)}/{len(population)} · "
+                f"total {ci['total'][0]:.2f} ± {half_width(ci['total']):.2f} · "
+                f"flag rates ± {widest:.1%}"
+            )
+            if len(sample) >= MIN_SAMPLE and ci_converged(ci, args.ci_target, args.flag_ci_target):
+                log_ok(f"CI target reached after {len(sample)} of {len(population)} responses")
+                break
+        else:
+            log_info("Every response sampled before the CI target was reached")
+    else:
+        fresh = judge_pending(list(range(1, len(entries) + 1)))
+        sampled = set(range(1, len(entries) + 1))
+    cache.close()
+
+    all_passes = [[s for s in p if s["id"] in sampled] for p in assemble(fresh)]
+    if args.screen:
+        disagree: dict[str, set[int]] = {}
+        for p in all_passes:
+            for kind, ids in apply_screen(p, screened).items():
+                disagree.setdefault(kind, set()).update(ids)
+        if disagree:
+            log_info("Judge vs local screen: " + ", ".join(
+                f"{kind} {len(ids)}" for kind, ids in sorted(disagree.items())
+            ))
+        else:
+            log_ok("Judge and local screen agree on every P/C/E flag")
+    total_usage = {
+        "input": sum(u["input"] for u in pass_usage),
+        "output": sum(u["output"] for u in pass_usage),
+    }
+
+    if args.suspects_only:
+        all_passes = [[s for s in p if s["id"] not in skipped or s["id"] in local] for p in all_passes]
+
+    # Passes are merged position by position, so keep only IDs every pass scored
+    common = set.intersection(*({s["id"] for s in p} for p in all_passes))
+    if not common:
+        log_err("No entries were scored")
+        sys.exit(1)
+    if any(len(p) != len(common) for p in all_passes):
+        log_warn(f"Keeping {len(common)} entries scored in every pass")
+        all_passes = [[s for s in p if s["id"] in common] for p in all_passes]
 
     if passes > 1:
         variance = compute_pass_variance(all_passes)
@@ -638,15 +1279,41 @@ note:
 
     log_phase("Computing summary")
     summary = compute_summary(scores)
+    meta = {**(meta or {}), "judge_model": JUDGE_MODEL, "population": len(entries)}
+    summary["ci"] = bootstrap_ci(scores, boot_rng)
+    summary["ci_confidence"] = CI_CONFIDENCE
+    summary["adaptive"] = args.adaptive
+    meta |= {
+        "ci": summary["ci"], "ci_confidence": CI_CONFIDENCE,
+        "adaptive": args.adaptive, "seed": args.seed,
+    }
     log_ok("Aggregation complete")
 
     log_phase("Writing reports")
-    update_rank_file(version, today, summary, entries)
-    log_file(RANK_FILE)
-    detail_path = write_details(version, today, scores, entries, summary)
-    log_file(detail_path)
+    # A suspects-only subset isn't comparable with full runs in the ranking
+    label = f"{version}-suspects" if args.suspects_only else version
+    conn = open_store()
+    try:
+        run_id = record_run(
+            conn, label, today, dict(enumerate(entries, 1)), all_passes,
+            source=str(source), ranked=ranked and not args.suspects_only, meta=meta,
+        )
+        if not ranked:
+            log_info("Unranked run: stored without version_rank.md or details")
+        elif args.suspects_only:
+            log_info("Suspects-only run: version_rank.md not updated")
+            log_file(render_details(conn, label))
+        else:
+            log_file(render_rank(conn))
+            log_file(render_details(conn, label))
+        baseline = latest_run(conn, args.baseline) if args.baseline else None
+        if args.baseline and baseline is None:
+            log_warn(f"No runs stored for {args.baseline} — skipping the paired comparison")
+        paired = compare_runs(conn, baseline, run_id) if baseline else []
+    finally:
+        conn.close()
 
-    print_results(version, summary, entries)
+    print_results(version, summary, dict(enumerate(entries, 1)))
 
     if variance:
         log_phase(f"Variance across {passes} passes")
@@ -710,12 +1377,27 @@ note:
             console.print()
             console.print(table)
 
+    if paired:
+        log_phase(f"Paired comparison with {args.baseline}")
+        test = paired_test([r[2] for r in paired], [r[3] for r in paired], boot_rng)
+        style = "red" if test["mean"] < 0 else "green"
+        console.print(
+            f"  {test['n']} shared prompts · mean change [{style}]{test['mean']:+.2f}[/] "
+            f"({CI_CONFIDENCE:.0%} CI {test['low']:+.2f} to {test['high']:+.2f}) · "
+            f"{test['worse']} worse, {test['better']} better"
+        )
+        verdict = "[bold]significant[/]" if test["p"] < 1 - CI_CONFIDENCE else "not significant"
+        console.print(f"  [dim]Sign-flip test[/]  p = {test['p']:.4f} ({verdict})")
+    elif baseline:
+        log_warn(f"No prompts were scored in both {args.baseline} and {label}")
+
     total_tokens = total_usage["input"] + total_usage["output"]
     console.print(
         f"  [dim]Tokens: {total_usage['input']:,} in + {total_usage['output']:,} out "
         f"= {total_tokens:,} total ({passes} pass{'es' if passes > 1 else ''})[/]"
     )
     log_duration(time.perf_counter() - run_start, "Total judging")
+    return summary
 
 
 if __name__ == "__main__":
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""Local stand-in for the Anthropic API, for exercising judge_output.py offline.
+
+Usage:
+    uv run python eval/judge_standin.py
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8765 ANTHROPIC_API_KEY=x \\
+        uv run python eval/judge_output.py --batch data/eval/output_v19.jsonl
+
+Implements just enough of the Messages and Message Batches endpoints for the
+judge: POST /v1/messages (plain or streamed), POST /v1/messages/batches, GET
+/v1/messages/batches/<id> and GET /v1/messages/batches/<id>/results. Every
+"### <id>" entry in a judge request gets a deterministic score derived from
+its response text, so repeated runs give identical reports. --truncate-after
+cuts responses off mid-score with stop_reason "max_tokens".
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from lib.log import log_phase, log_info, log_ok
+
+ENTRY = re.compile(r"^### (\d+)\n\*\*Prompt:\*\*\n(.*?)\n\n\*\*Response:\*\*\n(.*?)(?=\n\n### \d+\n|\Z)", re.M | re.S)
+
+
+def fake_score(entry_id: int, response: str) -> dict:
+    h = hashlib.blake2b(response.encode(), digest_size=8).digest()
+    flags = [code for code, bit in zip("PHECM", h[5:]) if bit < 20]
+    return {
+        "id": entry_id,
+        "faith": 1 + h[0] % 3,
+        "ground": 1 + h[1] % 3,
+        "tone": 1 + h[2] % 3,
+        "conc": 1 + h[3] % 3,
+        "acc": 1 + h[4] % 3,
+        "flags": flags,
+        "note": f"stand-in score for #{entry_id}",
+    }
+
+
+def fake_message(body: dict, truncate_after: int | None = None) -> dict:
+    """A Messages API response scoring every entry in the request."""
+    user = body["messages"][-1]["content"]
+    if isinstance(user, list):
+        user = "".join(block.get("text", "") for block in user)
+    scores = [fake_score(int(i), response) for i, _, response in ENTRY.findall(user)]
+    text = json.dumps({"scores": scores})
+    stop_reason = "end_turn"
+    if truncate_after is not None and len(scores) > truncate_after:
+        # Cut inside the first score that doesn't fit, like a max_tokens stop
+        kept = json.dumps({"scores": scores[:truncate_after + 1]})
+        text = kept[:len(kept) - len(json.dumps(scores[truncate_after])) // 2 - 2]
+        stop_reason = "max_tokens"
+    system = body.get("system", "")
+    if isinstance(system, list):
+        system = "".join(block.get("text", "") for block in system)
+    return {
+        "id": f"msg_standin_{hashlib.blake2b(user.encode(), digest_size=6).hexdigest()}",
+        "type": "message",
+        "role": "assistant",
+        "model": body.get("model", "standin"),
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": stop_reason,
+        "stop_sequence": None,
+        "usage": {
+            "input_tokens": (len(system) + len(user)) // 4,
+            "output_tokens": len(text) // 4,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0,
+        },
+    }
+
+
+def sse_events(message: dict, piece: int = 40) -> list[tuple[str, dict]]:
+    """The streamed form of a message: start, text deltas, stop."""
+    text = message["content"][0]["text"]
+    start = {**message, "content": [], "stop_reason": None, "usage": {**message["usage"], "output_tokens": 1}}
+    events = [
+        ("message_start", {"type": "message_start", "message": start}),
+        ("content_block_start", {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}}),
+    ]
+    for k in range(0, len(text), piece):
+        delta = {"type": "text_delta", "text": text[k:k + piece]}
+        events.append(("content_block_delta", {"type": "content_block_delta", "index": 0, "delta": delta}))
+    events += [
+        ("content_block_stop", {"type": "content_block_stop", "index": 0}),
+        ("message_delta", {
+            "type": "message_delta",
+            "delta": {"stop_reason": message["stop_reason"], "stop_sequence": None},
+            "usage": {"output_tokens": message["usage"]["output_tokens"]},
+        }),
+        ("message_stop", {"type": "message_stop"}),
+    ]
+    return events
+
+
+# ── Batches ──────────────────────────────────────────────────
+
+
+class Batches:
+    """In-memory message batches that finish `delay` seconds after creation."""
+
+    def __init__(self, delay: float, truncate_after: int | None = None):
+        self.delay = delay
+        self.truncate_after = truncate_after
+        self.lock = threading.Lock()
+        self.batches: dict[str, dict] = {}
+
+    def create(self, requests: list[dict]) -> dict:
+        with self.lock:
+            batch_id = f"msgbatch_standin{len(self.batches):04d}"
+            self.batches[batch_id] = {"created": time.time(), "requests": requests}
+        return self.describe(batch_id, "")
+
+    def describe(self, batch_id: str, base_url: str) -> dict | None:
+        batch = self.batches.get(batch_id)
+        if batch is None:
+            return None
+        created = datetime.fromtimestamp(batch["created"], timezone.utc)
+        ended = time.time() - batch["created"] >= self.delay
+        n = len(batch["requests"])
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {
+                "processing": 0 if ended else n,
+                "succeeded": n if ended else 0,
+                "errored": 0,
+                "canceled": 0,
+                "expired": 0,
+            },
+            "created_at": created.isoformat(),
+            "expires_at": (created + timedelta(days=1)).isoformat(),
+            "ended_at": (created + timedelta(seconds=self.delay)).isoformat() if ended else None,
+            "archived_at": None,
+            "cancel_initiated_at": None,
+            "results_url": f"{base_url}/v1/messages/batches/{batch_id}/results" if ended else None,
+        }
+
+    def results(self, batch_id: str) -> str:
+        lines = []
+        for req in self.batches[batch_id]["requests"]:
+            lines.append(json.dumps({
+                "custom_id": req["custom_id"],
+                "result": {"type": "succeeded", "message": fake_message(req["params"], self.truncate_after)},
+            }))
+        return "\n".join(lines) + "\n"
+
+
+# ── Server ───────────────────────────────────────────────────
+
+
+def make_handler(batches: Batches):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, fmt, *args):
+            log_info(f"{self.command} {self.path}")
+
+        def send_json(self, payload: dict | None, status: int = 200) -> None:
+            if payload is None:
+                payload, status = {"type": "error", "error": {"type": "not_found_error", "message": self.path}}, 404
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def send_stream(self, message: dict) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            for event, data in sse_events(message):
+                self.wfile.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode())
+                self.wfile.flush()
+            self.close_connection = True
+
+        def base_url(self) -> str:
+            return f"http://{self.headers.get('Host', 'localhost')}"
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            path = self.path.split("?")[0]
+            if path == "/v1/messages" and body.get("stream"):
+                self.send_stream(fake_message(body, batches.truncate_after))
+            elif path == "/v1/messages":
+                self.send_json(fake_message(body, batches.truncate_after))
+            elif path == "/v1/messages/batches":
+                self.send_json(batches.create(body["requests"]))
+            else:
+                self.send_json(None)
+
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            m = re.fullmatch(r"/v1/messages/batches/([\w-]+)(/results)?", path)
+            if not m or m.group(1) not in batches.batches:
+                self.send_json(None)
+            elif m.group(2):
+                data = batches.results(m.group(1)).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/binary")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            else:
+                self.send_json(batches.describe(m.group(1), self.base_url()))
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve a local stand-in for the Anthropic Messages and Message "
+                    "Batches API that returns deterministic judge scores.",
+        epilog="""\
+examples:
+  uv run python eval/judge_standin.py
+  uv run python eval/judge_standin.py --port 9000 --delay 30
+  uv run python eval/judge_standin.py --truncate-after 5    # exercise truncation handling
+
+then point the judge at it:
+  ANTHROPIC_BASE_URL=http://127.0.0.1:8765 ANTHROPIC_API_KEY=x \\
+      uv run python eval/judge_output.py --batch data/eval/output_v19.jsonl""",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--port", type=int, default=8765,
+        help="port to listen on (default: 8765)",
+    )
+    parser.add_argument(
+        "--delay", type=float, default=5,
+        help="seconds before a submitted batch reports as ended (default: 5)",
+    )
+    parser.add_argument(
+        "--truncate-after", type=int, default=None,
+        help="stop every response after this many scores with stop_reason "
+             "max_tokens, leaving the next score half-written (default: never)",
+    )
+    args = parser.parse_args()
+
+    batches = Batches(args.delay, args.truncate_after)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(batches))
+    log_phase("Anthropic API stand-in")
+    log_ok(f"Listening on http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Local stand-in for FMPromptRunner, for running the eval pipeline off a Mac.
+
+Usage:
+    uv run python eval/model_standin.py data/eval/prompts_top100.jsonl \\
+        prompts/fm_instruction_v19.json data/eval/output_v19.jsonl -l 10 -t 0.8
+    uv run python eval/run_model.py v19 --backend standin -w 4
+
+Takes FMPromptRunner's arguments and writes its output: one {"prompt",
+"response"} line per answered prompt, flushed as it goes, with prompts that
+fail left out. Each response is a short liner note put together from the
+prompt's [Song] section and the first sentence of its track description,
+picked by a hash of the prompt, instruction and temperature, so repeated
+runs give identical output files. --delay simulates generation time, and
+--fail-rate / --hang-rate make prompts fail or stall at random, to exercise
+run_model.py's retries and timeouts; those are transient, like real
+failures, so a retry usually succeeds.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+SONG = re.compile(r"\[Song\]\n(.*?)\n(.*?)\n(.*?)\n(?:Genre: (.*?)\n)?(?:Released: (.*?)\n)?", re.S)
+DESCRIPTION = re.compile(r"\[TrackDescription\]\n(.*?)\n\[End TrackDescription\]", re.S)
+DEFAULT_TEMPERATURE = 0.5  # FMPromptRunner's default
+
+OPENERS = [
+    "{track} finds {artist} in a {genre} mood.",
+    "On {track}, {artist} lean into {genre}.",
+    "{artist}'s {track} is a {genre} cut from {album}.",
+]
+CLOSERS = [
+    "It came out on {released}.",
+    "{album} carries it, released {released}.",
+    "",
+]
+
+
+def standin_response(prompt: str, instructions: str, temperature: float) -> str:
+    h = hashlib.blake2b(f"{instructions}\0{temperature:g}\0{prompt}".encode(), digest_size=8).digest()
+    m = SONG.search(prompt)
+    if not m:
+        return f"A stand-in note for this prompt ({h.hex()[:8]})."
+    track, artist, album, genre, released = (g or "" for g in m.groups())
+    fields = {
+        "track": track, "artist": artist, "album": album,
+        "genre": (genre or "genre-blurring").split(",")[0].lower(),
+        "released": released or "an unknown date",
+    }
+    sentences = [OPENERS[h[0] % len(OPENERS)].format(**fields)]
+    d = DESCRIPTION.search(prompt)
+    if d and h[1] % 2:
+        sentences.append(re.split(r"(?<=[.!?])\s", d.group(1).strip())[0].rstrip(".") + ".")
+    sentences.append(CLOSERS[h[2] % len(CLOSERS)].format(**fields))
+    return " ".join(s for s in sentences if s)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Deterministic local stand-in for FMPromptRunner: same arguments, "
+                    "same output format, no Apple Intelligence needed.",
+        epilog="""\
+examples:
+  uv run python eval/model_standin.py prompts.jsonl prompts/fm_instruction_v19.json out.jsonl
+  uv run python eval/model_standin.py prompts.jsonl prompts/fm_instruction_v19.json out.jsonl -l 10 -t 0.8
+  STANDIN_DELAY=0.5 uv run python eval/run_model.py v19 --backend standin -w 4    # benchmark sharding
+  STANDIN_FAIL_RATE=0.1 STANDIN_HANG_RATE=0.02 \\
+      uv run python eval/run_model.py v19 --backend standin --timeout 5           # exercise retries
+
+the STANDIN_* environment variables set the defaults for --delay, --fail-rate
+and --hang-rate, so they reach the stand-in through run_model.py and run_eval.py.""",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("prompts", type=Path, help="prompts JSONL with a \"prompt\" per line")
+    parser.add_argument("instructions", type=Path, help="instruction JSON (or plain text) file")
+    parser.add_argument("output", type=Path, help="output JSONL to write")
+    parser.add_argument(
+        "-l", type=int, default=None, dest="limit",
+        help="only run the first N prompts",
+    )
+    parser.add_argument(
+        "-t", type=float, default=DEFAULT_TEMPERATURE, dest="temperature",
+        help=f"sampling temperature, mixed into the responses (default: {DEFAULT_TEMPERATURE})",
+    )
+    parser.add_argument(
+        "--delay", type=float, default=float(os.environ.get("STANDIN_DELAY", 0)),
+        help="seconds spent generating each response (default: $STANDIN_DELAY or 0)",
+    )
+    parser.add_argument(
+        "--fail-rate", type=float, default=float(os.environ.get("STANDIN_FAIL_RATE", 0)),
+        help="chance that a prompt fails and is skipped (default: $STANDIN_FAIL_RATE or 0)",
+    )
+    parser.add_argument(
+        "--hang-rate", type=float, default=float(os.environ.get("STANDIN_HANG_RATE", 0)),
+        help="chance that a prompt never finishes (default: $STANDIN_HANG_RATE or 0)",
+    )
+    args = parser.parse_args()
+
+    try:
+        raw = args.instructions.read_text()
+        prompts = [json.loads(l)["prompt"] for l in args.prompts.read_text().split("\n") if l.strip()]
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    try:
+        instructions = json.loads(raw)["instructions"].strip()
+    except (ValueError, KeyError, TypeError):
+        instructions = raw.strip()
+    if args.limit:
+        prompts = prompts[:args.limit]
+    print(f"Loaded {len(prompts)} prompts")
+
+    rng = random.Random()
+    with args.output.open("w") as f:
+        for i, prompt in enumerate(prompts, 1):
+            time.sleep(args.delay)
+            if rng.random() < args.hang_rate:
+                print(f"[{i}/{len(prompts)}] HANG", flush=True)
+                while True:
+                    time.sleep(60)
+            if rng.random() < args.fail_rate:
+                print(f"[{i}/{len(prompts)}] FAILED — stand-in failure", flush=True)
+                continue
+            response = standin_response(prompt, instructions, args.temperature)
+            f.write(json.dumps({"prompt": prompt, "response": response}, ensure_ascii=False, sort_keys=True) + "\n")
+            f.flush()
+            print(f"[{i}/{len(prompts)}] OK", flush=True)
+    print(f"\nDone. Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,30 +7,57 @@ Usage:
     uv run python eval/run_eval.py v19 -l 10 -p 3
     uv run python eval/run_eval.py v19 --prompts data/eval/prompts.jsonl   # skip build
     uv run python eval/run_eval.py v19 --output data/eval/output_v19.jsonl  # skip build+model, just judge
+    uv run python eval/run_eval.py v19 --pipeline                           # judge while the model runs
+
+Prompt building and judging run in this process (build_prompts.build_version,
+judge_output.judge) and hand records over in memory; only the on-device model
+runs as a subprocess. Each stage's output is named by a hash of its inputs, so
+an unchanged rerun reuses it instead of running the stage again, and runs with
+different inputs never pick up each other's artifacts. With --pipeline the
+judge works through the responses while the model is still producing them.
 """
 
 import argparse
+import hashlib
+import json
+import os
+import queue
+import sqlite3
 import subprocess
 import sys
+import threading
 import time
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+import anthropic
+
 ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "eval"))
+
+from lib.log import log_phase, log_info, log_ok, log_warn, log_err, log_file, log_duration, fmt_duration, console
 
-from lib.log import log_phase, log_info, log_ok, log_err, log_duration, fmt_duration
+from build_prompts import build_version, write_prompts
+from judge_output import (
+    CONCURRENCY, JUDGE_MODEL, SYSTEM_PROMPT, USER_PROMPT, JudgeError, JudgeTruncated,
+    build_responses_block, call_judge, chunk_entries, judge, judge_key, judge_options,
+    load_entries, open_judge_cache, cache_lookup, cache_store, print_results,
+)
+from run_model import BACKENDS
+from score_store import open_store, load_run, run_summary
+from screen_output import screen
 
 EVAL_DIR = ROOT / "eval"
 DATA_DIR = ROOT / "data" / "eval"
 PROMPTS_DIR = ROOT / "prompts"
 
 
-def run(cmd: list[str], label: str) -> None:
+def run(cmd: list[str], label: str, env: dict[str, str] | None = None) -> None:
     log_phase(label)
     log_info(f"$ {' '.join(cmd)}")
     t0 = time.perf_counter()
-    result = subprocess.run(cmd)
+    result = subprocess.run(cmd, env=env)
     elapsed = time.perf_counter() - t0
     if result.returncode != 0:
         log_err(f"{label} failed (exit {result.returncode}) after {fmt_duration(elapsed)}")
@@ -38,6 +65,382 @@ def run(cmd: list[str], label: str) -> None:
     log_duration(elapsed, label)
 
 
+def read_records(path: Path) -> list[dict]:
+    return [json.loads(l) for l in path.read_text().split("\n") if l.strip()]
+
+
+def partial_path(path: Path) -> Path:
+    """Where a stage writes `path` before moving it into place on success."""
+    return path.with_name(f".{path.stem}.{os.getpid()}.partial{path.suffix}")
+
+
+# ── Stage cache ──────────────────────────────────────────────
+# Each stage's output is named by a hash of everything it depends on, so an
+# unchanged rerun finds its prompts, model output and judge run already in
+# place and skips the stage:
+#   prompts  context file, instruction JSON, limit, build_prompts.py
+#   output   prompts file, instruction JSON, limit, temperature, backend
+#            (FMPromptRunner app with its bundled LoRA adapter, or the
+#            stand-in script)
+#   judge    the (prompt, response) records, rubric, judge model, passes
+# A stage only moves its file into place once it has finished, so an
+# interrupted run never leaves a hit behind. --force ignores hits.
+
+def file_digest(path: Path) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with path.open("rb") as f:
+        while block := f.read(1 << 20):
+            h.update(block)
+    return h.hexdigest()
+
+
+def tree_digest(root: Path) -> str:
+    """Digest of every file under root, by relative path and content."""
+    if not root.exists():
+        return "missing"
+    h = hashlib.blake2b(digest_size=16)
+    for path in sorted(p for p in root.rglob("*") if p.is_file()):
+        h.update(f"{path.relative_to(root)}\0{file_digest(path)}\0".encode())
+    return h.hexdigest()
+
+
+def stage_key(*parts) -> str:
+    payload = json.dumps(parts, ensure_ascii=False)
+    return hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()
+
+
+def prompts_key(context: Path, instruction: Path, limit: int | None) -> str:
+    return stage_key(
+        "prompts", file_digest(context), file_digest(instruction), limit,
+        file_digest(EVAL_DIR / "build_prompts.py"), file_digest(ROOT / "lib" / "normalize.py"),
+    )
+
+
+def output_key(
+    prompts_file: Path, instruction: Path, limit: int | None, temperature: float | None, runner: str,
+) -> str:
+    """Key for a model run; `runner` is tree_digest() of the backend's source."""
+    return stage_key(
+        "output", file_digest(prompts_file), file_digest(instruction), limit, temperature, runner,
+    )
+
+
+def judge_stage_key(entries: list[dict], passes: int) -> str:
+    return stage_key(
+        "judge", [(e.get("prompt"), e.get("response")) for e in entries],
+        SYSTEM_PROMPT, USER_PROMPT, JUDGE_MODEL, passes,
+        # The screener's grounding suspects go to the judge as hints
+        file_digest(EVAL_DIR / "screen_output.py"),
+    )
+
+
+def judged_run(key: str, version: str, ranked: bool = True) -> int | None:
+    """The latest run of `version` judged from the same inputs, if any.
+
+    Ranked and unranked runs (run_sweep.py's cells) are looked up separately,
+    so a sweep over the same inputs doesn't stand in for a ranked run.
+    """
+    store = open_store()
+    try:
+        row = store.execute(
+            "SELECT MAX(id) FROM runs WHERE version = ? AND ranked = ? "
+            "AND json_extract(meta, '$.stage_key') = ?",
+            (version, int(ranked), key),
+        ).fetchone()
+    finally:
+        store.close()
+    return row[0]
+
+
+def show_run(run_id: int) -> None:
+    store = open_store()
+    try:
+        run = load_run(store, run_id)
+    finally:
+        store.close()
+    # Stored item ids have gaps after --skip-broken or --suspects-only runs
+    print_results(run["version"], run_summary(run), run["entries"])
+
+
+# ── Stages ───────────────────────────────────────────────────
+
+
+def build_stage(context: Path, version: str, limit: int | None, prompts_file: Path) -> list[dict]:
+    """Build {"id", "prompt"} records and write them where the model will read them."""
+    label = f"Building prompts ({version})"
+    log_phase(label)
+    t0 = time.perf_counter()
+    prompts = build_version(context, version, limit)
+    tmp = partial_path(prompts_file)
+    write_prompts(prompts, {tmp: None})
+    os.replace(tmp, prompts_file)
+    log_file(prompts_file)
+    log_duration(time.perf_counter() - t0, label)
+    return prompts
+
+
+def model_command(
+    version: str, prompts_file: Path, limit: int | None = None, temperature: float | None = None,
+    backend: str = "fm", workers: int = 1,
+) -> list[str]:
+    cmd = [sys.executable, str(EVAL_DIR / "run_model.py"), version, str(prompts_file)]
+    if limit:
+        cmd += ["-l", str(limit)]
+    if temperature is not None:
+        cmd += ["-t", str(temperature)]
+    if backend != "fm":
+        cmd += ["--backend", backend]
+    if workers > 1:
+        cmd += ["-w", str(workers)]
+    return cmd
+
+
+def model_stage(
+    version: str, prompts_file: Path, output_file: Path,
+    limit: int | None = None, temperature: float | None = None,
+    backend: str = "fm", workers: int = 1,
+) -> list[dict]:
+    """Run the model into output_file; returns its {"prompt", "response"} records."""
+    cmd = model_command(version, prompts_file, limit, temperature, backend, workers)
+    label = f"Running model ({version})" if temperature is None else f"Running model ({version}, t={temperature:g})"
+    run(cmd, label, env={**os.environ, "FM_OUTPUT": str(output_file)})
+    return read_records(output_file)
+
+
+def attach_ids(outputs: list[dict], prompts: list[dict]) -> list[dict]:
+    """Give each output its prompt's ID. The model runner skips prompts that fail,
+    so outputs are matched on the prompt text rather than by position."""
+    ids = {p["prompt"]: p["id"] for p in prompts if "prompt" in p}
+    for e in outputs:
+        if e.get("prompt") in ids:
+            e["id"] = ids[e["prompt"]]
+    missing = len(prompts) - len(outputs)
+    if missing > 0:
+        log_warn(f"{missing} prompt{'s' if missing != 1 else ''} produced no response")
+    return outputs
+
+
+def judge_stage(
+    version: str, entries: list[dict], output_file: Path, passes: int, meta: dict | None = None,
+) -> dict:
+    label = f"Judging output ({version})"
+    t0 = time.perf_counter()
+    summary = judge(entries, version, output_file, judge_options(output_file, passes=passes), meta)
+    log_duration(time.perf_counter() - t0, label)
+    return summary
+
+
+# ── Judge queue ──────────────────────────────────────────────
+
+
+class JudgeQueue:
+    """Judge requests for responses the judge cache doesn't have yet, sent
+    through a shared pool so several sources of responses draw on one
+    concurrency budget. Call submit() and collect() from the thread that
+    opened `cache`; fresh scores go into it under judge_output.py's keys.
+    Like judge(), entries carry their grounding suspects as hints unless
+    hints=False.
+    """
+
+    def __init__(self, pool: ThreadPoolExecutor, cache: sqlite3.Connection, hints: bool = True):
+        self.pool = pool
+        self.cache = cache
+        self.hints = hints
+        self.client = None
+        self.futures: dict = {}
+        self.judged = 0
+        self.cached = 0
+
+    def submit(self, items: list[tuple[int, dict]], passes: int, tag: str = "") -> None:
+        """Queue every uncached (pass, entry) for `items`, (position, entry) pairs."""
+        if self.hints:
+            for _, e in items:
+                suspects = screen(e)["suspects"]
+                if suspects:
+                    e["suspects"] = suspects
+        keys = {(p, i): judge_key(e, p) for i, e in items for p in range(passes)}
+        hits = cache_lookup(self.cache, list(keys.values()))
+        self.cached += sum(1 for k in keys.values() if k in hits)
+        for p in range(passes):
+            todo = [(i, e) for i, e in items if keys[p, i] not in hits]
+            for chunk in chunk_entries(todo):
+                ids = [i for i, _ in chunk]
+                label = f"{tag}#{ids[0]}–{ids[-1]}"
+                if passes > 1:
+                    label = f"{tag}Pass {p + 1} · #{ids[0]}–{ids[-1]}"
+                self.send(p, chunk, label)
+
+    def send(self, p: int, chunk: list[tuple[int, dict]], label: str) -> None:
+        self.client = self.client or anthropic.Anthropic()
+        user = USER_PROMPT.format(responses=build_responses_block(chunk))
+        self.futures[self.pool.submit(call_judge, self.client, user, label)] = (p, chunk, label)
+
+    def collect(self, block: bool) -> None:
+        """Store the scores of finished requests; with block, wait for at least one.
+
+        A request that ran out of output tokens is sent again as two halves.
+        Other failures are left out of the cache, so the closing judge stage
+        asks for those entries again.
+        """
+        done = [f for f in self.futures if f.done()]
+        if block and not done:
+            done = [next(as_completed(self.futures))]
+        for future in done:
+            p, chunk, label = self.futures.pop(future)
+            try:
+                scores, _ = future.result()
+            except JudgeError as e:
+                if isinstance(e, JudgeTruncated) and len(chunk) > 1:
+                    half = len(chunk) // 2
+                    log_warn(f"{label}: {e} — splitting its {len(chunk)} entries in two")
+                    self.send(p, chunk[:half], f"{label} · 1/2")
+                    self.send(p, chunk[half:], f"{label} · 2/2")
+                else:
+                    log_warn(f"{label}: {e} — left for the judge stage")
+                continue
+            by_id = dict(chunk)
+            scored = [s for s in scores if s["id"] in by_id]
+            cache_store(self.cache, [(judge_key(by_id[s["id"]], p), s) for s in scored])
+            self.judged += len(scored)
+
+
+# ── Pipelined mode ───────────────────────────────────────────
+# With --pipeline the judge doesn't wait for the model. run_model.py writes
+# one line per response as it goes; a reader thread tails the output file
+# into a bounded queue, and the judge sends chunks off the queue to the API
+# while the model is still running. Fresh scores go into the judge cache, so
+# the closing judge_stage() only assembles and records them. When the judge
+# falls behind, the queue fills and the reader waits; the runner keeps
+# writing, with the output file as the overflow buffer.
+
+PIPE_CHUNK = 25
+PIPE_QUEUE = 100
+PIPE_POLL = 0.2
+
+
+def tail_responses(path: Path, proc: subprocess.Popen, responses: queue.Queue, stats: dict) -> None:
+    """Queue each response line as the runner writes it; None once it has exited."""
+    try:
+        with path.open() as f:
+            partial = ""
+            while True:
+                exited = proc.poll() is not None
+                if exited and "exited" not in stats:
+                    stats["exited"] = time.perf_counter()
+                line = f.readline()
+                if line.endswith("\n"):
+                    e = json.loads(partial + line)
+                    partial = ""
+                    stats["model"] += 1
+                    t0 = time.perf_counter()
+                    responses.put(e)
+                    stats["blocked"] += time.perf_counter() - t0
+                elif exited and not line:
+                    break
+                else:
+                    partial += line
+                    time.sleep(PIPE_POLL)
+    finally:
+        # Always release the judge loop, even if reading failed, and leave an
+        # exit time for pipeline_stage() to report
+        stats.setdefault("exited", time.perf_counter())
+        responses.put(None)
+
+
+def pipeline_stage(
+    version: str, prompts: list[dict], prompts_file: Path, output_file: Path,
+    limit: int | None = None, temperature: float | None = None, passes: int = 1,
+    backend: str = "fm", workers: int = 1,
+) -> list[dict]:
+    """Run the model and judge its responses as they arrive; returns the output records.
+
+    Scores are cached under the same keys judge_output.py uses, so passing the
+    records to judge_stage() afterwards makes no further API calls for them.
+    """
+    label = f"Running model + judge ({version})"
+    log_phase(label)
+    cmd = model_command(version, prompts_file, limit, temperature, backend, workers)
+    log_info(f"$ {' '.join(cmd)}")
+    log_info(f"Judging chunks of {PIPE_CHUNK} while the model runs · queue of {PIPE_QUEUE} · "
+             f"up to {CONCURRENCY} requests at a time")
+    expected = min(len(prompts), limit) if limit else len(prompts)
+    t0 = time.perf_counter()
+
+    responses: queue.Queue = queue.Queue(maxsize=PIPE_QUEUE)
+    stats = {"model": 0, "blocked": 0.0, "idle": 0.0}
+    entries: list[dict] = []
+    # The reader opens the file before the runner has necessarily created it
+    output_file.touch()
+    proc = subprocess.Popen(
+        cmd, env={**os.environ, "FM_OUTPUT": str(output_file)},
+        stdout=subprocess.DEVNULL,
+    )
+    reader = threading.Thread(
+        target=tail_responses,
+        args=(output_file, proc, responses, stats),
+        daemon=True,
+    )
+    reader.start()
+
+    cache = open_judge_cache()
+    pending: list[tuple[int, dict]] = []
+    finished = False
+    try:
+        with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool, \
+                console.status("[bold cyan]Starting…") as status:
+            judges = JudgeQueue(pool, cache)
+            while not finished:
+                # Backpressure: stop taking responses while the judge is saturated
+                if len(judges.futures) >= 2 * CONCURRENCY:
+                    judges.collect(block=True)
+                    continue
+                t_wait = time.perf_counter()
+                try:
+                    e = responses.get(timeout=PIPE_POLL)
+                except queue.Empty:
+                    e = False
+                if not judges.futures:
+                    # Nothing in flight: the judge is waiting on the model
+                    stats["idle"] += time.perf_counter() - t_wait
+                if e is None:
+                    finished = True
+                elif e:
+                    entries.append(e)
+                    pending.append((len(entries), e))
+                if len(pending) >= PIPE_CHUNK or (finished and pending):
+                    judges.submit(pending, passes)
+                    pending = []
+                judges.collect(block=False)
+                status.update(
+                    f"[bold cyan]Model {stats['model']}/{expected}"
+                    f"{' done' if finished else ''} · queue {responses.qsize()}/{PIPE_QUEUE} · "
+                    f"judged {judges.judged + judges.cached} · {len(judges.futures)} in flight"
+                )
+            while judges.futures:
+                judges.collect(block=True)
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        cache.close()
+
+    elapsed = time.perf_counter() - t0
+    if proc.returncode != 0:
+        log_err(f"Model run failed (exit {proc.returncode}) after {fmt_duration(elapsed)}")
+        sys.exit(proc.returncode)
+    model_time = stats["exited"] - t0
+    log_info(
+        f"Model: {stats['model']} responses in {fmt_duration(model_time)} · "
+        f"judge: {judges.judged} scores fresh, {judges.cached} cached, "
+        f"finished {fmt_duration(elapsed - model_time)} after the model"
+    )
+    if stats["blocked"] >= 1:
+        log_warn(f"Judge was the bottleneck: the queue was full for {fmt_duration(stats['blocked'])}")
+    elif stats["idle"] >= 1:
+        log_info(f"Model was the bottleneck: the judge waited {fmt_duration(stats['idle'])} for responses")
+    log_duration(elapsed, label)
+    return attach_ids(entries, prompts[:limit] if limit else prompts)
+
+
 def main():
     pipeline_start = time.perf_counter()
     parser = argparse.ArgumentParser(
@@ -51,11 +454,19 @@ examples:
   uv run python eval/run_eval.py v19 -t 0.8                  # custom temperature
   uv run python eval/run_eval.py v19 --prompts prompts.jsonl # skip build step
   uv run python eval/run_eval.py v19 --output output.jsonl   # skip build+model, judge only
+  uv run python eval/run_eval.py v19 --pipeline              # judge while the model runs
+  uv run python eval/run_eval.py v19 --force                 # re-run unchanged stages too
+  uv run python eval/run_eval.py v19 -w 4                    # 4 model worker processes
+  uv run python eval/run_eval.py v19 --backend standin       # no Mac needed (CI)
 
 pipeline steps:
   1. build_prompts.py  — assemble FM prompts from context JSONL (skip with --prompts)
-  2. run_model.sh      — run prompts through on-device model   (skip with --output)
-  3. judge_output.py   — score outputs with LLM judge""",
+  2. run_model.py      — run prompts through on-device model   (skip with --output)
+  3. judge_output.py   — score outputs with LLM judge
+
+prompts and outputs go to data/eval/prompts_<version>_<key>.jsonl and
+data/eval/output_<version>_<key>.jsonl, keyed by a hash of each stage's inputs;
+a stage whose inputs are unchanged is skipped (--force to re-run it).""",
         formatter_class=argparse.RawDescriptionHelpFormatter,
     )
     parser.add_argument(
@@ -74,9 +485,18 @@ pipeline steps:
     )
     parser.add_argument(
         "-t", "--temperature", type=float, default=None,
-        help="model sampling temperature forwarded to FMPromptRunner "
+        help="model sampling temperature forwarded to the model runner "
              "(default: model's built-in default)",
     )
+    parser.add_argument(
+        "--backend", choices=sorted(BACKENDS), default="fm",
+        help="model runner: fm (FMPromptRunner) or standin (deterministic, "
+             "runs anywhere) (default: fm)",
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=1,
+        help="model runner processes, each over its own shard of the prompts (default: 1)",
+    )
     parser.add_argument(
         "--context", type=Path, default=DATA_DIR / "context_top100.jsonl",
         help="context JSONL file with MusicKit + Genius metadata "
@@ -90,6 +510,15 @@ pipeline steps:
         "--output", type=Path, default=None,
         help="skip build and model steps — judge this output JSONL file directly",
     )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="re-run every stage, even when its inputs match an earlier run",
+    )
+    parser.add_argument(
+        "--pipeline", action="store_true",
+        help="judge responses in chunks while the model is still running, "
+             "instead of after it finishes",
+    )
     args = parser.parse_args()
 
     if args.limit is not None and args.limit < 1:
@@ -104,6 +533,10 @@ pipeline steps:
         log_err(f"--temperature must be non-negative, got {args.temperature}")
         sys.exit(1)
 
+    if args.workers < 1:
+        log_err(f"--workers must be a positive integer, got {args.workers}")
+        sys.exit(1)
+
     version = args.version
     instruction = PROMPTS_DIR / f"fm_instruction_{version}.json"
     if not instruction.exists():
@@ -124,58 +557,64 @@ pipeline steps:
 
     # Step 1: Build prompts (unless --prompts or --output given)
     if args.output:
-        prompts_file = None
         output_file = args.output
-    elif args.prompts:
-        prompts_file = args.prompts
+        entries = load_entries(output_file, args.limit)
     else:
-        prompts_file = DATA_DIR / "prompts_top100.jsonl"
-        cmd = [
-            sys.executable, str(EVAL_DIR / "build_prompts.py"),
-            str(args.context), "-v", version,
-            "-o", str(prompts_file),
-        ]
-        if args.limit:
-            cmd += ["-l", str(args.limit)]
-        run(cmd, f"Building prompts ({version})")
-
-    # Step 2: Run model (unless --output given)
-    if not args.output:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_file = DATA_DIR / f"output_{version}_{timestamp}.jsonl"
-        DATA_DIR.mkdir(parents=True, exist_ok=True)
-
-        cmd = [
-            str(EVAL_DIR / "run_model.sh"),
-            version, str(prompts_file),
-        ]
-        if args.limit:
-            cmd += ["-l", str(args.limit)]
-        if args.temperature is not None:
-            cmd += ["-t", str(args.temperature)]
-        run(cmd, f"Running model ({version})")
-
-        # run_model.sh generates its own timestamped filename, find the latest
-        outputs = sorted(DATA_DIR.glob(f"output_{version}_*.jsonl"))
-        if not outputs:
-            log_err(f"No output file found for {version}")
-            sys.exit(1)
-        output_file = outputs[-1]
+        if args.prompts:
+            prompts_file = args.prompts
+            prompts = read_records(prompts_file)
+        else:
+            key = prompts_key(args.context, instruction, args.limit)
+            prompts_file = DATA_DIR / f"prompts_{version}_{key}.jsonl"
+            if prompts_file.exists() and not args.force:
+                log_phase(f"Building prompts ({version})")
+                prompts = read_records(prompts_file)
+                log_ok(f"Inputs unchanged — reusing {len(prompts)} prompts from {prompts_file.name}")
+            else:
+                prompts = build_stage(args.context, version, args.limit, prompts_file)
+
+        # Step 2: Run model
+        runner = tree_digest(BACKENDS[args.backend].source)
+        key = output_key(prompts_file, instruction, args.limit, args.temperature, runner)
+        output_file = DATA_DIR / f"output_{version}_{key}.jsonl"
+        expected = prompts[:args.limit] if args.limit else prompts
+        if output_file.exists() and not args.force:
+            log_phase(f"Running model ({version})")
+            entries = attach_ids(read_records(output_file), expected)
+            log_ok(f"Inputs unchanged — reusing {len(entries)} responses from {output_file.name}")
+        else:
+            tmp = partial_path(output_file)
+            try:
+                if args.pipeline:
+                    entries = pipeline_stage(
+                        version, prompts, prompts_file, tmp,
+                        args.limit, args.temperature, args.passes, args.backend, args.workers,
+                    )
+                else:
+                    entries = attach_ids(
+                        model_stage(
+                            version, prompts_file, tmp, args.limit, args.temperature,
+                            args.backend, args.workers,
+                        ),
+                        expected,
+                    )
+                os.replace(tmp, output_file)
+            finally:
+                tmp.unlink(missing_ok=True)
+            log_ok(f"{len(entries)} responses in {output_file.name}")
 
     # Step 3: Judge
-    if not output_file.exists():
-        log_err(f"Output file not found: {output_file}")
+    if not entries:
+        log_err(f"No responses to judge in {output_file}")
         sys.exit(1)
-
-    cmd = [
-        sys.executable, str(EVAL_DIR / "judge_output.py"),
-        str(output_file),
-    ]
-    if args.limit:
-        cmd += ["-l", str(args.limit)]
-    if args.passes > 1:
-        cmd += ["-p", str(args.passes)]
-    run(cmd, f"Judging output ({version})")
+    key = judge_stage_key(entries, args.passes)
+    run_id = None if args.force else judged_run(key, version)
+    if run_id is None:
+        judge_stage(version, entries, output_file, args.passes, meta={"stage_key": key})
+    else:
+        log_phase(f"Judging output ({version})")
+        log_ok(f"Inputs unchanged — already judged as run {run_id} in the score store")
+        show_run(run_id)
 
     total = time.perf_counter() - pipeline_start
     log_phase("Done")
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""Run prompts through the on-device model, sharded across worker processes.
+
+Usage:
+    uv run python eval/run_model.py v19
+    uv run python eval/run_model.py v19 data/eval/my_prompts.jsonl -l 10 -t 0.8
+    uv run python eval/run_model.py v19 -w 4 --timeout 120 --retries 2
+    uv run python eval/run_model.py v19 --backend standin    # deterministic stand-in, runs anywhere
+
+A backend is an executable with FMPromptRunner's interface: it takes a
+prompts file, an instruction file and an output file, and writes one
+{"prompt", "response"} line per prompt as it answers it, leaving out the
+prompts that fail. "fm" is FMPromptRunner itself; "standin" is
+model_standin.py, which needs no Apple Intelligence.
+
+The prompts are dealt round-robin into one shard per worker, and each worker
+runs a backend process over its shard. Workers follow their process's output
+line by line, so each prompt is accounted for as it finishes: one the backend
+skipped, or one that produced nothing within --timeout (the process is then
+killed and restarted past it), is retried up to --retries times. Responses
+are written to the output file as soon as every prompt before them is done,
+so the file grows in prompt order and can be read while the run goes on.
+"""
+
+import argparse
+import json
+import os
+import queue
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from lib.log import log_phase, log_info, log_ok, log_warn, log_err, log_file, log_duration, console
+
+EVAL_DIR = ROOT / "eval"
+DATA_DIR = ROOT / "data" / "eval"
+PROMPTS_DIR = ROOT / "prompts"
+
+# The Xcode build of FMPromptRunner; its bundle also carries the adapter
+RUNNER_APP = ROOT.parent / "app" / "DerivedData" / "Ficino" / "Build" / "Products" / "Debug" / "FMPromptRunner.app"
+
+TIMEOUT = 300
+RETRIES = 1
+POLL = 0.2
+EXIT_GRACE = 10
+
+
+# ── Backends ─────────────────────────────────────────────────
+
+
+class Backend:
+    """A model runner executable with FMPromptRunner's command line.
+
+    `source` is what determines its responses (the app bundle with its
+    adapter, or the stand-in script); run_eval.py's stage cache hashes it.
+    """
+
+    def __init__(self, name: str, command: list[str], source: Path, missing: str):
+        self.name = name
+        self.command = command
+        self.source = source
+        self.missing = missing
+
+    def available(self) -> bool:
+        return Path(self.command[-1]).exists()
+
+    def argv(self, prompts: Path, instruction: Path, output: Path, temperature: float | None) -> list[str]:
+        cmd = [*self.command, str(prompts), str(instruction), str(output)]
+        if temperature is not None:
+            cmd += ["-t", str(temperature)]
+        return cmd
+
+
+BACKENDS = {
+    "fm": Backend(
+        "fm", [str(RUNNER_APP / "Contents" / "MacOS" / "FMPromptRunner")], RUNNER_APP,
+        "FMPromptRunner not built. Build it in Xcode first, or use --backend standin.",
+    ),
+    "standin": Backend(
+        "standin", [sys.executable, str(EVAL_DIR / "model_standin.py")], EVAL_DIR / "model_standin.py",
+        "eval/model_standin.py is missing.",
+    ),
+}
+
+
+# ── Workers ──────────────────────────────────────────────────
+
+
+class Shard:
+    """One worker's prompts, run through backend processes until each one has
+    a response or has used up its attempts.
+
+    Every prompt ends up on `results` exactly once, as (index, record), with
+    record None for a prompt that never got a response.
+    """
+
+    def __init__(
+        self, worker: int, items: list[tuple[int, dict]], backend: Backend, instruction: Path,
+        temperature: float | None, timeout: float, retries: int, workdir: Path, results: queue.Queue,
+    ):
+        self.worker = worker
+        self.items = items
+        self.backend = backend
+        self.instruction = instruction
+        self.temperature = temperature
+        self.timeout = timeout
+        self.retries = retries
+        self.workdir = workdir
+        self.results = results
+        self.attempts = {i: 0 for i, _ in items}
+        self.settled: set[int] = set()
+        self.proc: subprocess.Popen | None = None
+        self.stopped = False
+        self.stats = {"retried": 0, "timeouts": 0, "crashes": 0}
+
+    def run(self) -> None:
+        todo = list(self.items)
+        try:
+            launch = 0
+            while todo and not self.stopped:
+                launch += 1
+                failed, untried = self.launch(todo, launch)
+                retry = [(i, p) for i, p in failed if self.attempts[i] <= self.retries]
+                self.stats["retried"] += len(retry)
+                for i, _ in failed:
+                    if self.attempts[i] > self.retries:
+                        self.settle(i, None)
+                todo = sorted(retry + untried)
+        finally:
+            # Release the writer for anything left over, e.g. after an interrupt
+            for i, _ in self.items:
+                self.settle(i, None)
+
+    def settle(self, i: int, record: dict | None) -> None:
+        if i not in self.settled:
+            self.settled.add(i)
+            self.results.put((i, record))
+
+    def launch(self, todo: list[tuple[int, dict]], launch: int) -> tuple[list, list]:
+        """One backend process over `todo`; returns (failed, never tried) prompts."""
+        stem = f"shard{self.worker}.{launch}"
+        prompts_file = self.workdir / f"{stem}.prompts.jsonl"
+        output_file = self.workdir / f"{stem}.out.jsonl"
+        log_path = self.workdir / f"{stem}.log"
+        prompts_file.write_text("".join(json.dumps(p, ensure_ascii=False) + "\n" for _, p in todo))
+        for i, _ in todo:
+            self.attempts[i] += 1
+
+        pending = deque(todo)
+        failed: list[tuple[int, dict]] = []
+        with log_path.open("w") as log:
+            self.proc = subprocess.Popen(
+                self.backend.argv(prompts_file, self.instruction, output_file, self.temperature),
+                stdout=log, stderr=subprocess.STDOUT,
+            )
+        last = time.monotonic()
+        killed = False
+        f = None
+        partial = ""
+        try:
+            while pending:
+                exited = self.proc.poll() is not None
+                # The backend creates its output file; open it once it's there
+                if f is None and output_file.exists():
+                    f = output_file.open()
+                line = f.readline() if f else ""
+                if line.endswith("\n"):
+                    record = json.loads(partial + line)
+                    partial = ""
+                    # The backend skips prompts that fail, so any before this one did
+                    while pending and pending[0][1]["prompt"] != record.get("prompt"):
+                        failed.append(pending.popleft())
+                    if pending:
+                        i, p = pending.popleft()
+                        self.settle(i, {**({"id": p["id"]} if "id" in p else {}), **record})
+                    last = time.monotonic()
+                elif exited and not line:
+                    break
+                elif self.timeout and time.monotonic() - last > self.timeout:
+                    # Stuck on the first unanswered prompt: give up on it, restart past it
+                    self.proc.kill()
+                    failed.append(pending.popleft())
+                    self.stats["timeouts"] += 1
+                    for i, _ in pending:
+                        self.attempts[i] -= 1
+                    return failed, list(pending)
+                else:
+                    partial += line
+                    time.sleep(POLL)
+            # Every prompt is settled; give the backend a moment to exit by itself
+            try:
+                self.proc.wait(timeout=EXIT_GRACE)
+            except subprocess.TimeoutExpired:
+                killed = True
+        finally:
+            if f:
+                f.close()
+            if self.proc.poll() is None:
+                self.proc.kill()
+            self.proc.wait()
+        if self.proc.returncode != 0 and not killed and not self.stopped:
+            self.stats["crashes"] += 1
+            tail = log_path.read_text().strip().split("\n")[-1]
+            log_warn(f"Worker {self.worker + 1}: backend exited {self.proc.returncode} — {tail[:200]}")
+        return failed + list(pending), []
+
+    def stop(self) -> None:
+        self.stopped = True
+        if self.proc and self.proc.poll() is None:
+            self.proc.kill()
+
+
+def run_sharded(
+    prompts: list[dict], backend: Backend, instruction: Path, output: Path,
+    temperature: float | None = None, workers: int = 1,
+    timeout: float = TIMEOUT, retries: int = RETRIES,
+) -> dict:
+    """Run `prompts` on `workers` backend processes into `output`, in prompt order.
+
+    Returns counts of prompts answered, failed, retried and timed out.
+    """
+    results: queue.Queue = queue.Queue()
+    written = 0
+    done = 0
+    with tempfile.TemporaryDirectory(prefix="run_model.") as tmp:
+        shards = [
+            Shard(
+                k, list(enumerate(prompts))[k::workers], backend, instruction,
+                temperature, timeout, retries, Path(tmp), results,
+            )
+            for k in range(min(workers, len(prompts)))
+        ]
+        threads = [threading.Thread(target=s.run, daemon=True) for s in shards]
+        for t in threads:
+            t.start()
+        buffered: dict[int, dict | None] = {}
+        try:
+            with output.open("w") as out, console.status("[bold cyan]Starting…") as status:
+                while done < len(prompts):
+                    i, record = results.get()
+                    buffered[i] = record
+                    # Write each response once every prompt before it is settled
+                    while done in buffered:
+                        record = buffered.pop(done)
+                        done += 1
+                        if record:
+                            out.write(json.dumps(record, ensure_ascii=False, sort_keys=True) + "\n")
+                            out.flush()
+                            written += 1
+                    status.update(
+                        f"[bold cyan]{written + sum(1 for r in buffered.values() if r)}/{len(prompts)} "
+                        f"responses · {done - written} failed · written through #{done}"
+                    )
+        finally:
+            for s in shards:
+                s.stop()
+            for t in threads:
+                t.join()
+    return {
+        "responses": written,
+        "failed": len(prompts) - written,
+        "retried": sum(s.stats["retried"] for s in shards),
+        "timeouts": sum(s.stats["timeouts"] for s in shards),
+        "crashes": sum(s.stats["crashes"] for s in shards),
+    }
+
+
+# ── Main ─────────────────────────────────────────────────────
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run prompts through the on-device model (or a stand-in), sharded "
+                    "across worker processes, with retries and per-prompt timeouts.",
+        epilog="""\
+examples:
+  uv run python eval/run_model.py v19                               # FMPromptRunner, 1 worker
+  uv run python eval/run_model.py v19 data/eval/my_prompts.jsonl -l 10 -t 0.8
+  uv run python eval/run_model.py v19 -w 4                          # 4 FMPromptRunner processes
+  uv run python eval/run_model.py v19 --timeout 60 --retries 3      # impatient with stuck prompts
+  uv run python eval/run_model.py v19 --backend standin -w 8        # Linux / CI
+
+backends:
+  fm        FMPromptRunner from the Xcode build (macOS 26, Apple Intelligence)
+  standin   eval/model_standin.py — deterministic template responses, no model
+
+output goes to $FM_OUTPUT if set, else data/eval/output_<version>_<timestamp>.jsonl.""",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "version",
+        help="version tag (e.g. v19) — must match an existing instruction file at "
+             "prompts/fm_instruction_<version>.json",
+    )
+    parser.add_argument(
+        "prompts", type=Path, nargs="?", default=DATA_DIR / "prompts_top100.jsonl",
+        help="prompts JSONL file (default: data/eval/prompts_top100.jsonl)",
+    )
+    parser.add_argument(
+        "-l", "--limit", type=int, default=None,
+        help="only run the first N prompts (default: no limit)",
+    )
+    parser.add_argument(
+        "-t", "--temperature", type=float, default=None,
+        help="model sampling temperature (default: the backend's, 0.5 for FMPromptRunner)",
+    )
+    parser.add_argument(
+        "-o", "--output", type=Path, default=None,
+        help="output JSONL file (default: $FM_OUTPUT, else a timestamped file in data/eval/)",
+    )
+    parser.add_argument(
+        "--backend", choices=sorted(BACKENDS), default="fm",
+        help="model runner to use (default: fm)",
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=1,
+        help="backend processes to run at once, each over its own shard (default: 1)",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=TIMEOUT,
+        help=f"seconds a worker waits for its next response before killing the backend "
+             f"and moving past the prompt; the first includes model load, 0 to wait "
+             f"forever (default: {TIMEOUT})",
+    )
+    parser.add_argument(
+        "--retries", type=int, default=RETRIES,
+        help=f"extra attempts for a prompt that failed or timed out (default: {RETRIES})",
+    )
+    args = parser.parse_args()
+
+    if args.limit is not None and args.limit < 1:
+        log_err(f"--limit must be a positive integer, got {args.limit}")
+        sys.exit(1)
+
+    if args.temperature is not None and args.temperature < 0:
+        log_err(f"--temperature must be non-negative, got {args.temperature}")
+        sys.exit(1)
+
+    if args.workers < 1 or args.retries < 0 or args.timeout < 0:
+        log_err("--workers must be positive, --retries and --timeout non-negative")
+        sys.exit(1)
+
+    backend = BACKENDS[args.backend]
+    if not backend.available():
+        log_err(backend.missing)
+        sys.exit(1)
+
+    instruction = PROMPTS_DIR / f"fm_instruction_{args.version}.json"
+    if not instruction.exists():
+        log_err(f"Instruction file not found: {instruction}")
+        sys.exit(1)
+
+    if not args.prompts.exists():
+        log_err(f"Prompts file not found: {args.prompts}")
+        sys.exit(1)
+
+    output = args.output or Path(os.environ.get("FM_OUTPUT") or (
+        DATA_DIR / f"output_{args.version}_{datetime.now():%Y%m%d_%H%M%S}.jsonl"
+    ))
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    prompts = [json.loads(l) for l in args.prompts.read_text().split("\n") if l.strip()]
+    if args.limit:
+        prompts = prompts[:args.limit]
+    if not prompts:
+        log_err(f"No prompts in {args.prompts}")
+        sys.exit(1)
+
+    label = f"Running model ({args.version}, {backend.name})"
+    log_phase(label)
+    workers = min(args.workers, len(prompts))
+    log_info(
+        f"{len(prompts)} prompts · {workers} worker{'s' if workers != 1 else ''} · "
+        f"timeout {f'{args.timeout:g}s' if args.timeout else 'none'} · "
+        f"{args.retries} retr{'ies' if args.retries != 1 else 'y'}"
+    )
+    t0 = time.perf_counter()
+    stats = run_sharded(
+        prompts, backend, instruction, output, args.temperature, workers, args.timeout, args.retries,
+    )
+    elapsed = time.perf_counter() - t0
+
+    if stats["retried"] or stats["timeouts"]:
+        log_info(f"{stats['retried']} prompt attempts retried, {stats['timeouts']} timed out")
+    if stats["failed"]:
+        log_warn(f"{stats['failed']} prompt{'s' if stats['failed'] != 1 else ''} got no response")
+    if not stats["responses"]:
+        log_err(f"No responses after {elapsed:.1f}s")
+        sys.exit(1)
+    log_ok(f"{stats['responses']} responses · {stats['responses'] / elapsed:.2f}/s")
+    log_file(output)
+    log_duration(elapsed, label)
+
+
+if __name__ == "__main__":
+    main()
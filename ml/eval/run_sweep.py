@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""Sweep a grid of instruction versions × temperatures × judge passes.
+
+Usage:
+    uv run python eval/run_sweep.py v14-v18
+    uv run python eval/run_sweep.py v17,v18 -t 0.3,0.7,1.0 -l 100
+    uv run python eval/run_sweep.py v18 -t 0.5,1.0 -p 1,3 --model-jobs 2
+
+Runs run_eval.py's stages for every cell of the grid from one process. The
+context is parsed once and each version's prompts are built from the same
+records. Up to --model-jobs model runs go at once, each on -w runner
+processes (see run_model.py); as each run finishes, its responses join a
+single judge queue capped at -j requests, so the judge works through one run
+while the next is generating.
+Cells with the same version and temperature share one model run, and their
+judge passes overlap in the judge cache. Stages use run_eval.py's stage
+cache, so a sweep reuses single runs and an interrupted sweep picks up where
+it stopped.
+
+Every cell is recorded in the score store as an unranked run, so it stays
+out of version_rank.md and vrank/, and the sweep writes one comparison table
+with bootstrap CIs and a paired test against the first cell to
+data/eval/sweeps/.
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+from rich.table import Table
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "eval"))
+
+from lib.log import log_phase, log_info, log_ok, log_warn, log_err, log_file, log_duration, fmt_duration, console
+
+from build_prompts import build_prompts, load_task_prompt, log_stats, parse_versions, read_entries, with_task, write_prompts
+from judge_output import CI_CONFIDENCE, CONCURRENCY, judge, judge_options, open_judge_cache
+from run_eval import (
+    DATA_DIR, PROMPTS_DIR, JudgeQueue, attach_ids, judge_stage_key, judged_run,
+    model_stage, output_key, partial_path, prompts_key, read_records, tree_digest,
+)
+from run_model import BACKENDS
+from score_store import DIMS, fmt_flags_compact, load_run, open_store, paired_test, run_summary, write_atomic
+
+SWEEP_DIR = DATA_DIR / "sweeps"
+
+
+def float_list(spec: str) -> list[float]:
+    return list(dict.fromkeys(float(x) for x in spec.split(",") if x.strip()))
+
+
+def int_list(spec: str) -> list[int]:
+    return list(dict.fromkeys(int(x) for x in spec.split(",") if x.strip()))
+
+
+def run_label(version: str, temperature: float | None) -> str:
+    return version if temperature is None else f"{version}-t{temperature:g}"
+
+
+def cell_label(version: str, temperature: float | None, passes: int, multi_pass: bool) -> str:
+    """Score-store label for a cell: the version, plus whatever the grid varies."""
+    label = run_label(version, temperature)
+    return f"{label}-p{passes}" if multi_pass else label
+
+
+# ── Stages ───────────────────────────────────────────────────
+
+
+def build_all(context: Path, versions: list[str], limit: int | None, force: bool) -> dict[str, tuple[Path, list[dict]]]:
+    """(prompts file, records) per version, parsing the context at most once."""
+    label = "Building prompts"
+    log_phase(f"{label} ({len(versions)} version{'s' if len(versions) != 1 else ''})")
+    t0 = time.perf_counter()
+    files = {
+        v: DATA_DIR / f"prompts_{v}_{prompts_key(context, PROMPTS_DIR / f'fm_instruction_{v}.json', limit)}.jsonl"
+        for v in versions
+    }
+    todo = [v for v in versions if force or not files[v].exists()]
+    prompts = {v: read_records(files[v]) for v in versions if v not in todo}
+    if prompts:
+        log_ok(f"Inputs unchanged — reusing prompts for {', '.join(prompts)}")
+    if todo:
+        stats = {"read": 0, "malformed": 0, "skipped": 0, "duplicate": 0}
+        records = build_prompts(read_entries(context, stats), stats)
+        if limit is not None:
+            records = islice(records, limit)
+        records = list(records)
+        log_stats(stats, context)
+        log_ok(f"Built {len(records)} prompts (skipped {stats['skipped']} thin-context tracks)")
+        for v in todo:
+            prompts[v] = list(with_task(records, load_task_prompt(v)))
+            tmp = partial_path(files[v])
+            write_prompts(prompts[v], {tmp: None})
+            os.replace(tmp, files[v])
+            log_file(files[v])
+    log_duration(time.perf_counter() - t0, label)
+    return {v: (files[v], prompts[v]) for v in versions}
+
+
+def model_job(
+    version: str, prompts_file: Path, output_file: Path,
+    limit: int | None, temperature: float | None, backend: str, workers: int,
+) -> list[dict]:
+    tmp = partial_path(output_file)
+    try:
+        records = model_stage(version, prompts_file, tmp, limit, temperature, backend, workers)
+        os.replace(tmp, output_file)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return records
+
+
+# ── Report ───────────────────────────────────────────────────
+
+
+def item_totals(run: dict, entries: list[dict]) -> dict[str, float]:
+    """Merged total per prompt ID. Stored items are 1-based positions in `entries`."""
+    return {
+        entries[s["id"] - 1].get("id", entries[s["id"] - 1]["prompt"]): sum(s[d] for d in DIMS)
+        for s in run["scores"]
+    }
+
+
+def compare_cells(results: list[dict], seed: int) -> None:
+    """Add each cell's paired test against the first cell, matched on prompt ID."""
+    rng = np.random.default_rng(seed)
+    base = results[0]["totals"]
+    for r in results[1:]:
+        shared = [k for k in r["totals"] if k in base]
+        if shared:
+            r["paired"] = paired_test([base[k] for k in shared], [r["totals"][k] for k in shared], rng)
+
+
+def fmt_interval(summary: dict) -> str:
+    ci = summary.get("ci", {}).get("total")
+    return f"{ci[1]:.2f}–{ci[2]:.2f}" if ci else "—"
+
+
+def fmt_paired(r: dict) -> tuple[str, str]:
+    test = r.get("paired")
+    if not test:
+        return "—", "—"
+    return f"{test['mean']:+.2f} ({test['low']:+.2f} to {test['high']:+.2f})", f"{test['p']:.4f}"
+
+
+def print_sweep(results: list[dict]) -> None:
+    base = results[0]["label"]
+    table = Table(show_edge=False, pad_edge=False)
+    table.add_column("Cell", style="bold")
+    table.add_column("n", justify="right", style="dim")
+    table.add_column("Total", justify="right", style="bold")
+    table.add_column(f"{CI_CONFIDENCE:.0%} CI", justify="right", style="dim")
+    table.add_column("Flags")
+    table.add_column(f"Δ vs {base}", justify="right")
+    table.add_column("p", justify="right", style="dim")
+    for r in results:
+        s = r["summary"]
+        test = r.get("paired")
+        delta, p = "—", "—"
+        if test:
+            delta, p = f"{test['mean']:+.2f}", f"{test['p']:.4f}"
+            if test["p"] < 1 - CI_CONFIDENCE:
+                delta = f"[{'red' if test['mean'] < 0 else 'green'}]{delta}[/]"
+        table.add_row(
+            r["label"], str(s["n"]), f"{s['total_avg']:.2f}", fmt_interval(s),
+            fmt_flags_compact(s["flag_counts"]), delta, p,
+        )
+    console.print()
+    console.print(table)
+    console.print()
+
+
+def write_sweep(results: list[dict], args: argparse.Namespace, started: datetime) -> Path:
+    base = results[0]["label"]
+    lines = [
+        f"# Sweep — {started:%Y-%m-%d %H:%M}",
+        "",
+        f"Context `{args.context.name}`"
+        f"{f' · limit {args.limit}' if args.limit else ''} · "
+        f"{CI_CONFIDENCE:.0%} bootstrap CI over items · Δ is the paired mean change in total "
+        f"against {base} on shared prompt IDs, p from a sign-flip test.",
+        "",
+        f"| Cell | Run | n | {' | '.join(d.capitalize() for d in DIMS)} | Total | CI | Flags | Δ vs {base} | p |",
+        f"|------|-----|---|{'---|' * len(DIMS)}-------|----|-------|------|---|",
+    ]
+    for r in results:
+        s = r["summary"]
+        delta, p = fmt_paired(r)
+        dims = " | ".join(f"{s['avgs'][d]:.2f}" for d in DIMS)
+        lines.append(
+            f"| {r['label']} | {r['run_id']} | {s['n']} | {dims} | "
+            f"**{s['total_avg']:.2f}** | {fmt_interval(s)} | {fmt_flags_compact(s['flag_counts'])} | "
+            f"{delta} | {p} |"
+        )
+    path = SWEEP_DIR / f"sweep_{started:%Y%m%d_%H%M%S}.md"
+    write_atomic(path, "\n".join(lines) + "\n")
+    return path
+
+
+# ── Main ─────────────────────────────────────────────────────
+
+
+def main():
+    sweep_start = time.perf_counter()
+    started = datetime.now()
+    parser = argparse.ArgumentParser(
+        description="Run the eval pipeline over a grid of instruction versions × "
+                    "temperatures × judge passes and compare every cell in one table.",
+        epilog="""\
+examples:
+  uv run python eval/run_sweep.py v14-v18                      # five versions, default temperature
+  uv run python eval/run_sweep.py v17,v18 -t 0.3,0.7,1.0       # 2 versions × 3 temperatures
+  uv run python eval/run_sweep.py v18 -t 0.5,1.0 -p 1,3        # ... × 1- and 3-pass judging
+  uv run python eval/run_sweep.py v14-v18 --model-jobs 2 -j 8  # bigger worker budget
+  uv run python eval/run_sweep.py v17,v18 --backend standin    # dry run without the Mac model
+
+every cell's stages are cached like run_eval.py's, so re-running an
+interrupted sweep only does the missing work (--force to re-run it all).
+the comparison table goes to data/eval/sweeps/sweep_<timestamp>.md.""",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "versions",
+        help='versions to sweep: "v18", "v15,v17" or a range "v14-v18"; each must '
+             "have an instruction file at prompts/fm_instruction_<version>.json",
+    )
+    parser.add_argument(
+        "-t", "--temperatures", type=float_list, default=[None],
+        help="comma-separated model sampling temperatures, e.g. 0.3,0.7,1.0 "
+             "(default: model's built-in default)",
+    )
+    parser.add_argument(
+        "-p", "--passes", type=int_list, default=[1],
+        help="comma-separated judge pass counts, e.g. 1,3 (default: 1)",
+    )
+    parser.add_argument(
+        "-l", "--limit", type=int, default=None,
+        help="maximum number of prompts per cell (default: no limit)",
+    )
+    parser.add_argument(
+        "--context", type=Path, default=DATA_DIR / "context_top100.jsonl",
+        help="context JSONL file with MusicKit + Genius metadata "
+             "(default: data/eval/context_top100.jsonl)",
+    )
+    parser.add_argument(
+        "--model-jobs", type=int, default=1,
+        help="model runs to keep going at once (default: 1)",
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=1,
+        help="runner processes per model run, each over its own shard (default: 1)",
+    )
+    parser.add_argument(
+        "--backend", choices=sorted(BACKENDS), default="fm",
+        help="model runner: fm (FMPromptRunner) or standin (deterministic, "
+             "runs anywhere) (default: fm)",
+    )
+    parser.add_argument(
+        "-j", "--concurrency", type=int, default=CONCURRENCY,
+        help=f"judge requests in flight at once, across every cell (default: {CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0,
+        help="seed for the bootstrap CIs and paired tests (default: 0)",
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="re-run every stage, even when its inputs match an earlier run",
+    )
+    args = parser.parse_args()
+
+    if args.limit is not None and args.limit < 1:
+        log_err(f"--limit must be a positive integer, got {args.limit}")
+        sys.exit(1)
+
+    if any(p < 1 for p in args.passes):
+        log_err(f"--passes must be positive integers, got {args.passes}")
+        sys.exit(1)
+
+    if any(t is not None and t < 0 for t in args.temperatures):
+        log_err(f"--temperatures must be non-negative, got {args.temperatures}")
+        sys.exit(1)
+
+    if args.model_jobs < 1 or args.workers < 1 or args.concurrency < 1:
+        log_err("--model-jobs, --workers and --concurrency must be positive integers")
+        sys.exit(1)
+
+    try:
+        versions = parse_versions(args.versions)
+    except ValueError as e:
+        log_err(str(e))
+        sys.exit(1)
+    missing = [v for v in versions if not (PROMPTS_DIR / f"fm_instruction_{v}.json").exists()]
+    if missing:
+        log_err(f"No instruction file for {', '.join(missing)} in {PROMPTS_DIR}")
+        sys.exit(1)
+
+    if not args.context.exists():
+        log_err(f"Context file not found: {args.context}")
+        sys.exit(1)
+
+    runs = [(v, t) for v in versions for t in args.temperatures]
+    multi_pass = len(args.passes) > 1
+    cells = [(v, t, p) for v, t in runs for p in args.passes]
+    log_phase("Sweep")
+    log_info(
+        f"{len(versions)} version{'s' if len(versions) != 1 else ''} × "
+        f"{len(args.temperatures)} temperature{'s' if len(args.temperatures) != 1 else ''} × "
+        f"{len(args.passes)} pass setting{'s' if len(args.passes) != 1 else ''} = "
+        f"{len(cells)} cells, {len(runs)} model runs"
+    )
+    log_info(f"Up to {args.model_jobs} model run{'s' if args.model_jobs != 1 else ''} "
+             f"× {args.workers} {args.backend} worker{'s' if args.workers != 1 else ''} "
+             f"and {args.concurrency} judge requests at a time")
+
+    # Step 1: Build prompts for every version from one parse of the context
+    built = build_all(args.context, versions, args.limit, args.force)
+
+    # Step 2: Run the model for each (version, temperature); judge each run
+    # as soon as it's done, while the other runs are still generating
+    runner = tree_digest(BACKENDS[args.backend].source)
+    outputs: dict[tuple, Path] = {}
+    for v, t in runs:
+        key = output_key(built[v][0], PROMPTS_DIR / f"fm_instruction_{v}.json", args.limit, t, runner)
+        outputs[v, t] = DATA_DIR / f"output_{v}_{key}.jsonl"
+
+    entries: dict[tuple, list[dict]] = {}
+    failed: list[tuple] = []
+    cache = open_judge_cache()
+    t0 = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=args.model_jobs) as models, \
+                ThreadPoolExecutor(max_workers=args.concurrency) as judge_pool:
+            judges = JudgeQueue(judge_pool, cache)
+
+            def enqueue(run: tuple, records: list[dict]) -> None:
+                v, t = run
+                entries[run] = attach_ids(records, built[v][1])
+                # Cells already in the score store need no scores at all
+                wanted = [
+                    p for p in args.passes
+                    if args.force or judged_run(
+                        judge_stage_key(entries[run], p), cell_label(v, t, p, multi_pass), ranked=False,
+                    ) is None
+                ]
+                if wanted:
+                    tag = f"{run_label(v, t)} · "
+                    judges.submit(list(enumerate(entries[run], 1)), max(wanted), tag)
+
+            running = {}
+            for v, t in runs:
+                if outputs[v, t].exists() and not args.force:
+                    log_ok(f"{run_label(v, t)}: inputs unchanged — reusing {outputs[v, t].name}")
+                    enqueue((v, t), read_records(outputs[v, t]))
+                else:
+                    job = models.submit(
+                        model_job, v, built[v][0], outputs[v, t], args.limit, t, args.backend, args.workers,
+                    )
+                    running[job] = (v, t)
+
+            with console.status("[bold cyan]Sweeping…") as status:
+                while running or judges.futures:
+                    done, _ = wait([*running, *judges.futures], return_when=FIRST_COMPLETED)
+                    for job in [f for f in done if f in running]:
+                        run = running.pop(job)
+                        try:
+                            records = job.result()
+                        except SystemExit:
+                            # run() has already logged why
+                            failed.append(run)
+                            continue
+                        log_ok(f"{run_label(*run)}: {len(records)} responses in {outputs[run].name}")
+                        enqueue(run, records)
+                    judges.collect(block=False)
+                    status.update(
+                        f"[bold cyan]Model runs {len(entries) + len(failed)}/{len(runs)} · "
+                        f"judged {judges.judged + judges.cached} · {len(judges.futures)} in flight"
+                    )
+    finally:
+        cache.close()
+    log_info(
+        f"Model and judge done in {fmt_duration(time.perf_counter() - t0)} · "
+        f"{judges.judged} scores fresh, {judges.cached} cached"
+    )
+    if failed:
+        log_warn(f"{len(failed)} model run{'s' if len(failed) != 1 else ''} failed: "
+                 f"{', '.join(run_label(*run) for run in failed)}")
+
+    # Step 3: Record each cell (every score is cached by now) and compare
+    results = []
+    for v, t, p in cells:
+        if (v, t) not in entries or not entries[v, t]:
+            continue
+        label = cell_label(v, t, p, multi_pass)
+        key = judge_stage_key(entries[v, t], p)
+        run_id = None if args.force else judged_run(key, label, ranked=False)
+        if run_id is None:
+            judge(
+                entries[v, t], label, outputs[v, t],
+                judge_options(outputs[v, t], passes=p, seed=args.seed),
+                meta={"stage_key": key, "sweep": {"version": v, "temperature": t, "passes": p}},
+                ranked=False,
+            )
+            run_id = judged_run(key, label, ranked=False)
+        else:
+            log_ok(f"{label}: already judged as run {run_id} in the score store")
+        results.append({"label": label, "run_id": run_id, "entries": entries[v, t]})
+
+    if not results:
+        log_err("No cell produced responses to compare")
+        sys.exit(1)
+
+    log_phase("Comparing cells")
+    store = open_store()
+    try:
+        for r in results:
+            run = load_run(store, r["run_id"])
+            r["summary"] = run_summary(run)
+            r["totals"] = item_totals(run, r["entries"])
+    finally:
+        store.close()
+    compare_cells(results, args.seed)
+    print_sweep(results)
+    log_file(write_sweep(results, args, started))
+
+    log_phase("Done")
+    log_duration(time.perf_counter() - sweep_start, "Total sweep")
+
+
+if __name__ == "__main__":
+    main()
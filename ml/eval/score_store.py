@@ -0,0 +1,831 @@
+#!/usr/bin/env python3
+"""Judge score store and the markdown reports rendered from it.
+
+Usage:
+    uv run python eval/score_store.py runs
+    uv run python eval/score_store.py compare v17 v18
+    uv run python eval/score_store.py compare v17 v18 --min-drop 3
+    uv run python eval/score_store.py render
+
+Every judge run is recorded in data/eval/scores.db: one row per run, per item
+and per pass, with the prompt and response text stored once by content hash.
+data/eval/version_rank.md and data/eval/vrank/<version>_details.md are
+rendered from the latest run of each version, so concurrent judge runs can't
+clobber each other's results. Older runs stay queryable.
+
+Items are matched across versions by prompt hash, so "compare" lines up the
+same prompts even when the output files were limited or reordered, and
+reports a paired bootstrap CI and sign-flip p-value for the mean change. A
+new store is seeded from the existing markdown reports.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+from rich.table import Table
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from lib.log import log_phase, log_info, log_ok, log_warn, log_err, log_file, console
+
+DATA_DIR = ROOT / "data" / "eval"
+STORE_FILE = DATA_DIR / "scores.db"
+RANK_FILE = DATA_DIR / "version_rank.md"
+DETAILS_DIR = DATA_DIR / "vrank"
+
+DIMS = ["faith", "ground", "tone", "conc", "acc"]
+FLAG_CODES = "PHECM"
+FLAG_NAMES = {
+    "P": "preamble",
+    "H": "hallucination",
+    "E": "echo",
+    "C": "CTA-parrot",
+    "M": "misattribution",
+}
+
+# D (date-parrot) was judged up to v16; kept so those runs still render
+REPORT_FLAG_CODES = "PHDECM"
+REPORT_FLAG_NAMES = {**FLAG_NAMES, "D": "date-parrot"}
+
+
+def extract_genre(prompt: str) -> str:
+    m = re.search(r"Genre:\s*(.+)", prompt)
+    return m.group(1).strip() if m else "?"
+
+
+# ── Aggregation ──────────────────────────────────────────────
+# Scores are held as arrays: dims[pass, item, dim] and a flag bitmask
+# flags[pass, item] with bit k set for REPORT_FLAG_CODES[k], so averaging,
+# vote counting and bootstrap resampling run in numpy rather than in loops
+# over passes × items × dimensions × flags.
+
+FLAG_BITS = {c: 1 << k for k, c in enumerate(REPORT_FLAG_CODES)}
+BOOTSTRAP_RESAMPLES = 10000
+# Resampled item indices held in memory at once (per block of resamples)
+BOOTSTRAP_BLOCK = 1 << 22
+
+
+def flag_mask(flags) -> int:
+    return sum(FLAG_BITS[f] for f in set(flags) if f in FLAG_BITS)
+
+
+def flag_bits(masks: np.ndarray) -> np.ndarray:
+    """Unpack bitmasks into 0/1 columns, one per REPORT_FLAG_CODES entry."""
+    return (masks[..., None] >> np.arange(len(REPORT_FLAG_CODES), dtype=np.uint8)) & 1
+
+
+class ScoreArray:
+    """Every pass of a run as arrays. Passes are lined up by position."""
+
+    def __init__(self, all_passes: list[list[dict]]):
+        n_passes, n_items = len(all_passes), len(all_passes[0])
+        self.ids = [s["id"] for s in all_passes[0]]
+        self.notes = [s.get("note", "") for s in all_passes[0]]
+        self.dims = np.array(
+            [[[s[d] for d in DIMS] for s in p] for p in all_passes], dtype=float,
+        ).reshape(n_passes, n_items, len(DIMS))
+        self.flags = np.array(
+            [[flag_mask(s.get("flags", ())) for s in p] for p in all_passes], dtype=np.uint8,
+        ).reshape(n_passes, n_items)
+
+    def flag_votes(self) -> np.ndarray:
+        """Passes that raised each flag, as (items, flags)."""
+        return flag_bits(self.flags).sum(axis=0)
+
+
+def merge_passes(all_passes: list[list[dict]]) -> list[dict]:
+    """Average dimension scores across passes, majority-vote flags."""
+    scores = ScoreArray(all_passes)
+    dims = scores.dims.mean(axis=0).round(1).tolist()
+    # flags: majority vote (present in >50% of passes)
+    votes = (scores.flag_votes() > len(all_passes) / 2).tolist()
+    return [
+        {
+            "id": item,
+            **dict(zip(DIMS, item_dims)),
+            "flags": [f for f, voted in zip(REPORT_FLAG_CODES, item_votes) if voted],
+            "note": note,
+        }
+        for item, item_dims, item_votes, note in zip(scores.ids, dims, votes, scores.notes)
+    ]
+
+
+def compute_summary(scores: list[dict]) -> dict:
+    n = len(scores)
+    dims = np.array([[s[d] for d in DIMS] for s in scores], dtype=float).reshape(n, len(DIMS))
+    avgs = dict(zip(DIMS, dims.mean(axis=0).tolist()))
+    total_avg = sum(avgs.values())
+
+    masks = np.array([flag_mask(s.get("flags", ())) for s in scores], dtype=np.uint8)
+    counts = flag_bits(masks).sum(axis=0).tolist()
+    flag_counts = {f: c for f, c in zip(REPORT_FLAG_CODES, counts) if c}
+
+    totals = dims.sum(axis=1).round(1).tolist()
+    for s, total in zip(scores, totals):
+        # Judge scores are integers and keep an integer total
+        s["total"] = int(total) if all(isinstance(s[d], int) for d in DIMS) else total
+
+    ranked = [scores[k] for k in np.argsort(totals, kind="stable")]
+    return {
+        "avgs": avgs,
+        "total_avg": total_avg,
+        "flag_counts": flag_counts,
+        "bottom": ranked[:5],
+        "top": ranked[-5:][::-1],
+        "n": n,
+    }
+
+
+def bootstrap_means(
+    columns: np.ndarray, rng: np.random.Generator, resamples: int = BOOTSTRAP_RESAMPLES,
+) -> np.ndarray:
+    """Column means of `resamples` bootstrap resamples of the rows of `columns`.
+
+    Each block of resamples draws row indices, counts them per row and takes
+    one matrix product, so memory stays bounded by BOOTSTRAP_BLOCK.
+    """
+    n = len(columns)
+    block = max(1, BOOTSTRAP_BLOCK // n)
+    means = np.empty((resamples, columns.shape[1]))
+    for start in range(0, resamples, block):
+        size = min(block, resamples - start)
+        picks = rng.integers(0, n, (size, n))
+        picks += np.arange(0, size * n, n)[:, None]
+        counts = np.bincount(picks.ravel(), minlength=size * n).reshape(size, n)
+        means[start:start + size] = counts @ columns / n
+    return means
+
+
+def percentile_interval(means: np.ndarray, confidence: float) -> tuple[np.ndarray, np.ndarray]:
+    """Percentile bootstrap bounds for every column of bootstrap_means' output."""
+    resamples = len(means)
+    lo = int(resamples * (1 - confidence) / 2)
+    hi = resamples - 1 - lo
+    ordered = np.sort(means, axis=0)
+    return ordered[lo], ordered[hi]
+
+
+def paired_test(
+    old: list[float], new: list[float], rng: np.random.Generator,
+    confidence: float = 0.95, resamples: int = BOOTSTRAP_RESAMPLES,
+) -> dict:
+    """Paired comparison of per-item totals scored under two versions.
+
+    The mean change gets a percentile bootstrap CI over items; the two-sided
+    p-value is a sign-flip permutation test (is the change distinguishable
+    from each item's two scores being exchangeable?).
+    """
+    diff = np.asarray(new, dtype=float) - np.asarray(old, dtype=float)
+    n = len(diff)
+    observed = diff.mean()
+    lo, hi = percentile_interval(bootstrap_means(diff[:, None], rng, resamples), confidence)
+
+    block = max(1, BOOTSTRAP_BLOCK // n)
+    extreme = 0
+    for start in range(0, resamples, block):
+        size = min(block, resamples - start)
+        signs = rng.integers(0, 2, (size, n), dtype=np.int8) * 2 - 1
+        extreme += int((np.abs(signs @ diff / n) >= abs(observed) - 1e-12).sum())
+    return {
+        "n": n,
+        "mean": float(observed),
+        "low": float(lo[0]),
+        "high": float(hi[0]),
+        "p": (extreme + 1) / (resamples + 1),
+        "worse": int((diff < 0).sum()),
+        "better": int((diff > 0).sum()),
+    }
+
+
+# ── Formatting ───────────────────────────────────────────────
+
+
+def fmt_flags_compact(fc: dict[str, int]) -> str:
+    parts = [f"{fc[c]}{c}" for c in REPORT_FLAG_CODES if c in fc]
+    return " ".join(parts) or "—"
+
+
+def fmt_flags_long(fc: dict[str, int]) -> str:
+    parts = [f"{fc[c]} {REPORT_FLAG_NAMES[c]}" for c in REPORT_FLAG_CODES if c in fc]
+    return " · ".join(parts) or "none"
+
+
+def fmt_flags_inline(flags: list[str]) -> str:
+    return " ".join(flags) if flags else "—"
+
+
+def fmt_ci(summary: dict) -> str:
+    """One line describing a run's bootstrap CI over items: summary["ci"] maps
+    "total" and flag codes to (estimate, low, high)."""
+    ci = summary["ci"]
+    flag_half = max((ci[f][2] - ci[f][1]) / 2 for f in FLAG_CODES)
+    sample = "Adaptive sample" if summary.get("adaptive") else "Sample"
+    return (
+        f"{sample} of {summary['n']} · total ± {(ci['total'][2] - ci['total'][1]) / 2:.2f}, "
+        f"flag rates ± {flag_half:.1%} "
+        f"({summary['ci_confidence']:.0%} bootstrap CI)"
+    )
+
+
+def fmt_table_row(version: str, today: str, s: dict) -> str:
+    a = s["avgs"]
+    return (
+        f"| {version} | {today[5:]} "
+        f"| {a['faith']:.1f} | {a['ground']:.1f} | {a['tone']:.1f} "
+        f"| {a['conc']:.1f} | {a['acc']:.1f} "
+        f"| **{s['total_avg']:.1f}** "
+        f"| {fmt_flags_compact(s['flag_counts'])} "
+        f"| {s['n']} |"
+    )
+
+
+def fmt_score_row(s: dict, entries: dict[int, dict]) -> str:
+    entry = entries.get(s["id"])
+    genre = extract_genre(entry["prompt"]) if entry else "?"
+    return f"| {s['id']} | {s['total']} | {genre} | {s.get('note', '')} |"
+
+
+def fmt_section(version: str, today: str, summary: dict, entries: dict[int, dict]) -> str:
+    a = summary["avgs"]
+    lines = [
+        f"## {version} — {today}",
+        "",
+        (
+            f"Faith {a['faith']:.1f} · Ground {a['ground']:.1f} · "
+            f"Tone {a['tone']:.1f} · Conc {a['conc']:.1f} · "
+            f"Acc {a['acc']:.1f} · **{summary['total_avg']:.1f}/15**"
+        ),
+        "",
+        f"**Flags:** {fmt_flags_long(summary['flag_counts'])}",
+        "",
+    ]
+    if "ci" in summary:
+        lines += [fmt_ci(summary), ""]
+    lines += [
+        "**Bottom 5**",
+        "| # | Score | Genre | Issue |",
+        "|---|-------|-------|-------|",
+    ]
+    for s in summary["bottom"]:
+        lines.append(fmt_score_row(s, entries))
+    lines += [
+        "",
+        "**Top 5**",
+        "| # | Score | Genre | Note |",
+        "|---|-------|-------|------|",
+    ]
+    for s in summary["top"]:
+        lines.append(fmt_score_row(s, entries))
+    return "\n".join(lines)
+
+
+def fmt_details(
+    version: str, today: str, scores: list[dict], entries: dict[int, dict], summary: dict
+) -> str:
+    a = summary["avgs"]
+    lines = [
+        f"# {version} — Detailed Ranking ({today})",
+        "",
+        (
+            f"Faith {a['faith']:.1f} · Ground {a['ground']:.1f} · "
+            f"Tone {a['tone']:.1f} · Conc {a['conc']:.1f} · "
+            f"Acc {a['acc']:.1f} · **{summary['total_avg']:.1f}/15** "
+            f"(n={summary['n']})"
+        ),
+        "",
+        f"**Flags:** {fmt_flags_long(summary['flag_counts'])}",
+        "",
+        "---",
+        "",
+    ]
+
+    for s in sorted(scores, key=lambda s: s["id"]):
+        entry = entries.get(s["id"])
+        if entry is None:
+            continue
+        genre = extract_genre(entry["prompt"])
+        flags = fmt_flags_inline(s.get("flags", []))
+
+        lines += [
+            f"### #{s['id']} · {genre} · {s['total']:g}/15 · {flags}",
+            "",
+            f"Faith {s['faith']:g} · Ground {s['ground']:g} · "
+            f"Tone {s['tone']:g} · Conc {s['conc']:g} · Acc {s['acc']:g}",
+            "",
+            f"> **{s.get('note', '')}**",
+            "",
+            "**Prompt**",
+            "```",
+            entry["prompt"],
+            "```",
+            "",
+            "**Response**",
+            "```",
+            entry["response"],
+            "```",
+            "",
+            "---",
+            "",
+        ]
+    return "\n".join(lines)
+
+
+TABLE_HEADER = """\
+# FM Prompt Version Rankings
+
+| Version | Date | Faith | Ground | Tone | Conc | Acc | **Avg** | Flags | n |
+|---------|------|-------|--------|------|------|-----|---------|-------|---|"""
+
+MARKER = "<!-- /summary -->"
+
+
+def write_atomic(path: Path, text: str) -> None:
+    """Replace a file in one step, so readers never see a half-written report."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+# ── Store ────────────────────────────────────────────────────
+# The latest run of a version is the one with the highest id. Runs recorded
+# with ranked=0 (e.g. --suspects-only subsets) get a details file but no row
+# in version_rank.md.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    version TEXT NOT NULL,
+    date TEXT NOT NULL,
+    created TEXT NOT NULL,
+    passes INTEGER NOT NULL,
+    ranked INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    meta TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_version ON runs (version, id);
+CREATE TABLE IF NOT EXISTS texts (
+    hash TEXT PRIMARY KEY,
+    text TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS items (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    item INTEGER NOT NULL,
+    prompt TEXT NOT NULL REFERENCES texts (hash),
+    response TEXT NOT NULL REFERENCES texts (hash),
+    PRIMARY KEY (run_id, item)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS items_prompt ON items (prompt, run_id);
+CREATE TABLE IF NOT EXISTS scores (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    pass INTEGER NOT NULL,
+    item INTEGER NOT NULL,
+    faith REAL NOT NULL,
+    ground REAL NOT NULL,
+    tone REAL NOT NULL,
+    conc REAL NOT NULL,
+    acc REAL NOT NULL,
+    total REAL NOT NULL,
+    flags TEXT NOT NULL,
+    note TEXT NOT NULL,
+    PRIMARY KEY (run_id, item, pass)
+) WITHOUT ROWID;
+"""
+
+
+def text_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def open_store(path: Path = STORE_FILE) -> sqlite3.Connection:
+    """Open the store, creating it (and importing the markdown reports) if new.
+
+    WAL mode with a busy timeout lets several judge runs record at once.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    conn.executescript(SCHEMA)
+    with transaction(conn):
+        # Checked inside the write lock, so only one of several new runs seeds it
+        if conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0] == 0:
+            imported = import_markdown(conn)
+            if imported:
+                log_info(f"Score store seeded from {len(imported)} markdown reports")
+    return conn
+
+
+@contextmanager
+def transaction(conn: sqlite3.Connection):
+    """BEGIN IMMEDIATE … COMMIT: take the write lock up front, roll back on error."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def record_run(
+    conn: sqlite3.Connection,
+    version: str,
+    today: str,
+    entries: dict[int, dict],
+    all_passes: list[list[dict]],
+    source: str = "",
+    ranked: bool = True,
+    meta: dict | None = None,
+) -> int:
+    """Store one judge run — every pass's scores plus the texts they refer to.
+
+    Runs inside the caller's transaction if one is open.
+    """
+    scored = sorted({s["id"] for p in all_passes for s in p})
+    texts = {}
+    items = []
+    for i in scored:
+        e = entries[i]
+        ph, rh = text_hash(e["prompt"]), text_hash(e["response"])
+        texts[ph], texts[rh] = e["prompt"], e["response"]
+        items.append((i, ph, rh))
+
+    with transaction(conn) if not conn.in_transaction else nullcontext():
+        run_id = conn.execute(
+            "INSERT INTO runs (version, date, created, passes, ranked, source, meta) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                version, today, datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                len(all_passes), int(ranked), source, json.dumps(meta or {}),
+            ),
+        ).lastrowid
+        conn.executemany("INSERT OR IGNORE INTO texts VALUES (?, ?)", texts.items())
+        conn.executemany(
+            "INSERT INTO items VALUES (?, ?, ?, ?)", [(run_id, *row) for row in items]
+        )
+        conn.executemany(
+            "INSERT INTO scores VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    run_id, p, s["id"], *(s[d] for d in DIMS),
+                    round(sum(s[d] for d in DIMS), 1),
+                    "".join(s.get("flags", [])), s.get("note", ""),
+                )
+                for p, scores in enumerate(all_passes)
+                for s in scores
+            ],
+        )
+    return run_id
+
+
+def load_run(conn: sqlite3.Connection, run_id: int) -> dict:
+    """A stored run as {"version", "date", "meta", "entries", "scores"}.
+
+    "scores" is merged across passes, as judge_output.py reports it.
+    """
+    version, today, passes, meta = conn.execute(
+        "SELECT version, date, passes, meta FROM runs WHERE id = ?", (run_id,)
+    ).fetchone()
+    entries = {
+        item: {"prompt": prompt, "response": response}
+        for item, prompt, response in conn.execute(
+            "SELECT i.item, p.text, r.text FROM items i "
+            "JOIN texts p ON p.hash = i.prompt JOIN texts r ON r.hash = i.response "
+            "WHERE i.run_id = ?",
+            (run_id,),
+        )
+    }
+    meta = json.loads(meta)
+    # Judge scores are integers, which REAL columns hand back as floats.
+    # Imported multi-pass averages stay floats, as they were reported.
+    integral = not meta.get("merged")
+    all_passes: list[list[dict]] = [[] for _ in range(passes)]
+    for row in conn.execute(
+        f"SELECT pass, item, {', '.join(DIMS)}, flags, note FROM scores "
+        "WHERE run_id = ? ORDER BY pass, item",
+        (run_id,),
+    ):
+        p, item, *dims, flags, note = row
+        if integral:
+            dims = [int(v) if v == int(v) else v for v in dims]
+        score = {"id": item, **dict(zip(DIMS, dims)), "flags": list(flags), "note": note}
+        all_passes[p].append(score)
+    scores = merge_passes(all_passes) if passes > 1 else all_passes[0]
+    return {"version": version, "date": today, "meta": meta, "entries": entries, "scores": scores}
+
+
+def latest_runs(conn: sqlite3.Connection, ranked_only: bool = True) -> list[int]:
+    """The latest run id of each version, oldest first."""
+    where = "WHERE ranked = 1" if ranked_only else ""
+    return [
+        run_id for (run_id,) in conn.execute(
+            f"SELECT MAX(id) AS run_id FROM runs {where} GROUP BY version ORDER BY run_id"
+        )
+    ]
+
+
+def latest_run(conn: sqlite3.Connection, version: str) -> int | None:
+    row = conn.execute("SELECT MAX(id) FROM runs WHERE version = ?", (version,)).fetchone()
+    return row[0]
+
+
+def run_summary(run: dict) -> dict:
+    summary = compute_summary(run["scores"])
+    if "ci" in run["meta"]:
+        summary["ci"] = run["meta"]["ci"]
+        summary["ci_confidence"] = run["meta"]["ci_confidence"]
+        # Runs recorded before every run got a CI only had one when adaptive
+        summary["adaptive"] = run["meta"].get("adaptive", True)
+    return summary
+
+
+def report_paths(conn: sqlite3.Connection) -> tuple[Path, Path]:
+    """version_rank.md and the vrank/ directory next to the store's file."""
+    store = Path(conn.execute("PRAGMA database_list").fetchone()[2])
+    return store.parent / RANK_FILE.name, store.parent / DETAILS_DIR.name
+
+
+def render_rank(conn: sqlite3.Connection) -> Path:
+    """Rewrite version_rank.md from the latest ranked run of every version.
+
+    Reads and writes under the store's write lock, so a concurrent run can't
+    replace the file with an older snapshot.
+    """
+    path = report_paths(conn)[0]
+    with transaction(conn) if not conn.in_transaction else nullcontext():
+        rows, sections = [], []
+        for run_id in latest_runs(conn):
+            run = load_run(conn, run_id)
+            summary = run_summary(run)
+            rows.append(fmt_table_row(run["version"], run["date"], summary))
+            sections.append(fmt_section(run["version"], run["date"], summary, run["entries"]))
+        content = "\n".join([TABLE_HEADER, *rows, MARKER])
+        content += "".join(f"\n\n---\n\n{section}" for section in sections) + "\n"
+        write_atomic(path, content)
+    return path
+
+
+def render_details(conn: sqlite3.Connection, version: str) -> Path:
+    """Rewrite vrank/<version>_details.md from the version's latest run.
+
+    Like render_rank(), under the store's write lock.
+    """
+    path = report_paths(conn)[1] / f"{version}_details.md"
+    with transaction(conn) if not conn.in_transaction else nullcontext():
+        run = load_run(conn, latest_run(conn, version))
+        summary = run_summary(run)
+        write_atomic(path, fmt_details(version, run["date"], run["scores"], run["entries"], summary))
+    return path
+
+
+# ── Queries ──────────────────────────────────────────────────
+
+ITEM_TOTALS = """
+SELECT i.prompt, MIN(i.item), AVG(s.total)
+FROM items i JOIN scores s ON s.run_id = i.run_id AND s.item = i.item
+WHERE i.run_id = ?
+GROUP BY i.prompt
+"""
+
+
+def compare_runs(
+    conn: sqlite3.Connection, old_run: int, new_run: int
+) -> list[tuple[int, int, float, float]]:
+    """(old item, new item, old total, new total) for prompts scored in both runs.
+
+    Totals are averaged over passes; rows are sorted by change, biggest drop first.
+    """
+    old = {h: (item, total) for h, item, total in conn.execute(ITEM_TOTALS, (old_run,))}
+    rows = []
+    for h, item, total in conn.execute(ITEM_TOTALS, (new_run,)):
+        if h in old:
+            rows.append((old[h][0], item, old[h][1], total))
+    rows.sort(key=lambda r: r[3] - r[2])
+    return rows
+
+
+# ── Markdown import ──────────────────────────────────────────
+# Runs judged before the store existed only survive as reports. Their details
+# files hold every item's scores, flags, note and texts; version_rank.md gives
+# the order they were ranked in.
+
+DETAILS_TITLE = re.compile(r"^# (\S+) — Detailed Ranking \((\d{4}-\d{2}-\d{2})\)$", re.M)
+DETAILS_ITEM = re.compile(
+    r"^### #(\d+) · [^\n]*? · [\d.]+/15 · ([^\n]*)\n\n"
+    r"Faith ([\d.]+) · Ground ([\d.]+) · Tone ([\d.]+) · Conc ([\d.]+) · Acc ([\d.]+)\n\n"
+    r"> \*\*(.*?)\*\*\n\n"
+    r"\*\*Prompt\*\*\n```\n(.*?)\n```\n\n"
+    r"\*\*Response\*\*\n```\n(.*?)\n```\n\n---\n",
+    re.M | re.S,
+)
+RANK_ROW = re.compile(r"^\| (\S+) \| \d{2}-\d{2} \|", re.M)
+
+
+def parse_details(text: str) -> tuple[str, str, dict[int, dict], list[dict]] | None:
+    title = DETAILS_TITLE.search(text)
+    if not title:
+        return None
+    entries, scores = {}, []
+    for m in DETAILS_ITEM.finditer(text):
+        item = int(m.group(1))
+        flags = [] if m.group(2) == "—" else m.group(2).split()
+        dims = [float(x) for x in m.groups()[2:7]]
+        scores.append({
+            "id": item,
+            **{d: int(v) if v == int(v) else v for d, v in zip(DIMS, dims)},
+            "flags": flags,
+            "note": m.group(8),
+        })
+        entries[item] = {"prompt": m.group(9), "response": m.group(10)}
+    return title.group(1), title.group(2), entries, scores
+
+
+def import_markdown(conn: sqlite3.Connection) -> list[str]:
+    """Record a run for every details report, in version_rank.md order."""
+    rank_file, details_dir = report_paths(conn)
+    if not details_dir.exists():
+        return []
+    order = RANK_ROW.findall(rank_file.read_text()) if rank_file.exists() else []
+    reports = {}
+    for path in sorted(details_dir.glob("*_details.md")):
+        parsed = parse_details(path.read_text())
+        if parsed and parsed[3]:
+            reports[parsed[0]] = (parsed, path)
+    imported = []
+    for version in [v for v in order if v in reports] + sorted(set(reports) - set(order)):
+        (_, today, entries, scores), path = reports[version]
+        # Non-integer scores mean the report averaged several passes
+        merged = any(isinstance(s[d], float) for s in scores for d in DIMS)
+        record_run(
+            conn, version, today, entries, [scores],
+            source=str(path.relative_to(ROOT) if path.is_relative_to(ROOT) else path), ranked=version in order,
+            meta={"imported": True, "merged": merged},
+        )
+        imported.append(version)
+    return imported
+
+
+# ── Main ─────────────────────────────────────────────────────
+
+
+def cmd_runs(conn: sqlite3.Connection, args) -> None:
+    table = Table(show_edge=False, pad_edge=False)
+    for col in ("Run", "Version", "Date", "Passes", "n", "Avg", "Source"):
+        table.add_column(col, justify="right" if col in ("Run", "Passes", "n", "Avg") else "left")
+    query = (
+        "SELECT r.id, r.version, r.date, r.passes, r.ranked, r.source, "
+        "COUNT(s.item) / r.passes, AVG(s.total) "
+        "FROM runs r JOIN scores s ON s.run_id = r.id "
+    )
+    params: tuple = ()
+    if args.version:
+        query += "WHERE r.version = ? "
+        params = (args.version,)
+    query += "GROUP BY r.id ORDER BY r.id"
+    for run_id, version, today, passes, ranked, source, n, avg in conn.execute(query, params):
+        label = version if ranked else f"[dim]{version}[/]"
+        table.add_row(str(run_id), label, today, str(passes), str(n), f"{avg:.1f}", source)
+    console.print(table)
+
+
+def cmd_compare(conn: sqlite3.Connection, args) -> None:
+    runs = []
+    for version in (args.old, args.new):
+        run_id = latest_run(conn, version)
+        if run_id is None:
+            log_err(f"No runs stored for {version}")
+            sys.exit(1)
+        runs.append(run_id)
+    rows = compare_runs(conn, *runs)
+    log_phase(f"{args.old} → {args.new}")
+    if not rows:
+        log_warn("No prompts were scored in both runs")
+        return
+    test = paired_test(
+        [r[2] for r in rows], [r[3] for r in rows],
+        np.random.default_rng(args.seed), resamples=args.resamples,
+    )
+    log_info(
+        f"{test['n']} shared prompts · mean change {test['mean']:+.2f} "
+        f"(95% CI {test['low']:+.2f} to {test['high']:+.2f}) · "
+        f"{test['worse']} worse, {test['better']} better"
+    )
+    verdict = log_warn if test["p"] < 0.05 and test["mean"] < 0 else log_info
+    verdict(f"Paired sign-flip test: p = {test['p']:.4f}")
+
+    changed = [r for r in rows if abs(r[3] - r[2]) >= args.min_drop]
+    dropped = [r for r in changed if r[3] < r[2]]
+    rows = changed if args.all else dropped
+    if not rows:
+        log_ok(f"No item dropped by {args.min_drop:g} or more")
+        return
+    new_run = load_run(conn, runs[1])
+    table = Table(show_edge=False, pad_edge=False)
+    table.add_column(f"# {args.old}", style="dim", justify="right")
+    table.add_column(f"# {args.new}", style="dim", justify="right")
+    table.add_column("Genre", style="dim")
+    table.add_column(args.old, justify="right")
+    table.add_column(args.new, justify="right")
+    table.add_column("Δ", justify="right")
+    table.add_column(f"{args.new} note")
+    notes = {s["id"]: s.get("note", "") for s in new_run["scores"]}
+    for old_item, new_item, old, new in rows:
+        style = "red" if new < old else "green"
+        table.add_row(
+            str(old_item), str(new_item),
+            extract_genre(new_run["entries"][new_item]["prompt"]),
+            f"{old:g}", f"{new:g}", f"[{style}]{new - old:+g}[/]", notes.get(new_item, ""),
+        )
+    console.print(table)
+    log_info(f"{len(dropped)} dropped, {len(changed) - len(dropped)} improved by {args.min_drop:g}+")
+
+
+def cmd_render(conn: sqlite3.Connection, args) -> None:
+    log_file(render_rank(conn))
+    versions = args.versions or [
+        v for (v,) in conn.execute("SELECT DISTINCT version FROM runs ORDER BY version")
+    ]
+    for version in versions:
+        if latest_run(conn, version) is None:
+            log_warn(f"No runs stored for {version}")
+            continue
+        log_file(render_details(conn, version))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Query the judge score store and re-render the markdown "
+                    "reports (version_rank.md, vrank/<version>_details.md) from it.",
+        epilog="""\
+examples:
+  uv run python eval/score_store.py runs
+  uv run python eval/score_store.py runs v18
+  uv run python eval/score_store.py compare v17 v18
+  uv run python eval/score_store.py compare v17 v18 --min-drop 3 --all
+  uv run python eval/score_store.py render
+  uv run python eval/score_store.py render v18""",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--store", type=Path, default=STORE_FILE,
+        help=f"score store; its reports are read from and rendered next to it "
+             f"(default: {STORE_FILE.relative_to(ROOT)})",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    runs = commands.add_parser("runs", help="list stored runs")
+    runs.add_argument("version", nargs="?", help="only runs of this version")
+    runs.set_defaults(func=cmd_runs)
+
+    compare = commands.add_parser(
+        "compare", help="items whose score changed between two versions' latest runs",
+    )
+    compare.add_argument("old", help="baseline version, e.g. v17")
+    compare.add_argument("new", help="version to compare, e.g. v18")
+    compare.add_argument(
+        "--min-drop", type=float, default=2,
+        help="smallest change in total score (out of 15) to list (default: 2)",
+    )
+    compare.add_argument(
+        "--all", action="store_true",
+        help="list improvements as well as drops",
+    )
+    compare.add_argument(
+        "--resamples", type=int, default=BOOTSTRAP_RESAMPLES,
+        help=f"bootstrap and permutation resamples for the paired test (default: {BOOTSTRAP_RESAMPLES})",
+    )
+    compare.add_argument(
+        "--seed", type=int, default=0,
+        help="random seed for the paired test (default: 0)",
+    )
+    compare.set_defaults(func=cmd_compare)
+
+    render = commands.add_parser("render", help="re-render the markdown reports")
+    render.add_argument(
+        "versions", nargs="*",
+        help="versions whose details file to render (default: all); "
+             "version_rank.md is always rendered",
+    )
+    render.set_defaults(func=cmd_render)
+
+    args = parser.parse_args()
+    conn = open_store(args.store)
+    try:
+        args.func(conn, args)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -10,50 +10,39 @@ Fixes:
 - Unicode replacement char (U+FFFD)
 - Collapsed multiple spaces
 - Normalized to NFC form
+
+Character, markup and whitespace rules live in lib/normalize.py; the Genius
+boilerplate rules are specific to this script. Every cleaned record is
+tagged with lib.normalize.NORMALIZED_KEY.
 """
 
+import argparse
+import hashlib
+import io
 import json
 import re
+import sqlite3
 import sys
 import unicodedata
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-# Zero-width and invisible characters to strip
-PHANTOM_CHARS = re.compile(
-    "[\u200b\u200c\u200d\u200e\u200f"  # ZWSP, ZWNJ, ZWJ, LRM, RLM
-    "\ufeff"  # BOM
-    "\u00ad"  # soft hyphen
-    "\ufffd"  # replacement char
-    "\u2028\u2029"  # line/paragraph separators
-    "\u200a\u2009\u2008\u2007\u2006\u2005\u2004\u2003\u2002"  # various spaces
-    "\u202a\u202b\u202c\u202d\u202e"  # bidi overrides
-    "\u2066\u2067\u2068\u2069"  # bidi isolates
-    "\u061c\ufffe\uffff]"
-)
-
-# HTML tags — strip them, keep inner text
-HTML_TAG = re.compile(r"</?[a-zA-Z][^>]*>")
-
-# HTML entities
-HTML_ENTITY_MAP = {
-    "&amp;": "&",
-    "&lt;": "<",
-    "&gt;": ">",
-    "&quot;": '"',
-    "&apos;": "'",
-    "&nbsp;": " ",
-}
-HTML_ENTITY = re.compile(r"&(?:amp|lt|gt|quot|apos|nbsp|#(\d+)|#x([0-9a-fA-F]+));")
-
-# Control characters (except tab \x09 and newline \x0a)
-CONTROL_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
-
-# Multiple spaces
-MULTI_SPACE = re.compile(r"  +")
-
-# Emoji spam (3+ consecutive emoji-style chars)
-EMOJI_SPAM = re.compile(
-    "(?:[\U0001f300-\U0001f9ff\u2600-\u27bf\u200d\ufe0f]\\s*){3,}"
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from lib.normalize import (
+    CONTROL_CHARS,
+    EMOJI_SPAM,
+    HTML_ENTITY,
+    HTML_ENTITY_MAP,
+    HTML_TAG,
+    MULTI_SPACE,
+    NORMALIZE_VERSION,
+    PHANTOM_CHARS,
+    URL,
+    clean_markup,
+    clean_noise,
+    mark_normalized,
 )
 
 # Genius boilerplate — truncate everything from these markers onward.
@@ -133,23 +122,6 @@ GENIUS_JUNK_MARKERS = [
 ]
 
 
-def decode_html_entity(m: re.Match) -> str:
-    full = m.group(0)
-    if full in HTML_ENTITY_MAP:
-        return HTML_ENTITY_MAP[full]
-    if m.group(1):  # &#NNN;
-        try:
-            return chr(int(m.group(1)))
-        except (ValueError, OverflowError):
-            return ""
-    if m.group(2):  # &#xHH;
-        try:
-            return chr(int(m.group(2), 16))
-        except (ValueError, OverflowError):
-            return ""
-    return full
-
-
 # Genius fake artist bios — entire field is platform boilerplate, not an artist bio.
 # These appear when the "artist" on Genius is a community/aggregate page.
 GENIUS_FAKE_BIO_OPENERS = [
@@ -164,6 +136,32 @@ GENIUS_FAKE_BIO_OPENERS = [
 ]
 
 
+# Markers that share an anchor substring are grouped so that one `in` test
+# rules out the whole group: a clean string costs one C-level scan per group
+# rather than one per marker. Markers containing no anchor form their own
+# group. Output never depends on this list — a marker is only filed under an
+# anchor it contains. (A single alternation regex was measured slower than
+# str.find on bio-length text; see bench/bench_genius_junk.py.)
+GENIUS_JUNK_ANCHORS = ["Genius", "lyrics", "Calendar", "ollow ", "This page highlights"]
+
+
+def group_markers(markers: list[str], anchors: list[str]) -> list[tuple[str, list[str]]]:
+    """Bucket markers by the first anchor they contain (deduplicated, order kept)."""
+    groups: dict[str, list[str]] = {}
+    for marker in dict.fromkeys(markers):
+        anchor = next((a for a in anchors if a in marker), marker)
+        groups.setdefault(anchor, []).append(marker)
+    return list(groups.items())
+
+
+GENIUS_JUNK_GROUPS = group_markers(GENIUS_JUNK_MARKERS, GENIUS_JUNK_ANCHORS)
+
+# Leading whitespace is part of the pattern so the check needs no lstrip() copy
+GENIUS_FAKE_BIO = re.compile(
+    r"\s*(?:" + "|".join(map(re.escape, GENIUS_FAKE_BIO_OPENERS)) + ")"
+)
+
+
 def strip_genius_junk(s: str) -> str:
     """Truncate Genius boilerplate tails (calendars, CTAs, self-promo).
 
@@ -171,38 +169,26 @@ def strip_genius_junk(s: str) -> str:
     descriptions rather than real artist bios.
     """
     # Nuke entire fake bios
-    for opener in GENIUS_FAKE_BIO_OPENERS:
-        if s.lstrip().startswith(opener):
-            return ""
+    if GENIUS_FAKE_BIO.match(s):
+        return ""
 
-    # Truncate boilerplate tails
+    # Truncate boilerplate tails at the earliest marker
     earliest = len(s)
-    for marker in GENIUS_JUNK_MARKERS:
-        idx = s.find(marker)
-        if idx != -1 and idx < earliest:
-            earliest = idx
+    for anchor, markers in GENIUS_JUNK_GROUPS:
+        if anchor not in s:
+            continue
+        for marker in markers:
+            idx = s.find(marker)
+            if idx != -1 and idx < earliest:
+                earliest = idx
     if earliest < len(s):
         s = s[:earliest]
     return s
 
 
-def strip_urls(s: str) -> str:
-    """Remove inline URLs (common in Genius scraped text)."""
-    return re.sub(r"https?://\S+", "", s)
-
-
 def clean_string(s: str) -> str:
-    s = unicodedata.normalize("NFC", s)
-    s = PHANTOM_CHARS.sub("", s)
-    s = HTML_TAG.sub("", s)
-    s = HTML_ENTITY.sub(decode_html_entity, s)
-    s = CONTROL_CHARS.sub("", s)
-    s = strip_genius_junk(s)
-    s = strip_urls(s)
-    s = EMOJI_SPAM.sub("", s)
-    s = MULTI_SPACE.sub(" ", s)
-    s = s.strip()
-    return s
+    # Junk markers run before URL stripping: some (linktr.ee/) live inside URLs
+    return clean_noise(strip_genius_junk(clean_markup(s)))
 
 
 def clean_value(v):
@@ -215,96 +201,512 @@ def clean_value(v):
     return v
 
 
-def split_concatenated_json(line: str) -> list[dict]:
-    """Handle lines with multiple JSON objects concatenated (no separator).
+# How each field of a context record is treated. Paths are dotted keys from
+# the record root and pass through lists transparently (a path names the
+# field inside every element). Anything not listed is cleaned as prose, so
+# fields the scraper adds later are never left dirty.
+PROSE = "prose"  # full clean_string pipeline (the default)
+KEEP = "keep"  # identifiers, dates, enums: copied verbatim
+DROP = "drop"  # unused downstream: removed with --project, otherwise kept verbatim
+
+FIELD_SCHEMA = {
+    # MusicKit (ContextExtractModels.swift)
+    "musickit.song.id": KEEP,
+    "musickit.song.isrc": KEEP,
+    "musickit.song.releaseDate": KEEP,
+    "musickit.song.contentRating": KEEP,
+    "musickit.song.url": DROP,
+    "musickit.song.artworkURL": DROP,
+    "musickit.song.playCount": DROP,
+    "musickit.album.id": KEEP,
+    "musickit.album.upc": KEEP,
+    "musickit.album.releaseDate": KEEP,
+    "musickit.album.contentRating": KEEP,
+    "musickit.album.url": DROP,
+    "musickit.album.artworkURL": DROP,
+    "musickit.artist.id": KEEP,
+    "musickit.artist.url": DROP,
+    "musickit.artist.artworkURL": DROP,
+    # Genius / MusicBrainz (MusicContextData)
+    "genius.track.isrc": KEEP,
+    "genius.track.musicBrainzId": KEEP,
+    "genius.artist.type": KEEP,
+    "genius.artist.country": KEEP,
+    "genius.artist.activeSince": KEEP,
+    "genius.artist.activeUntil": KEEP,
+    "genius.artist.musicBrainzId": KEEP,
+    "genius.artist.wikidataId": KEEP,
+    "genius.album.releaseDate": KEEP,
+    "genius.album.country": KEEP,
+    "genius.album.status": KEEP,
+    "genius.album.albumType": KEEP,
+    "genius.album.musicBrainzId": KEEP,
+}
+
 
-    Uses raw_decode first, then falls back to scanning for '{' to recover
-    objects even when the break point corrupted surrounding JSON.
+def keep_value(v):
+    return v
+
+
+def compile_schema(schema: dict[str, str], project: bool = False):
+    """Turn FIELD_SCHEMA into a record walker with a handler per known key.
+
+    Each dict level gets its own key → handler table, so the walk does one
+    dict lookup per field instead of re-deciding by path at runtime.
+    """
+    tree: dict = {}
+    for path, action in schema.items():
+        node = tree
+        *parents, leaf = path.split(".")
+        for key in parents:
+            node = node.setdefault(key, {})
+        node[leaf] = action
+
+    def build(node: dict):
+        handlers = {}
+        for key, sub in node.items():
+            if isinstance(sub, dict):
+                handlers[key] = build(sub)
+            elif sub == PROSE:
+                handlers[key] = clean_value
+            elif sub == KEEP or not project:
+                handlers[key] = keep_value
+            else:
+                handlers[key] = None  # dropped
+
+        def walk(v):
+            if isinstance(v, dict):
+                out = {}
+                for k, val in v.items():
+                    handler = handlers.get(k, clean_value)
+                    if handler is not None:
+                        out[k] = handler(val)
+                return out
+            if isinstance(v, list):
+                return [walk(item) for item in v]
+            return clean_value(v)
+
+        return walk
+
+    return build(tree)
+
+
+CLEAN_RECORD = compile_schema(FIELD_SCHEMA)
+PROJECT_RECORD = compile_schema(FIELD_SCHEMA, project=True)
+
+
+# Only these characters can change brace depth or string state
+JSON_STRUCTURAL = re.compile(r'[{}"\\]')
+
+# Characters that may follow the closing quote of a JSON string
+AFTER_STRING = frozenset(",:}] \t\r\n")
+
+
+def scan_objects(line: str, pos: int = 0) -> tuple[list[int], dict[int, int]]:
+    """Single forward pass from `pos`: every structural '{' and, if balanced, its '}'.
+
+    Tracks string and escape state so braces inside strings are ignored.
+    A truncated record can leave the scan inside a string for the rest of
+    the line; `{"` followed by anything that cannot follow a closing quote
+    is impossible in valid JSON there, so it is taken as a new record start
+    and the scan resynchronises.
     """
+    starts: list[int] = []
+    ends: dict[int, int] = {}
+    stack: list[int] = []
+    in_string = False
+    escaped_until = -1
+    n = len(line)
+    for m in JSON_STRUCTURAL.finditer(line, pos):
+        i = m.start()
+        if i < escaped_until:
+            continue
+        c = line[i]
+        if in_string:
+            if c == "\\":
+                escaped_until = i + 2
+            elif c == '"':
+                in_string = False
+            elif (
+                c == "{"
+                and line.startswith('"', i + 1)
+                and (i + 2 >= n or line[i + 2] not in AFTER_STRING)
+            ):
+                stack.clear()  # everything still open belongs to the broken record
+                in_string = False
+                starts.append(i)
+                stack.append(i)
+        elif c == '"':
+            in_string = True
+        elif c == "{":
+            starts.append(i)
+            stack.append(i)
+        elif c == "}" and stack:
+            ends[stack.pop()] = i
+    return starts, ends
+
+
+def split_concatenated_json(line: str) -> tuple[list[dict], dict[str, int]]:
+    """Recover JSON objects from a line that failed to parse as a whole.
+
+    Handles objects concatenated without a separator and break points that
+    corrupted the surrounding JSON. Leading back-to-back objects are taken
+    with raw_decode; from the first failure on, scan_objects() finds
+    candidate spans in one pass and only balanced spans are decoded,
+    outermost first. When a
+    decode fails, nested spans that contain the error position are skipped
+    rather than re-parsed, which keeps deep or repeatedly broken nesting
+    from going quadratic.
+
+    Returns (objects, report) where report has "objects" recovered and
+    "discarded" bytes of non-whitespace outside them.
+    """
+    line = line.strip()
     objects = []
+    kept: list[tuple[int, int]] = []
+
+    # Fast path: the common case is valid objects glued together
     decoder = json.JSONDecoder()
     idx = 0
-    line = line.strip()
-
-    while idx < len(line):
-        # Try decoding at current position
+    while line.startswith("{", idx):
         try:
             obj, end = decoder.raw_decode(line, idx)
-            if isinstance(obj, dict):
-                objects.append(obj)
-            idx = end
-            while idx < len(line) and line[idx] in " \t":
-                idx += 1
+        except (json.JSONDecodeError, RecursionError):
+            break
+        objects.append(obj)
+        kept.append((idx, end))
+        idx = end
+        while idx < len(line) and line[idx] in " \t":
+            idx += 1
+
+    starts, ends = scan_objects(line, idx)
+    resume = idx
+    last_error = -1
+    for start in starts:
+        end = ends.get(start)
+        if start < resume or end is None or start <= last_error <= end:
+            continue
+        try:
+            objects.append(json.loads(line[start:end + 1]))
+        except json.JSONDecodeError as e:
+            last_error = start + e.pos
             continue
-        except json.JSONDecodeError:
-            pass
+        except RecursionError:
+            # Nesting too deep to decode; nothing inside will fare better
+            resume = end + 1
+            continue
+        kept.append((start, end + 1))
+        resume = end + 1
+
+    discarded = 0
+    prev = 0
+    for start, end in kept + [(len(line), len(line))]:
+        discarded += len("".join(line[prev:start].split()).encode("utf-8"))
+        prev = end
+    return objects, {"objects": len(objects), "discarded": discarded}
+
+
+STATS_KEYS = (
+    "total_lines",
+    "output_records",
+    "split_lines",
+    "skipped_lines",
+    "cleaned_strings",
+    "cached_lines",
+    "discarded_bytes",
+)
 
-        # Skip to next '{' and try again
-        next_brace = line.find("{", idx + 1)
-        if next_brace == -1:
-            break
-        idx = next_brace
+# More chunks than workers so one slow chunk (long bios) doesn't idle the pool
+CHUNKS_PER_WORKER = 4
+# Upper bound on chunk size, so memory stays flat on large files
+CHUNK_BYTES = 8 * 1024 * 1024
 
-    return objects
+# Bump when clean_line() output changes in a way the rule tables below
+# don't capture (pipeline order, new steps, different JSON serialisation).
+CLEANER_VERSION = 4
 
+CACHE_SCHEMA = """\
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS cleaned (hash TEXT PRIMARY KEY, output TEXT NOT NULL);
+"""
 
-def clean_file(input_path: Path) -> Path:
-    output_path = input_path.with_stem(input_path.stem + "_cleaned")
 
-    stats = {
-        "total_lines": 0,
-        "output_records": 0,
-        "split_lines": 0,
-        "skipped_lines": 0,
-        "cleaned_strings": 0,
+def new_stats() -> dict[str, int]:
+    return dict.fromkeys(STATS_KEYS, 0)
+
+
+def rules_version(project: bool = False) -> str:
+    """Hash of every rule that determines clean_line() output."""
+    rules = {
+        "cleaner": CLEANER_VERSION,
+        "schema": FIELD_SCHEMA,
+        "project": project,
+        "normalize": NORMALIZE_VERSION,
+        "unicode": unicodedata.unidata_version,
+        "chars": [PHANTOM_CHARS, CONTROL_CHARS],
+        "patterns": [p.pattern for p in (HTML_TAG, HTML_ENTITY, URL, MULTI_SPACE, EMOJI_SPAM)],
+        "entities": HTML_ENTITY_MAP,
+        "junk_markers": GENIUS_JUNK_MARKERS,
+        "fake_bio_openers": GENIUS_FAKE_BIO_OPENERS,
     }
+    return hashlib.sha256(json.dumps(rules, sort_keys=True).encode()).hexdigest()
+
 
-    with open(input_path, encoding="utf-8", errors="replace") as fin, open(
-        output_path, "w", encoding="utf-8"
-    ) as fout:
-        for line in fin:
-            stats["total_lines"] += 1
-            line = line.strip()
-            if not line:
+def line_hash(line: str) -> str:
+    return hashlib.blake2b(line.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def open_cache(path: Path, project: bool = False) -> tuple[sqlite3.Connection, bool]:
+    """Open (or create) the cleaning cache; returns (connection, was_reset).
+
+    Entries written under different rules are dropped. WAL mode lets worker
+    processes read while this connection writes.
+    """
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(CACHE_SCHEMA)
+    version = rules_version(project)
+    row = conn.execute("SELECT value FROM meta WHERE key = 'rules'").fetchone()
+    reset = row is not None and row[0] != version
+    if reset:
+        conn.execute("DELETE FROM cleaned")
+    conn.execute("INSERT OR REPLACE INTO meta VALUES ('rules', ?)", (version,))
+    conn.commit()
+    return conn, reset
+
+
+def clean_line(
+    line: str, stats: dict[str, int], project: bool = False
+) -> tuple[list[str], dict[str, int] | None]:
+    """Clean one stripped, non-empty input line into output JSONL lines.
+
+    Returns (output lines, recovery report). The report is None when the
+    line parsed as-is; a report with zero objects means the line was skipped.
+    """
+    # Try normal parse first
+    report = None
+    try:
+        objects = [json.loads(line)]
+    except json.JSONDecodeError:
+        objects, report = split_concatenated_json(line)
+        stats["discarded_bytes"] += report["discarded"]
+        if not objects:
+            stats["skipped_lines"] += 1
+            return [], report
+        if len(objects) > 1:
+            stats["split_lines"] += 1
+
+    stats["output_records"] += len(objects)
+    walk = PROJECT_RECORD if project else CLEAN_RECORD
+    out = []
+    for obj in objects:
+        cleaned = walk(obj)
+        if isinstance(cleaned, dict):
+            mark_normalized(cleaned)
+        out.append(json.dumps(cleaned, ensure_ascii=False) + "\n")
+    return out, report
+
+
+def chunk_ranges(path: Path, n_chunks: int) -> list[tuple[int, int]]:
+    """Split a file into roughly equal byte ranges that end on line boundaries."""
+    size = path.stat().st_size
+    bounds = [0]
+    with open(path, "rb") as f:
+        for i in range(1, n_chunks):
+            pos = size * i // n_chunks
+            if pos <= bounds[-1]:
                 continue
+            f.seek(pos)
+            f.readline()  # advance past the line straddling the cut
+            if f.tell() >= size:
+                break
+            bounds.append(f.tell())
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def clean_chunk(
+    path: Path, start: int, end: int, cache_path: Path | None = None, project: bool = False
+) -> tuple[str, dict[str, int], list[dict[str, int]], list[tuple[str, str]]]:
+    """Clean one byte range of the input (may run in a worker process).
+
+    Returns (output text, stats, recovery reports with chunk-relative "line"
+    numbers, new cache entries). Lines found in the cache are copied through
+    without cleaning. Lines that needed recovery are never cached, so their
+    report is rebuilt on every run (recovery is a single linear pass).
+
+    Ranges end on a newline byte, which never occurs inside a multi-byte UTF-8
+    sequence, so per-chunk decoding matches decoding the whole file.
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    cache = None
+    if cache_path is not None:
+        cache = sqlite3.connect(f"{cache_path.resolve().as_uri()}?mode=ro", uri=True)
+
+    stats = new_stats()
+    out: list[str] = []
+    recoveries: list[dict[str, int]] = []
+    new_entries: list[tuple[str, str]] = []
+    # newline=None gives the same universal-newline splitting as open() in text mode
+    for line in io.StringIO(data.decode("utf-8", errors="replace"), newline=None):
+        stats["total_lines"] += 1
+        line = line.strip()
+        if not line:
+            continue
 
-            # Try normal parse first
-            try:
-                obj = json.loads(line)
-                objects = [obj]
-            except json.JSONDecodeError:
-                objects = split_concatenated_json(line)
-                if not objects:
-                    stats["skipped_lines"] += 1
-                    print(
-                        f"  skip line {stats['total_lines']}: unparseable",
-                        file=sys.stderr,
-                    )
-                    continue
-                if len(objects) > 1:
-                    stats["split_lines"] += 1
-
-            for obj in objects:
-                cleaned = clean_value(obj)
-                fout.write(json.dumps(cleaned, ensure_ascii=False) + "\n")
+        key = None
+        if cache is not None:
+            key = line_hash(line)
+            row = cache.execute("SELECT output FROM cleaned WHERE hash = ?", (key,)).fetchone()
+            if row is not None:
+                stats["cached_lines"] += 1
                 stats["output_records"] += 1
+                out.append(row[0])
+                continue
+
+        cleaned, report = clean_line(line, stats, project)
+        out.extend(cleaned)
+        if report is not None:
+            recoveries.append({"line": stats["total_lines"], **report})
+        elif key is not None:
+            new_entries.append((key, cleaned[0]))
+
+    if cache is not None:
+        cache.close()
+    return "".join(out), stats, recoveries, new_entries
+
+
+def report_recovery(report: dict[str, int]) -> None:
+    if report["objects"]:
+        msg = f"recovered {report['objects']} object(s)"
+    else:
+        msg = "unparseable"
+    if report["discarded"]:
+        msg += f", discarded {report['discarded']} bytes"
+    print(f"  line {report['line']}: {msg}", file=sys.stderr)
+
+
+def clean_file(
+    input_path: Path, workers: int = 1, use_cache: bool = True, project: bool = False
+) -> Path:
+    output_path = input_path.with_stem(input_path.stem + "_cleaned")
+    recovery_path = output_path.with_suffix(".recovery.jsonl")
+    recovery_path.unlink(missing_ok=True)
+    cache_path = output_path.with_suffix(".cache.db") if use_cache else None
+
+    stats = new_stats()
+
+    cache = None
+    if cache_path is not None:
+        cache, reset = open_cache(cache_path, project)
+        if reset:
+            print("Cleaning rules changed — cache reset, re-cleaning everything")
+
+    size = input_path.stat().st_size
+    n_chunks = max(workers * CHUNKS_PER_WORKER, -(-size // CHUNK_BYTES))
+    ranges = chunk_ranges(input_path, n_chunks)
+    args = (
+        [input_path] * len(ranges),
+        [start for start, _ in ranges],
+        [end for _, end in ranges],
+        [cache_path] * len(ranges),
+        [project] * len(ranges),
+    )
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        # Both map()s yield in submission order, so output keeps input line order
+        results = pool.map(clean_chunk, *args) if pool else map(clean_chunk, *args)
+        with open(output_path, "w", encoding="utf-8") as fout:
+            for text, chunk_stats, recoveries, new_entries in results:
+                if recoveries:
+                    with open(recovery_path, "a", encoding="utf-8") as frec:
+                        for report in recoveries:
+                            report["line"] += stats["total_lines"]
+                            report_recovery(report)
+                            frec.write(json.dumps(report) + "\n")
+                for key in STATS_KEYS:
+                    stats[key] += chunk_stats[key]
+                fout.write(text)
+                if cache is not None and new_entries:
+                    cache.executemany("INSERT OR REPLACE INTO cleaned VALUES (?, ?)", new_entries)
+                    cache.commit()
+    finally:
+        if pool:
+            pool.shutdown()
+        if cache is not None:
+            cache.close()
 
     print(f"Input:   {input_path}")
     print(f"Output:  {output_path}")
+    if workers > 1:
+        print(f"Workers:         {workers}")
+    if project:
+        print(f"Projected:       dropped {sum(a == DROP for a in FIELD_SCHEMA.values())} unused fields")
     print(f"Lines read:      {stats['total_lines']}")
     print(f"Records written: {stats['output_records']}")
+    if cache_path is not None:
+        print(f"Cache hits:      {stats['cached_lines']} lines ({cache_path.name})")
     if stats["split_lines"]:
         print(f"Split lines:     {stats['split_lines']} (had concatenated objects)")
     if stats["skipped_lines"]:
         print(f"Skipped:         {stats['skipped_lines']} (unparseable)")
+    if stats["discarded_bytes"]:
+        print(f"Discarded:       {stats['discarded_bytes']} bytes during recovery")
+    if recovery_path.exists():
+        print(f"Recovery report: {recovery_path}")
 
     return output_path
 
 
-if __name__ == "__main__":
+def main():
     default = Path(__file__).resolve().parent.parent / "data" / "training" / "context_17k.jsonl"
-    path = Path(sys.argv[1]) if len(sys.argv) > 1 else default
-    if not path.exists():
-        print(f"File not found: {path}", file=sys.stderr)
+    parser = argparse.ArgumentParser(
+        description="Clean web-scraping artifacts from a context JSONL file. "
+                    "Writes <input_stem>_cleaned.jsonl next to the input. Cleaned "
+                    "lines are cached in <input_stem>_cleaned.cache.db keyed by a "
+                    "hash of the raw line, so re-runs only clean new or changed lines.",
+        epilog="""\
+examples:
+  uv run python eval/scrape_clean.py
+  uv run python eval/scrape_clean.py data/eval/context_top100.jsonl
+  uv run python eval/scrape_clean.py data/training/context_17k.jsonl -w 8
+  uv run python eval/scrape_clean.py data/training/context_17k.jsonl --project
+  uv run python eval/scrape_clean.py data/training/context_17k.jsonl --no-cache""",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "input", type=Path, nargs="?", default=default,
+        help="context JSONL file to clean (default: data/training/context_17k.jsonl)",
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=1,
+        help="number of worker processes; the file is split into byte-range "
+             "chunks and output keeps the original line order (default: 1)",
+    )
+    parser.add_argument(
+        "--project", action="store_true",
+        help="drop fields marked DROP in FIELD_SCHEMA (URLs, artwork, play "
+             "counts) that nothing downstream reads",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="clean every line from scratch and leave the cache untouched",
+    )
+    args = parser.parse_args()
+
+    if args.workers < 1:
+        print(f"--workers must be a positive integer, got {args.workers}", file=sys.stderr)
+        sys.exit(1)
+
+    if not args.input.exists():
+        print(f"File not found: {args.input}", file=sys.stderr)
         sys.exit(1)
-    clean_file(path)
+    clean_file(args.input, workers=args.workers, use_cache=not args.no_cache, project=args.project)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""Local screening of model outputs for the mechanical judge flags.
+
+Usage:
+    uv run python eval/screen_output.py data/eval/output_v19_*.jsonl
+    uv run python eval/screen_output.py -l 20 -v data/eval/output_v19_*.jsonl
+
+Three of the judge's flags don't need an LLM:
+
+    P  preamble      compiled patterns for openers and meta-framing
+    C  CTA-parrot    build_prompts.CTA_PHRASES found in the response
+    E  echo          verbatim word n-grams shared with the prompt, found with
+                     a rolling hash over the prompt's n-grams
+
+The other two, H (hallucination) and M (misattribution), get a grounding
+pre-check: names, years and quoted titles in the response that the context
+sections never mention are listed as suspects, for the judge to verify.
+
+Responses that are clearly broken (empty, a refusal, or almost entirely
+copied from the prompt) are marked so judge_output.py can skip them. Runs
+standalone for an instant read on a new instruction version, and is used by
+judge_output.py --screen / --skip-broken / --hints / --suspects-only.
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+import unicodedata
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "eval"))
+
+from lib.log import log_phase, log_info, log_ok, log_err, log_duration, console
+
+from build_prompts import CTA_PHRASES
+
+SCREEN_FLAGS = "PCE"
+
+# ── Preamble ─────────────────────────────────────────────────
+
+# Interjections only count with their punctuation, and "Here's" only with a
+# determiner, so titles like "Sure Shot", "Okay Computer" or "Here Is Gone"
+# opening a note aren't preambles.
+PREAMBLE = re.compile(
+    r"""^\s*(?:
+        here(?:['’]s|\s+is|\s+are)\s+(?:a|an|the|some|your|my)\b   # Here is a… / Here's the…
+      | (?:sure|certainly|of\s+course|okay|absolutely)\b\s*[,!.]
+      | liner\s+notes?\s*:
+      | (?:title|description|song\s+description|intro(?:duction)?)\s*:
+      | \*\*[^*\n]+\*\*\s*(?::|\n)             # bold header
+      | \#{1,6}\s                              # markdown heading
+      | (?:in\s+)?(?:this|the\s+following)\s+(?:song\s+)?(?:description|presentation|summary)\b
+    )""",
+    re.IGNORECASE | re.VERBOSE,
+)
+
+# ── CTA ──────────────────────────────────────────────────────
+
+CTA = re.compile(
+    "|".join(sorted({re.escape(p.lower()) for p in CTA_PHRASES}, key=len, reverse=True)),
+    re.IGNORECASE,
+)
+
+# ── Broken responses ─────────────────────────────────────────
+
+# Short forms (n/a, none) only count as the whole response, and "sorry" only
+# as an apology ("Sorry, ..."), so openings like "Nashville singer ...",
+# "Nonetheless, ..." or "Sorry is a 2015 hit ..." are not refusals.
+REFUSAL = re.compile(
+    r"^\s*(?:(?:n/?a|none)\.?\s*$|i\s+don['’]t\s+know\b|i['’]m\s+(?:sorry|unable)\b|"
+    r"i\s+(?:can(?:no|['’])t|am\s+unable\s+to)\b|sorry\s*[,.!]|as\s+an\s+ai\b)",
+    re.IGNORECASE,
+)
+REFUSAL_MAX_WORDS = 30
+BROKEN_ECHO = 0.8
+
+# ── Echo ─────────────────────────────────────────────────────
+# A response echoes the prompt when ECHO_RUN or more consecutive words, or
+# ECHO_COVERAGE of its ECHO_N-grams, appear verbatim in the context sections.
+
+ECHO_N = 6
+ECHO_RUN = 14
+ECHO_COVERAGE = 0.5
+
+WORD = re.compile(r"[^\W_]+(?:['’][^\W_]+)*")
+HASH_MOD = (1 << 61) - 1
+HASH_BASE = 1_000_003
+
+
+def words(text: str) -> list[str]:
+    return WORD.findall(text.lower())
+
+
+def context_sections(prompt: str) -> str:
+    """The [Section]…[End Section] blocks of a prompt, without the task text."""
+    end = prompt.rfind("[End ")
+    if end < 0:
+        return prompt
+    close = prompt.find("]", end)
+    return prompt[:close + 1] if close >= 0 else prompt
+
+
+def ngram_hashes(tokens: list[str], n: int = ECHO_N) -> list[int]:
+    """Rolling polynomial hash of every n-token window, in order."""
+    if len(tokens) < n:
+        return []
+    ids = [hash(t) & 0xFFFFFFFF for t in tokens]
+    top = pow(HASH_BASE, n - 1, HASH_MOD)
+    h = 0
+    for t in ids[:n]:
+        h = (h * HASH_BASE + t) % HASH_MOD
+    out = [h]
+    for k in range(n, len(ids)):
+        h = ((h - ids[k - n] * top) * HASH_BASE + ids[k]) % HASH_MOD
+        out.append(h)
+    return out
+
+
+def echo_stats(response_tokens: list[str], index: set[int], n: int = ECHO_N) -> tuple[float, int]:
+    """(fraction of response n-grams found in the index, longest copied run in words)."""
+    hashes = ngram_hashes(response_tokens, n)
+    if not hashes:
+        return 0.0, 0
+    hits = 0
+    run = best = 0
+    for h in hashes:
+        if h in index:
+            hits += 1
+            run += 1
+            best = max(best, run)
+        else:
+            run = 0
+    return hits / len(hashes), best + n - 1 if best else 0
+
+
+# ── Grounding ────────────────────────────────────────────────
+# Candidate entities in a response — capitalized names, years and quoted
+# titles — are looked up in the prompt's context sections after folding case
+# and accents. Whatever isn't found is a suspect for H or M. Sentence-initial
+# words are only candidates when they join a longer name, so an opening
+# "Lamenting…" or "Over…" isn't reported.
+
+UPPER = "A-ZÀ-ÖØ-Þ"
+NAME_WORD = rf"(?:[{UPPER}]\.|[{UPPER}](?:[\w'’&\-]|\.(?=\w))*)"
+NAME = re.compile(
+    rf"{NAME_WORD}(?:(?:\s+(?:of|the|and|de|del|la|los|las|el|y|&))*\s+{NAME_WORD})*"
+)
+QUOTED = re.compile(r"[\"“]([^\"“”\n]{2,80})[\"”]")
+YEAR = re.compile(r"(?<![\d:])(?:(1[6-9]\d\d|20\d\d)(s?)|['’](\d0)s)(?![\d:])")
+SENTENCE_START = re.compile(r"(?:^|[.!?:;][\"”’)]*\s+|\n\s*)[\"“(]?$")
+ISO_MONTH = re.compile(r"\b(?:1[6-9]|20)\d\d-(0[1-9]|1[0-2])-\d\d\b")
+MONTHS = (
+    "january february march april may june july "
+    "august september october november december"
+).split()
+POSSESSIVE = re.compile(r"['’]s$")
+QUOTED_MAX_WORDS = 10
+SUSPECTS_MAX = 8
+
+# Capitalized words that aren't names on their own
+COMMON_WORDS = frozenset("""
+    a an and as at by for from in into it its of on or so the to with
+    i he she they we you his her their our your this that these those there
+    here what when where while who whose which how why after before over under
+    through across between against along amid despite beyond within without
+    but yet although though if then also both each every all some many much
+    more most no not one two three first second new old
+    mr mrs ms dr st feat ft vol pt
+""".split())
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip accents, so "reggaeton" matches "reggaetón"."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def phrase(tokens: list[str]) -> str:
+    return " " + " ".join(POSSESSIVE.sub("", t) for t in tokens) + " "
+
+
+class ContextIndex:
+    """Folded words, phrases and years of a prompt's context sections."""
+
+    def __init__(self, context: str):
+        tokens = words(fold(context))
+        self.text = phrase(tokens)
+        self.vocab = {POSSESSIVE.sub("", t) for t in tokens}
+        # "The Weeknd'in" still grounds "Weeknd"; "2025-09-15" grounds "September"
+        self.vocab |= {re.split(r"['’]", t)[0] for t in tokens if "'" in t or "’" in t}
+        self.vocab |= {MONTHS[int(m) - 1] for m in ISO_MONTH.findall(context)}
+        self.years = {m.group(1) for m in YEAR.finditer(context) if m.group(1)}
+
+    def has(self, candidate: str) -> bool:
+        tokens = words(fold(candidate))
+        if not tokens:
+            return True
+        return phrase(tokens) in self.text or all(
+            POSSESSIVE.sub("", t) in self.vocab for t in tokens
+        )
+
+    def has_year(self, m: re.Match) -> bool:
+        year, plural, short = m.groups()
+        if short:
+            return any(y[2:3] == short[0] for y in self.years)
+        if plural:
+            return any(y[:3] == year[:3] for y in self.years)
+        return year in self.years
+
+
+def find_suspects(response: str, index: ContextIndex) -> list[str]:
+    """Entities, years and quoted titles in the response not found in the context."""
+    suspects: list[str] = []
+
+    def suspect(text: str) -> None:
+        if text not in suspects:
+            suspects.append(text)
+
+    for m in QUOTED.finditer(response):
+        title = m.group(1).strip(" ,.")
+        if len(title.split()) <= QUOTED_MAX_WORDS and not index.has(title):
+            suspect(f"“{title}”")
+    # Names inside quotes were checked as titles
+    text = QUOTED.sub(lambda m: " " * len(m.group(0)), response)
+
+    for m in YEAR.finditer(text):
+        if not index.has_year(m):
+            suspect(m.group(0))
+
+    for m in NAME.finditer(text):
+        tokens = m.group(0).rstrip(".'’-").split()
+        if SENTENCE_START.search(response[:m.start()]):
+            tokens = tokens[1:] if len(tokens) > 1 else []
+        while tokens and tokens[0].lower() in COMMON_WORDS:
+            tokens = tokens[1:]
+        if not tokens or (len(tokens) == 1 and tokens[0].lower() in COMMON_WORDS):
+            continue
+        name = " ".join(tokens)
+        if index.has(name):
+            continue
+        # "Morgan Wallen and Tate McRae" may be two grounded names
+        for part in re.split(r"\s+(?:and|&)\s+", name):
+            part = re.sub(r"^(?:the|of)\s+", "", part)
+            if not index.has(part):
+                suspect(POSSESSIVE.sub("", part))
+    return suspects[:SUSPECTS_MAX]
+
+
+# ── Screen ───────────────────────────────────────────────────
+
+
+def screen(entry: dict) -> dict:
+    """Local P/C/E flags and grounding suspects for one {prompt, response} entry.
+
+    Returns {"flags", "echo", "echo_run", "broken", "suspects"} where broken
+    is a short reason string (or None) for responses not worth sending to the
+    judge, and suspects lists entities the context doesn't mention.
+    """
+    response = entry.get("response") or ""
+    tokens = words(response)
+    flags = []
+    if PREAMBLE.match(response):
+        flags.append("P")
+    if CTA.search(response):
+        flags.append("C")
+    context = context_sections(entry.get("prompt", ""))
+    index = set(ngram_hashes(words(context)))
+    coverage, run = echo_stats(tokens, index)
+    if run >= ECHO_RUN or coverage >= ECHO_COVERAGE:
+        flags.append("E")
+
+    broken = None
+    if not tokens:
+        broken = "empty response"
+    elif len(tokens) <= REFUSAL_MAX_WORDS and REFUSAL.match(response):
+        broken = "refusal"
+    elif coverage >= BROKEN_ECHO:
+        broken = f"{coverage:.0%} copied from prompt"
+    suspects = find_suspects(response, ContextIndex(context)) if tokens else []
+    return {
+        "flags": flags, "echo": round(coverage, 3), "echo_run": run,
+        "broken": broken, "suspects": suspects,
+    }
+
+
+def broken_score(entry_id: int, result: dict) -> dict:
+    """Judge-shaped score for a response skipped as broken: zero on every dimension."""
+    return {
+        "id": entry_id,
+        "faith": 0, "ground": 0, "tone": 0, "conc": 0, "acc": 0,
+        "flags": result["flags"],
+        "note": f"screened locally: {result['broken']}",
+    }
+
+
+def apply_screen(scores: list[dict], results: dict[int, dict]) -> dict[str, list[int]]:
+    """Replace the judge's P/C/E flags with the local ones, in place.
+
+    Returns the IDs where they disagreed, keyed "judge-only:<flag>" and
+    "local-only:<flag>".
+    """
+    disagree: dict[str, list[int]] = {}
+    for s in scores:
+        result = results.get(s["id"])
+        if result is None:
+            continue
+        judge = set(s.get("flags", []))
+        local = set(result["flags"])
+        for f in SCREEN_FLAGS:
+            if f in judge and f not in local:
+                disagree.setdefault(f"judge-only:{f}", []).append(s["id"])
+            elif f in local and f not in judge:
+                disagree.setdefault(f"local-only:{f}", []).append(s["id"])
+        kept = (judge - set(SCREEN_FLAGS)) | local
+        s["flags"] = [f for f in "PHECM" if f in kept]
+    return disagree
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Flag preamble (P), CTA-parrot (C) and echo (E) in model outputs "
+                    "and list entities missing from the prompt context, locally, "
+                    "without calling the LLM judge.",
+        epilog="""\
+examples:
+  uv run python eval/screen_output.py data/eval/output_v19_20260219.jsonl
+  uv run python eval/screen_output.py -l 20 -v data/eval/output_v19_20260219.jsonl""",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "file", type=Path,
+        help="output JSONL file — each line must have 'prompt' and 'response' fields",
+    )
+    parser.add_argument(
+        "-l", "--limit", type=int, default=None,
+        help="maximum number of entries to screen (default: all)",
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true",
+        help="list every flagged, ungrounded or broken response",
+    )
+    args = parser.parse_args()
+
+    if not args.file.exists():
+        log_err(f"Not found: {args.file}")
+        sys.exit(1)
+
+    entries = [json.loads(l) for l in args.file.read_text().split("\n") if l.strip()]
+    if args.limit:
+        entries = entries[:args.limit]
+
+    log_phase(f"Screening [bold]{args.file.name}")
+    t0 = time.perf_counter()
+    results = [screen(e) for e in entries]
+    elapsed = time.perf_counter() - t0
+
+    n = len(results)
+    for f, name in zip(SCREEN_FLAGS, ("preamble", "CTA-parrot", "echo")):
+        count = sum(f in r["flags"] for r in results)
+        log_info(f"{f} {name:<11} {count:>5}/{n}  ({count / n:.0%})" if n else f"{f} {name}: 0")
+    n_suspect = sum(bool(r["suspects"]) for r in results)
+    log_info(f"Ungrounded    {n_suspect:>5}/{n}  ({n_suspect / n:.0%})" if n else "Ungrounded: 0")
+    n_broken = sum(r["broken"] is not None for r in results)
+    log_info(f"Broken        {n_broken:>5}/{n}")
+    if args.verbose:
+        console.print()
+        for i, r in enumerate(results, 1):
+            if r["flags"] or r["broken"] or r["suspects"]:
+                detail = f" · {r['broken']}" if r["broken"] else ""
+                if r["suspects"]:
+                    detail += f" · not in context: {', '.join(r['suspects'])}"
+                console.print(
+                    f"  #{i:<4} {' '.join(r['flags']) or '—':<6} "
+                    f"[dim]echo {r['echo']:.0%}, run {r['echo_run']}{detail}[/]"
+                )
+    log_ok(f"{n} responses screened ({elapsed / max(n, 1) * 1e3:.2f} ms each)")
+    log_duration(elapsed, "Screening")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Shared text normalization for scraped context and model output.
+
+Used at three points in the pipeline:
+
+    Stage                        Entry point
+    eval/scrape_clean.py         clean_markup() → (Genius junk) → clean_noise()
+    eval/build_prompts.py        strip_urls()
+    training/quality_check.py    clean_invisible()  (model output, no marker)
+
+Every per-character deletion is folded into one compiled character class, so
+it costs one pass however many characters are listed (str.translate was
+measured ~8x slower than a regex class on non-ASCII text; see
+bench/bench_normalize.py). The remaining steps are regexes compiled once at
+import; each is skipped when a plain substring test shows it cannot match.
+Records that went through the full clean carry NORMALIZED_KEY. build_prompts
+still strips tags and URLs from them: clean_markup() decodes entities after
+stripping tags, so encoded markup comes back out as real tags.
+"""
+
+import re
+import unicodedata
+
+# Bump when any rule below changes output — stale markers are then ignored
+NORMALIZE_VERSION = 1
+NORMALIZED_KEY = "_normalized"
+
+# Zero-width and invisible characters to strip from scraped text
+PHANTOM_CHARS = (
+    "\u200b\u200c\u200d\u200e\u200f"  # ZWSP, ZWNJ, ZWJ, LRM, RLM
+    "\ufeff"  # BOM
+    "\u00ad"  # soft hyphen
+    "\ufffd"  # replacement char
+    "\u2028\u2029"  # line/paragraph separators
+    "\u200a\u2009\u2008\u2007\u2006\u2005\u2004\u2003\u2002"  # various spaces
+    "\u202a\u202b\u202c\u202d\u202e"  # bidi overrides
+    "\u2066\u2067\u2068\u2069"  # bidi isolates
+    "\u061c\ufffe\uffff"
+)
+
+# Control characters (except tab \x09, newline \x0a and carriage return \x0d)
+CONTROL_CHARS = "".join(
+    chr(c) for c in (*range(0x00, 0x09), 0x0B, 0x0C, *range(0x0E, 0x20), 0x7F)
+)
+
+# Narrower set for model prompts/responses — typographic spaces are kept
+INVISIBLE_CHARS = (
+    "\u00ad"  # soft hyphen
+    "\u200b\u200c\u200d\u200e\u200f"  # zero-width spaces, joiners, directional marks
+    "\u2028\u2029"  # line/paragraph separators
+    "\u202a\u202b\u202c\u202d\u202e"  # bidi embedding/override
+    "\u2066\u2067\u2068\u2069"  # bidi isolates
+    "\ufeff"  # BOM / zero-width no-break space
+)
+
+SCRAPE_CHARS = re.compile(f"[{re.escape(PHANTOM_CHARS + CONTROL_CHARS)}]")
+INVISIBLE = re.compile(f"[{re.escape(INVISIBLE_CHARS)}]")
+
+# HTML tags — strip them, keep inner text
+HTML_TAG = re.compile(r"</?[a-zA-Z][^>]*>")
+
+# HTML entities
+HTML_ENTITY_MAP = {
+    "&amp;": "&",
+    "&lt;": "<",
+    "&gt;": ">",
+    "&quot;": '"',
+    "&apos;": "'",
+    "&nbsp;": " ",
+}
+HTML_ENTITY = re.compile(r"&(?:amp|lt|gt|quot|apos|nbsp|#(\d+)|#x([0-9a-fA-F]+));")
+
+URL = re.compile(r"https?://\S+")
+
+# Multiple spaces
+MULTI_SPACE = re.compile(r"  +")
+
+# Emoji spam (3+ consecutive emoji-style chars)
+EMOJI_SPAM = re.compile(
+    "(?:[\U0001f300-\U0001f9ff\u2600-\u27bf\u200d\ufe0f]\\s*){3,}"
+)
+
+
+def decode_html_entity(m: re.Match) -> str:
+    full = m.group(0)
+    if full in HTML_ENTITY_MAP:
+        return HTML_ENTITY_MAP[full]
+    try:
+        if m.group(1):  # &#NNN;
+            ch = chr(int(m.group(1)))
+        elif m.group(2):  # &#xHH;
+            ch = chr(int(m.group(2), 16))
+        else:
+            return full
+    except (ValueError, OverflowError):
+        return ""
+    # Control chars are dropped even when they arrive as entities
+    return "" if ch in CONTROL_CHARS else ch
+
+
+def strip_tags(s: str) -> str:
+    """Remove HTML tags, keeping their inner text."""
+    return HTML_TAG.sub("", s) if "<" in s else s
+
+
+def decode_entities(s: str) -> str:
+    """Decode named and numeric HTML entities."""
+    return HTML_ENTITY.sub(decode_html_entity, s) if "&" in s else s
+
+
+def strip_urls(s: str) -> str:
+    """Remove inline http(s) URLs."""
+    return URL.sub("", s) if "://" in s else s
+
+
+def clean_markup(s: str) -> str:
+    """NFC-normalize, drop phantom/control chars, strip tags, decode entities."""
+    s = unicodedata.normalize("NFC", s)
+    s = SCRAPE_CHARS.sub("", s)
+    s = strip_tags(s)
+    return decode_entities(s)
+
+
+def clean_noise(s: str) -> str:
+    """Drop URLs and emoji spam, collapse runs of spaces, trim."""
+    s = strip_urls(s)
+    if not s.isascii():
+        s = EMOJI_SPAM.sub("", s)
+    if "  " in s:
+        s = MULTI_SPACE.sub(" ", s)
+    return s.strip()
+
+
+def clean_invisible(s: str) -> str:
+    """Strip zero-width/bidi/separator chars and turn NBSP into a space."""
+    if "\u00a0" in s:
+        s = s.replace("\u00a0", " ")
+    return INVISIBLE.sub("", s)
+
+
+def is_normalized(record: dict) -> bool:
+    """True if the record went through the current full clean."""
+    return record.get(NORMALIZED_KEY) == NORMALIZE_VERSION
+
+
+def mark_normalized(record: dict) -> dict:
+    record[NORMALIZED_KEY] = NORMALIZE_VERSION
+    return record
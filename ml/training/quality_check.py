@@ -7,7 +7,6 @@ Output: filtered JSONL (same format, bad rows dropped)
 
 import argparse
 import json
-import re
 import sys
 import time
 from pathlib import Path
@@ -15,28 +14,11 @@ from pathlib import Path
 ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT))
 
-from lib.log import log_phase, log_ok, log_info, log_file, log_duration, log_warn
+from lib.log import log_phase, log_ok, log_info, log_err, log_file, log_duration, log_warn
+from lib.normalize import clean_invisible
 
 import sentencepiece as spm
 
-# Unicode noise from web-scraped Genius data
-_UNICODE_JUNK = re.compile(
-    "[\u00ad"       # soft hyphen
-    "\u200b-\u200f"  # zero-width spaces, joiners, directional marks
-    "\u2028-\u2029"  # line/paragraph separators
-    "\u202a-\u202e"  # bidi embedding/override
-    "\u2066-\u2069"  # bidi isolates
-    "\ufeff"         # BOM / zero-width no-break space
-    "]"
-)
-
-
-def clean_text(text: str) -> str:
-    """Normalize ambiguous unicode in web-scraped content."""
-    text = text.replace("\u00a0", " ")  # NBSP → space
-    text = _UNICODE_JUNK.sub("", text)
-    return text
-
 TOKENIZER_PATH = Path.home() / "Developer" / "adapter_training_toolkit_v26_0_0" / "assets" / "tokenizer.model"
 MAX_SEQ_LEN = 4095
 
@@ -170,8 +152,8 @@ requires:
     with output.open("w") as f:
         for i, line in enumerate(lines, 1):
             entry = json.loads(line)
-            entry["prompt"] = clean_text(entry["prompt"])
-            entry["response"] = clean_text(entry["response"])
+            entry["prompt"] = clean_invisible(entry["prompt"])
+            entry["response"] = clean_invisible(entry["response"])
             reason = check(entry)
             if reason:
                 rejected += 1